@@ -0,0 +1,77 @@
+"""
+Sample inputs for the pipeline benchmarks.
+
+The source fixtures are already checked into the repo, so the benchmarks
+point at them instead of carrying copies:
+  SAMPLE_PDF       assets/pdfs/Asim/Hafs.pdf, pages SAMPLE_PAGES
+  SAMPLE_QIRAAT    the asim_hafs bounds corpus (assets/json/bounds/asim_hafs)
+
+Page images are drawn deterministically by synthetic_page() (text-like lines
+of dark strokes on white, at the reader's page size), so the encode and
+packaging benchmarks give the same input on every machine whether or not
+poppler is installed.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# The converter's settings, so the benchmarks follow them
+from convert_multiple_qiraats import DPI as PAGE_DPI, IMAGE_PROGRESSIVE, IMAGE_QUALITY  # noqa: E402
+
+SAMPLE_PDF = ROOT_DIR / 'assets' / 'pdfs' / 'Asim' / 'Hafs.pdf'
+SAMPLE_PAGES = (3, 12)  # first and last page, past the cover and the opening pages
+SAMPLE_QIRAAT = 'asim_hafs'
+BOUNDS_DIR = ROOT_DIR / 'assets' / 'json' / 'bounds'
+# Page size at PAGE_DPI
+PAGE_SIZE = (1131, 1600)
+LINES_PER_PAGE = 15
+
+
+def synthetic_page(seed, dpi=PAGE_DPI):
+    """A grayscale page with LINES_PER_PAGE lines of word-like strokes."""
+    width, height = (round(side * dpi / PAGE_DPI) for side in PAGE_SIZE)
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width), 250, dtype=np.uint8)
+    margin = width // 10
+    line_pitch = (height - 2 * margin) // LINES_PER_PAGE
+    stroke = max(2, line_pitch // 3)
+    for line in range(LINES_PER_PAGE):
+        top = margin + line * line_pitch + (line_pitch - stroke) // 2
+        x = margin
+        while x < width - margin:
+            word = int(rng.integers(line_pitch // 2, line_pitch * 3))
+            right = min(x + word, width - margin)
+            ink = rng.integers(0, 60, size=(stroke, right - x), dtype=np.uint8)
+            # Ragged tops and bottoms, like letter ascenders and descenders
+            mask = rng.random((stroke, right - x)) < 0.8
+            page[top:top + stroke, x:right][mask] = ink[mask]
+            x = right + int(rng.integers(line_pitch // 4, line_pitch // 2))
+    # Page frame
+    page[margin // 2:margin // 2 + 3, margin // 2:width - margin // 2] = 40
+    page[height - margin // 2 - 3:height - margin // 2, margin // 2:width - margin // 2] = 40
+    page[margin // 2:height - margin // 2, margin // 2:margin // 2 + 3] = 40
+    page[margin // 2:height - margin // 2, width - margin // 2 - 3:width - margin // 2] = 40
+    return Image.fromarray(page, 'L')
+
+
+def encode_page(image):
+    """JPEG bytes of a page with the converter's settings."""
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=IMAGE_QUALITY, optimize=True, progressive=IMAGE_PROGRESSIVE)
+    return buffer.getvalue()
+
+
+def write_sample_pages(qiraat_dir, count):
+    """Write count synthetic JPEG pages (page_001.jpg ...) into qiraat_dir."""
+    qiraat_dir = Path(qiraat_dir)
+    qiraat_dir.mkdir(parents=True, exist_ok=True)
+    for number in range(1, count + 1):
+        (qiraat_dir / f'page_{number:03d}.jpg').write_bytes(encode_page(synthetic_page(number)))
+    return qiraat_dir
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for every stage of the asset pipeline, gated against baselines.
+
+Each benchmark times one stage on a fixed sample (see fixtures.py) and
+reports its throughput and peak RSS:
+
+  convert.render        PDF pages rendered at 150 DPI (pdf2image, convert_multiple_qiraats.py)
+  convert.encode        pages saved as progressive JPEG (convert_multiple_qiraats.py)
+  convert.deep_zoom     400 DPI pages tiled into DZI pyramids (--deep-zoom, deep_zoom.py)
+  extract.ayah_numbers  ayah numbers read from PDF text (extract_ayah_mappings_pymupdf.py)
+  bounds.regenerate     page JSONs generated from ayah lists (regenerate_all_pages_from_tanzil.py)
+  bounds.remap          bounds derived from Hafs (remap_bounds.py)
+  bounds.validate       bounds validated (validate_bounds.py)
+  package.hashed        pages staged under content-hashed names (hashed_assets.py)
+  package.bundle        pages packed into segments (qiraat_bundle.py)
+
+Every benchmark runs in its own process, so its peak RSS is its own. The
+warm-up round also sizes the rounds: the sample is repeated until a round
+takes about ROUND_SECONDS, since rounds of tens of milliseconds are mostly
+scheduler noise. Then --rounds timed rounds run and their median time per
+unit counts.
+Results are compared with baselines.json; a benchmark regresses when its
+median time per unit or its peak RSS grows by more than its threshold, and
+the run then exits 1. The threshold is --threshold or, when larger, twice
+the run-to-run spread recorded with the baseline (--update measures every
+benchmark in --update-runs separate processes). Benchmarks whose
+dependencies are missing (poppler, PyMuPDF) are skipped and keep their
+baselines.
+
+Timings depend on the machine: they are only gated against baselines
+recorded on the same OS, architecture, Python version and CPU count (peak
+RSS is always gated). Refresh the baselines with --update on the machine
+the gate runs on and commit baselines.json with the change that moved them.
+Every run names the machine the baselines come from and the stages that
+have none. --update refuses to record an incomplete set: it needs every
+selected benchmark to run (so poppler and PyMuPDF installed), and all of
+them when the existing baselines come from another machine.
+
+Usage:
+    python3 benchmarks/run_benchmarks.py                      # run all, compare with baselines
+    python3 benchmarks/run_benchmarks.py 'bounds.*' --rounds 9
+    python3 benchmarks/run_benchmarks.py --update             # record new baselines
+    python3 benchmarks/run_benchmarks.py --threshold 0.1 --json bench.json
+    python3 benchmarks/run_benchmarks.py --list
+
+Requirements:
+pip install numpy Pillow pdf2image PyMuPDF      (pdf2image needs poppler)
+"""
+
+import argparse
+import fnmatch
+import importlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+BENCH_DIR = Path(__file__).parent
+ROOT_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / 'tools'))
+
+import fixtures  # noqa: E402
+from bounds_model import read_json, write_json  # noqa: E402
+
+BASELINES_PATH = BENCH_DIR / 'baselines.json'
+BASELINES_VERSION = 2  # 2: median rounds of about ROUND_SECONDS, with the run-to-run spread
+
+DEFAULT_ROUNDS = 5
+DEFAULT_THRESHOLD = 0.20  # 20% slower per unit, or 20% more peak RSS
+ROUND_SECONDS = 1.0  # target length of a timed round
+UPDATE_RUNS = 3  # separate runs per benchmark when recording baselines
+SPREAD_MARGIN = 2.0  # threshold is at least this multiple of the recorded spread
+# Timings are only gated against baselines from a machine that matches on these
+MACHINE_KEYS = ('system', 'machine', 'python', 'cpus')
+SAMPLE_IMAGES = 20  # synthetic pages for the encode and packaging benchmarks
+DEEP_ZOOM_DPI = 400
+DEEP_ZOOM_PAGES = 2
+
+
+class Benchmark(NamedTuple):
+    name: str
+    unit: str
+    # setup(workdir) -> run(round_dir) -> units processed; setup is not timed
+    setup: Callable
+    needs: tuple = ()  # modules that must import
+    rounds: int = DEFAULT_ROUNDS
+    commands: tuple = ()  # executables that must be on PATH
+
+
+def _first_last():
+    first, last = fixtures.SAMPLE_PAGES
+    return first, last, last - first + 1
+
+
+def setup_render(workdir):
+    from pdf2image import convert_from_path
+    first, last, count = _first_last()
+
+    def run(round_dir):
+        pages = convert_from_path(str(fixtures.SAMPLE_PDF), dpi=fixtures.PAGE_DPI,
+                                  first_page=first, last_page=last)
+        return len(pages)
+    return run
+
+
+def setup_encode(workdir):
+    pages = [fixtures.synthetic_page(number) for number in range(1, SAMPLE_IMAGES + 1)]
+
+    def run(round_dir):
+        for page in pages:
+            fixtures.encode_page(page)
+        return len(pages)
+    return run
+
+
+def setup_deep_zoom(workdir):
+    from deep_zoom import build_pyramid
+    pages = [fixtures.synthetic_page(number, DEEP_ZOOM_DPI) for number in range(1, DEEP_ZOOM_PAGES + 1)]
+
+    def run(round_dir):
+        for number, page in enumerate(pages, 1):
+            build_pyramid(page, round_dir, f'page_{number}')
+        return len(pages)
+    return run
+
+
+def setup_extract(workdir):
+    from extract_ayah_mappings_pymupdf import analyze_pdf_document
+    first, _, count = _first_last()
+    logging.disable(logging.INFO)
+
+    def run(round_dir):
+        analyze_pdf_document(str(fixtures.SAMPLE_PDF), start_page=first, num_pages=count)
+        return count
+    return run
+
+
+def setup_regenerate(workdir):
+    from bounds_model import page_files
+    from regenerate_all_pages_from_tanzil import create_page_json
+    # The page -> ayah lists the generator gets from Tanzil, read from the sample corpus
+    pages = {}
+    for page_num, path in page_files(fixtures.BOUNDS_DIR / fixtures.SAMPLE_QIRAAT):
+        page = read_json(path)
+        pages[page_num] = [(ayah['surahNumber'], ayah['ayahNumber']) for ayah in page['ayahs']]
+
+    def run(round_dir):
+        for page_num, ayahs in pages.items():
+            write_json(round_dir / f'page_{page_num}.json',
+                       create_page_json(page_num, ayahs, fixtures.SAMPLE_QIRAAT))
+        return len(pages)
+    return run
+
+
+def setup_remap(workdir):
+    from ayah_count_data import counting_system_for
+    from remap_bounds import Corpus, remap_riwaya
+    source_system = counting_system_for(fixtures.SAMPLE_QIRAAT)
+
+    def run(round_dir):
+        corpus = Corpus(fixtures.SAMPLE_QIRAAT, fixtures.BOUNDS_DIR)
+        remap_riwaya(corpus, source_system, 'nafi_warsh', round_dir)
+        return len(corpus)
+    return run
+
+
+def setup_validate(workdir):
+    from bounds_model import page_files
+    from validate_bounds import validate_qiraat
+    count = len(page_files(fixtures.BOUNDS_DIR / fixtures.SAMPLE_QIRAAT))
+
+    def run(round_dir):
+        validate_qiraat(fixtures.SAMPLE_QIRAAT, fixtures.BOUNDS_DIR)
+        return count
+    return run
+
+
+def setup_hashed(workdir):
+    from hashed_assets import build_qiraat
+    fixtures.write_sample_pages(workdir / 'images' / 'sample', SAMPLE_IMAGES)
+
+    def run(round_dir):
+        return len(build_qiraat('sample', workdir / 'images', round_dir)['pages'])
+    return run
+
+
+def setup_bundle(workdir):
+    from qiraat_bundle import build_bundle
+    fixtures.write_sample_pages(workdir / 'images' / 'sample', SAMPLE_IMAGES)
+
+    def run(round_dir):
+        return len(build_bundle('sample', workdir / 'images', round_dir)['entries'])
+    return run
+
+
+BENCHMARKS = (
+    Benchmark('convert.render', 'pages', setup_render, needs=('pdf2image',), commands=('pdftoppm',)),
+    Benchmark('convert.encode', 'pages', setup_encode),
+    Benchmark('convert.deep_zoom', 'pages', setup_deep_zoom),
+    Benchmark('extract.ayah_numbers', 'pages', setup_extract, needs=('fitz',)),
+    Benchmark('bounds.regenerate', 'pages', setup_regenerate),
+    Benchmark('bounds.remap', 'rectangles', setup_remap),
+    Benchmark('bounds.validate', 'pages', setup_validate),
+    Benchmark('package.hashed', 'pages', setup_hashed),
+    Benchmark('package.bundle', 'pages', setup_bundle),
+)
+_BY_NAME = {benchmark.name: benchmark for benchmark in BENCHMARKS}
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(benchmark, rounds):
+    """Run one benchmark in this process. Returns its result dict."""
+    for module in benchmark.needs:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            return {'skipped': f'needs {module}'}
+    for command in benchmark.commands:
+        if shutil.which(command) is None:
+            return {'skipped': f'needs {command}'}
+
+    workdir = Path(tempfile.mkdtemp(prefix='bench_'))
+    try:
+        run = benchmark.setup(workdir)
+
+        def timed_round(number, repeats):
+            """(seconds, units) of repeats passes over the sample, each in a fresh directory."""
+            round_dir = workdir / f'round_{number}'
+            units = 0
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                pass_dir = round_dir / str(repeat)
+                pass_dir.mkdir(parents=True)
+                units += run(pass_dir)
+            elapsed = time.perf_counter() - start
+            shutil.rmtree(round_dir)
+            return elapsed, units
+
+        # Round 0 warms caches and sizes the timed rounds
+        warmup, _ = timed_round(0, 1)
+        repeats = max(1, round(ROUND_SECONDS / warmup)) if warmup else 1
+        times = []
+        units = 0
+        for number in range(1, rounds + 1):
+            elapsed, units = timed_round(number, repeats)
+            times.append(elapsed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # The median round is what the gate compares; the fastest is recorded too
+    seconds = statistics.median(times)
+    return {
+        'unit': benchmark.unit,
+        'units': units,
+        'repeats': repeats,
+        'rounds': rounds,
+        'seconds': round(seconds, 6),
+        'minSeconds': round(min(times), 6),
+        'secondsPerUnit': round(seconds / units, 9) if units else None,
+        'throughput': round(units / seconds, 3) if seconds else None,
+        'peakRss': peak_rss(),
+    }
+
+
+def run_isolated(benchmark, rounds):
+    """Measure a benchmark in a fresh interpreter so peak RSS is its own."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'result.json'
+        process = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), '--child', benchmark.name,
+             '--rounds', str(rounds), '--child-output', str(output)],
+            cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if process.returncode or not output.exists():
+            tail = process.stderr.strip().splitlines()[-1:] or ['no output']
+            return {'error': f'exit {process.returncode}: {tail[0]}'}
+        return json.loads(output.read_text(encoding='utf-8'))
+
+
+def machine():
+    return {'platform': platform.platform(), 'system': platform.system(), 'machine': platform.machine(),
+            'python': platform.python_version(), 'cpus': os.cpu_count()}
+
+
+def same_machine(recorded):
+    """Whether timings recorded on another machine description compare with this one."""
+    current = machine()
+    return bool(recorded) and all(recorded.get(key) == current[key] for key in MACHINE_KEYS)
+
+
+def load_baselines(path=BASELINES_PATH):
+    """Recorded baselines; none when the file is missing or from another version of the runner."""
+    if Path(path).exists():
+        baselines = read_json(path)
+        if baselines.get('version') == BASELINES_VERSION:
+            return baselines
+        print(f'⚠️  {path} is baseline version {baselines.get("version")}, '
+              f'this runner records version {BASELINES_VERSION}: ignored')
+    return {'version': BASELINES_VERSION, 'machine': None, 'benchmarks': {}}
+
+
+def threshold_for(baseline, threshold=DEFAULT_THRESHOLD):
+    """Allowed slowdown of a benchmark: threshold, or more when its runs spread more."""
+    return max(threshold, SPREAD_MARGIN * baseline.get('spread', 0.0))
+
+
+def combine_runs(runs):
+    """One baseline from the results of separate runs: the median run, with the spread between runs."""
+    ordered = sorted(runs, key=lambda result: result['secondsPerUnit'])
+    baseline = dict(ordered[len(ordered) // 2])
+    baseline['runs'] = len(runs)
+    baseline['spread'] = round(ordered[-1]['secondsPerUnit'] / ordered[0]['secondsPerUnit'] - 1, 4)
+    baseline['peakRss'] = max(result['peakRss'] for result in runs)
+    return baseline
+
+
+def compare(results, baselines, threshold=DEFAULT_THRESHOLD, timings=True):
+    """{name: [regression messages]} for results worse than their baseline."""
+    regressions = {}
+    for name, result in results.items():
+        baseline = baselines['benchmarks'].get(name)
+        if baseline is None or 'secondsPerUnit' not in result:
+            continue
+        problems = []
+        time_ratio = result['secondsPerUnit'] / baseline['secondsPerUnit']
+        if timings and time_ratio > 1 + threshold_for(baseline, threshold):
+            problems.append(f'{(time_ratio - 1) * 100:.0f}% slower per {result["unit"][:-1]}')
+        rss_ratio = result['peakRss'] / baseline['peakRss']
+        if rss_ratio > 1 + threshold:
+            problems.append(f'peak RSS {(rss_ratio - 1) * 100:.0f}% higher')
+        if problems:
+            regressions[name] = problems
+    return regressions
+
+
+def _change(value, baseline):
+    if baseline is None:
+        return '     new'
+    return f'{(value / baseline - 1) * 100:+7.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the asset pipeline against tracked baselines.')
+    parser.add_argument('patterns', nargs='*', help='benchmark names or patterns (default: all)')
+    parser.add_argument('--rounds', type=int, help=f'timed rounds per benchmark (default: {DEFAULT_ROUNDS})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown or RSS growth, e.g. 0.2 for 20%%')
+    parser.add_argument('--baselines', default=str(BASELINES_PATH))
+    parser.add_argument('--update', action='store_true', help='write the results as the new baselines')
+    parser.add_argument('--update-runs', type=int, default=UPDATE_RUNS,
+                        help=f'separate runs per benchmark for --update, to measure their spread '
+                             f'(default: {UPDATE_RUNS})')
+    parser.add_argument('--json', help='write the results here')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--child-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        benchmark = _BY_NAME[args.child]
+        result = measure(benchmark, args.rounds or benchmark.rounds)
+        Path(args.child_output).write_text(json.dumps(result), encoding='utf-8')
+        return
+
+    selected = [b for b in BENCHMARKS
+                if not args.patterns or any(fnmatch.fnmatch(b.name, p) for p in args.patterns)]
+    if not selected:
+        print(f'❌ No benchmark matches {" ".join(args.patterns)}')
+        sys.exit(1)
+    if args.list:
+        for benchmark in selected:
+            needs = f'  (needs {", ".join(benchmark.needs)})' if benchmark.needs else ''
+            print(f'{benchmark.name:22s} {benchmark.unit}{needs}')
+        return
+
+    baselines = load_baselines(args.baselines)
+    recorded = baselines.get('machine')
+    timings = not recorded or same_machine(recorded)
+    if recorded:
+        print(f'Baselines from {recorded["platform"]}, Python {recorded["python"]}, {recorded["cpus"]} CPUs')
+    if not timings:
+        print(f'⚠️  Baselines were recorded on {baselines["machine"]["platform"]} '
+              f'({baselines["machine"]["cpus"]} CPUs): only peak RSS is gated, '
+              f'run with --update to record timings for this machine')
+
+    print('=' * 70)
+    print(f'Pipeline benchmarks ({len(selected)})')
+    print('=' * 70)
+    print(f'  {"benchmark":22s} {"throughput":>23s} {"vs base":>8s} {"peak RSS":>10s} {"vs base":>8s}')
+    results = {}
+    skipped = {}
+    for benchmark in selected:
+        runs = [run_isolated(benchmark, args.rounds or benchmark.rounds)
+                for _ in range(args.update_runs if args.update else 1)]
+        failed = [run for run in runs if 'skipped' in run or 'error' in run]
+        result = failed[0] if failed else combine_runs(runs) if args.update else runs[0]
+        if 'skipped' in result or 'error' in result:
+            skipped[benchmark.name] = result.get('skipped') or result['error']
+            marker = '-' if 'skipped' in result else '❌'
+            print(f'  {benchmark.name:22s} {marker} {skipped[benchmark.name]}')
+            continue
+        results[benchmark.name] = result
+        baseline = baselines['benchmarks'].get(benchmark.name, {})
+        base_rate = 1 / baseline['secondsPerUnit'] if baseline else None
+        print(f'  {benchmark.name:22s} {result["throughput"]:10.1f} {benchmark.unit + "/s":12s} '
+              f'{_change(1 / result["secondsPerUnit"], base_rate)} '
+              f'{result["peakRss"] / 1024 / 1024:7.1f} MB '
+              f'{_change(result["peakRss"], baseline.get("peakRss"))}')
+
+    unrecorded = [b.name for b in selected if b.name not in baselines['benchmarks']]
+
+    if args.json:
+        write_json(Path(args.json), {'machine': machine(), 'benchmarks': results, 'skipped': skipped,
+                                     'noBaseline': unrecorded})
+        print(f'\n✓ Results written to {args.json}')
+
+    if args.update:
+        if skipped:
+            print(f'\n❌ Baselines not written: {", ".join(skipped)} did not run on this machine. '
+                  f'Record every stage on one machine (with poppler and PyMuPDF installed)')
+            sys.exit(1)
+        if baselines['benchmarks'] and not same_machine(recorded) and len(results) < len(BENCHMARKS):
+            print('\n❌ Baselines not written: the others were recorded on another machine; '
+                  'update all benchmarks at once')
+            sys.exit(1)
+        baselines['version'] = BASELINES_VERSION
+        baselines['machine'] = machine()
+        baselines['benchmarks'].update(results)
+        baselines['benchmarks'] = dict(sorted(baselines['benchmarks'].items()))
+        write_json(Path(args.baselines), baselines)
+        print(f'\n✓ {len(results)} baselines written to {args.baselines}')
+        return
+
+    errors = {name: reason for name, reason in skipped.items() if not reason.startswith('needs ')}
+    # A stage without a baseline is not gated at all, so it fails the gate
+    errors.update((name, 'no baseline: record one with --update on the machine the gate runs on')
+                  for name in unrecorded if name not in skipped)
+    for name in unrecorded:
+        if name in skipped:
+            print(f'\n⚠️  {name} has no baseline and did not run here ({skipped[name]})')
+    regressions = compare(results, baselines, args.threshold, timings)
+    if regressions or errors:
+        print(f'\n❌ {len(regressions)} regressions, {len(errors)} errors:')
+        for name, problems in regressions.items():
+            print(f'  {name:22s} {", ".join(problems)}')
+        for name, reason in errors.items():
+            print(f'  {name:22s} {reason}')
+        sys.exit(1)
+    print(f'\n✓ No regressions beyond {args.threshold * 100:.0f}% (or twice the recorded spread)')
+
+
+if __name__ == '__main__':
+    main()
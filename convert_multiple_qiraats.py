@@ -7,188 +7,51 @@ Converts PDF files for different qiraats to web-compatible JPG images
 import os
 import sys
 from pathlib import Path
-from pdf2image import convert_from_path
 from PIL import Image
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent / 'tools'))
+from qiraat_registry import RIWAYAT, resolve_id
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Configuration for all 20 Qiraats (10 Qaris × 2 Rawis each)
+# Configuration for all 20 Qiraats (10 Qaris × 2 Rawis each), from tools/qiraat_registry.py
 QIRAATS_CONFIG = {
-    # Nafi' from Madinah
-    'nafi_qalun': {
-        'pdf_path': 'assets/pdfs/Nafi3/Qalun.pdf',
-        'output_dir': 'assets/images/qiraats/nafi_qalun',
-        'display_name': 'Qalun \'an Nafi\'',
-        'qari': 'Nafi\'',
-        'rawi': 'Qalun'
-    },
-    'nafi_warsh': {
-        'pdf_path': 'assets/pdfs/Nafi3/Warsh.pdf',
-        'output_dir': 'assets/images/qiraats/nafi_warsh',
-        'display_name': 'Warsh \'an Nafi\'',
-        'qari': 'Nafi\'',
-        'rawi': 'Warsh'
-    },
-    
-    # Ibn Kathir from Makkah
-    'ibn_kathir_bazzi': {
-        'pdf_path': 'assets/pdfs/Ibn_Kathir/Al-Bazzi.pdf',
-        'output_dir': 'assets/images/qiraats/ibn_kathir_bazzi',
-        'display_name': 'Al-Bazzi \'an Ibn Kathir',
-        'qari': 'Ibn Kathir',
-        'rawi': 'Al-Bazzi'
-    },
-    'ibn_kathir_qunbul': {
-        'pdf_path': 'assets/pdfs/Ibn_Kathir/Qunbul.pdf',
-        'output_dir': 'assets/images/qiraats/ibn_kathir_qunbul',
-        'display_name': 'Qunbul \'an Ibn Kathir',
-        'qari': 'Ibn Kathir',
-        'rawi': 'Qunbul'
-    },
-    
-    # Abu 'Amr from Basra
-    'abu_amr_duri': {
-        'pdf_path': 'assets/pdfs/Abu_Amr/Ad-Duri.pdf',
-        'output_dir': 'assets/images/qiraats/abu_amr_duri',
-        'display_name': 'Ad-Duri \'an Abu \'Amr',
-        'qari': 'Abu \'Amr',
-        'rawi': 'Ad-Duri'
-    },
-    'abu_amr_sussi': {
-        'pdf_path': 'assets/pdfs/Abu_Amr/As-Sussi.pdf',
-        'output_dir': 'assets/images/qiraats/abu_amr_sussi',
-        'display_name': 'As-Sussi \'an Abu \'Amr',
-        'qari': 'Abu \'Amr',
-        'rawi': 'As-Sussi'
-    },
-    
-    # Ibn 'Amir from Damascus
-    'ibn_amir_hisham': {
-        'pdf_path': 'assets/pdfs/Ibn_Amir/Hisham.pdf',
-        'output_dir': 'assets/images/qiraats/ibn_amir_hisham',
-        'display_name': 'Hisham \'an Ibn \'Amir',
-        'qari': 'Ibn \'Amir',
-        'rawi': 'Hisham'
-    },
-    'ibn_amir_dhakwan': {
-        'pdf_path': 'assets/pdfs/Ibn_Amir/Ibn_Dhakwan.pdf',
-        'output_dir': 'assets/images/qiraats/ibn_amir_dhakwan',
-        'display_name': 'Ibn Dhakwan \'an Ibn \'Amir',
-        'qari': 'Ibn \'Amir',
-        'rawi': 'Ibn Dhakwan'
-    },
-    
-    # 'Asim from Kufa
-    'asim_shuba': {
-        'pdf_path': 'assets/pdfs/Asim/Shu3ba.pdf',
-        'output_dir': 'assets/images/qiraats/asim_shuba',
-        'display_name': 'Shu\'ba \'an \'Asim',
-        'qari': '\'Asim',
-        'rawi': 'Shu\'ba'
-    },
-    'asim_hafs': {
-        'pdf_path': 'assets/pdfs/Asim/Hafs.pdf',
-        'output_dir': 'assets/images/qiraats/asim_hafs',
-        'display_name': 'Hafs \'an \'Asim',
-        'qari': '\'Asim',
-        'rawi': 'Hafs'
-    },
-    
-    # Hamzah from Kufa
-    'hamzah_khalaad': {
-        'pdf_path': 'assets/pdfs/Hamzah/Khalaad.pdf',
-        'output_dir': 'assets/images/qiraats/hamzah_khalaad',
-        'display_name': 'Khalaad \'an Hamzah',
-        'qari': 'Hamzah',
-        'rawi': 'Khalaad'
-    },
-    'hamzah_khalaf': {
-        'pdf_path': 'assets/pdfs/Hamzah/Khalaf.pdf',
-        'output_dir': 'assets/images/qiraats/hamzah_khalaf',
-        'display_name': 'Khalaf \'an Hamzah',
-        'qari': 'Hamzah',
-        'rawi': 'Khalaf'
-    },
-    
-    # Al-Kisa'i from Kufa
-    'kisai_abu_harith': {
-        'pdf_path': 'assets/pdfs/Al-Kisai/Abu_Al-Harith.pdf',
-        'output_dir': 'assets/images/qiraats/kisai_abu_harith',
-        'display_name': 'Abu al-Harith \'an al-Kisa\'i',
-        'qari': 'Al-Kisa\'i',
-        'rawi': 'Abu al-Harith'
-    },
-    'kisai_duri': {
-        'pdf_path': 'assets/pdfs/Al-Kisai/Ad-Duri.pdf',
-        'output_dir': 'assets/images/qiraats/kisai_duri',
-        'display_name': 'Ad-Duri \'an al-Kisa\'i',
-        'qari': 'Al-Kisa\'i',
-        'rawi': 'Ad-Duri'
-    },
-    
-    # Abu Ja'far from Madinah
-    'abu_jafar_ibn_wardan': {
-        'pdf_path': 'assets/pdfs/Abu_Jafar/Ibn_Wardaan.pdf',
-        'output_dir': 'assets/images/qiraats/abu_jafar_ibn_wardan',
-        'display_name': 'Ibn Wardan \'an Abu Ja\'far',
-        'qari': 'Abu Ja\'far',
-        'rawi': 'Ibn Wardan'
-    },
-    'abu_jafar_ibn_jammaz': {
-        'pdf_path': 'assets/pdfs/Abu_Jafar/Ibn_Jammaaz.pdf',
-        'output_dir': 'assets/images/qiraats/abu_jafar_ibn_jammaz',
-        'display_name': 'Ibn Jammaz \'an Abu Ja\'far',
-        'qari': 'Abu Ja\'far',
-        'rawi': 'Ibn Jammaz'
-    },
-    
-    # Ya'qub from Basra
-    'yaqub_ruways': {
-        'pdf_path': 'assets/pdfs/Ya3qub/Ruwais.pdf',
-        'output_dir': 'assets/images/qiraats/yaqub_ruways',
-        'display_name': 'Ruways \'an Ya\'qub',
-        'qari': 'Ya\'qub',
-        'rawi': 'Ruways'
-    },
-    'yaqub_rawh': {
-        'pdf_path': 'assets/pdfs/Ya3qub/Rawh.pdf',
-        'output_dir': 'assets/images/qiraats/yaqub_rawh',
-        'display_name': 'Rawh \'an Ya\'qub',
-        'qari': 'Ya\'qub',
-        'rawi': 'Rawh'
-    },
-    
-    # Khalaf al-'Ashir
-    'khalaf_ishaq': {
-        'pdf_path': 'assets/pdfs/Khalaf/Ishaq.pdf',
-        'output_dir': 'assets/images/qiraats/khalaf_ishaq',
-        'display_name': 'Ishaq \'an Khalaf',
-        'qari': 'Khalaf',
-        'rawi': 'Ishaq'
-    },
-    'khalaf_idris': {
-        'pdf_path': 'assets/pdfs/Khalaf/Idris.pdf',
-        'output_dir': 'assets/images/qiraats/khalaf_idris',
-        'display_name': 'Idris \'an Khalaf',
-        'qari': 'Khalaf',
-        'rawi': 'Idris'
+    riwaya.id: {
+        'pdf_path': f'assets/pdfs/{riwaya.pdf}',
+        'output_dir': f'assets/images/qiraats/{riwaya.id}',
+        'display_name': riwaya.display_name,
+        'qari': riwaya.qari,
+        'rawi': riwaya.rawi
     }
+    for riwaya in RIWAYAT
 }
 
 # Image settings
 DPI = 150  # Good balance between quality and file size
 IMAGE_QUALITY = 85  # JPEG quality (1-100)
 IMAGE_FORMAT = 'JPEG'
+# Progressive scans give a readable full-page preview after a few KB on slow links
+IMAGE_PROGRESSIVE = True
+# Optional high-DPI tile pyramids for zooming (--deep-zoom, see tools/deep_zoom.py)
+DEEP_ZOOM_DPI = 400
 
 def ensure_directory(path):
     """Create directory if it doesn't exist"""
     Path(path).mkdir(parents=True, exist_ok=True)
     logger.info(f"Directory ensured: {path}")
 
-def convert_qiraat_pdf(qiraat_key, config):
+def build_deep_zoom(qiraat_key, config):
+    """Render the qiraat PDF at DEEP_ZOOM_DPI into dist/tiles/<qiraat>"""
+    from deep_zoom import build_from_pdf
+
+    logger.info(f"Building deep-zoom tiles at {DEEP_ZOOM_DPI} DPI...")
+    built = build_from_pdf(qiraat_key, config['pdf_path'], dpi=DEEP_ZOOM_DPI, progress=logger.info)
+    logger.info(f"Deep-zoom tiles built for {built} pages")
+
+def convert_qiraat_pdf(qiraat_key, config, deep_zoom=False):
     """Convert a single qiraat PDF to images"""
     pdf_path = config['pdf_path']
     output_dir = config['output_dir']
@@ -207,29 +70,36 @@ def convert_qiraat_pdf(qiraat_key, config):
     ensure_directory(output_dir)
     
     try:
+        # Imported here so the settings above can be imported without poppler
+        from pdf2image import convert_from_path, pdfinfo_from_path
+
         # Convert PDF to images
         logger.info("Converting PDF pages to images...")
-        pages = convert_from_path(pdf_path, dpi=DPI)
-        total_pages = len(pages)
+        total_pages = pdfinfo_from_path(pdf_path)['Pages']
         logger.info(f"Found {total_pages} pages")
         
         # Check if we have the expected 606 pages
         if total_pages != 606:
             logger.warning(f"Expected 606 pages, got {total_pages} pages")
         
-        # Save each page as JPG
-        for i, page in enumerate(pages, 1):
+        # Render and save one page at a time, so only one page is held in memory
+        for i in range(1, total_pages + 1):
+            page = convert_from_path(pdf_path, dpi=DPI, first_page=i, last_page=i)[0]
             # Format page number with leading zeros (001, 002, etc.)
             page_num = f"{i:03d}"
             output_path = os.path.join(output_dir, f"page_{page_num}.jpg")
             
             # Convert and save with optimization
-            page.save(output_path, IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True)
+            page.save(output_path, IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True,
+                      progressive=IMAGE_PROGRESSIVE)
             
             # Progress indicator
             if i % 50 == 0 or i == total_pages:
                 logger.info(f"Processed {i}/{total_pages} pages ({i/total_pages*100:.1f}%)")
         
+        if deep_zoom:
+            build_deep_zoom(qiraat_key, config)
+        
         logger.info(f"✅ Successfully converted {display_name}: {total_pages} pages")
         return True
         
@@ -237,7 +107,7 @@ def convert_qiraat_pdf(qiraat_key, config):
         logger.error(f"❌ Error converting {display_name}: {str(e)}")
         return False
 
-def convert_all_qiraats():
+def convert_all_qiraats(deep_zoom=False):
     """Convert all configured qiraats"""
     logger.info("=== Starting ALL Qiraats Conversion (20 Recitations) ===")
     logger.info("Converting 10 Qaris × 2 Rawis = 20 total recitations")
@@ -260,7 +130,7 @@ def convert_all_qiraats():
         for qiraat_key, config in qiraat_list:
             logger.info(f"\n--- Converting {config['rawi']} 'an {config['qari']} ---")
             
-            if convert_qiraat_pdf(qiraat_key, config):
+            if convert_qiraat_pdf(qiraat_key, config, deep_zoom):
                 successful += 1
             else:
                 failed += 1
@@ -277,9 +147,9 @@ def convert_all_qiraats():
     
     return successful, failed
 
-def convert_single_qiraat(qiraat_name):
+def convert_single_qiraat(qiraat_name, deep_zoom=False):
     """Convert a single qiraat by name"""
-    qiraat_name = qiraat_name.lower()
+    qiraat_name = resolve_id(qiraat_name.lower())
     
     if qiraat_name not in QIRAATS_CONFIG:
         logger.error(f"Unknown qiraat: {qiraat_name}")
@@ -287,7 +157,7 @@ def convert_single_qiraat(qiraat_name):
         return False
     
     config = QIRAATS_CONFIG[qiraat_name]
-    return convert_qiraat_pdf(qiraat_name, config)
+    return convert_qiraat_pdf(qiraat_name, config, deep_zoom)
 
 def main():
     """Main function"""
@@ -295,15 +165,19 @@ def main():
     print("📖 Converting All 20 Qiraats (10 Qaris × 2 Rawis)")
     print("=" * 60)
     
+    # --deep-zoom also renders high-DPI tile pyramids
+    deep_zoom = '--deep-zoom' in sys.argv[1:]
+    names = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
     # Check if specific qiraat was requested
-    if len(sys.argv) > 1:
-        qiraat_name = sys.argv[1]
+    if names:
+        qiraat_name = names[0]
         logger.info(f"Converting single qiraat: {qiraat_name}")
-        success = convert_single_qiraat(qiraat_name)
+        success = convert_single_qiraat(qiraat_name, deep_zoom)
         sys.exit(0 if success else 1)
     
     # Convert all qiraats
-    successful, failed = convert_all_qiraats()
+    successful, failed = convert_all_qiraats(deep_zoom)
     
     # Exit with appropriate code
     sys.exit(0 if failed == 0 else 1)
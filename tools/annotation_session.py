@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Annotation sessions for the ayah bounds annotator.
+
+A session is an append-only journal (JSON Lines, one file per riwaya in
+tools/sessions/) of every rectangle added or undone in the annotator. Each
+entry is flushed and fsynced before the annotator moves on, so a crash or a
+closed window loses at most the rectangle being drawn. Opening the session
+replays the journal and rewrites it compacted.
+
+Finished pages are merged straight into assets/json/bounds/<qiraat>/:
+annotated ayahs replace the positions of the same ayahs on the corpus page,
+other ayahs on the page are kept, and the result is checked with
+validate_bounds before it is written atomically through bounds_model: the
+page's own checks, then the riwaya-wide duplicate, order and coverage checks
+with the merged page in place. Only problems of the page itself, of the
+merged ayahs, or that the merge adds to the riwaya reject it.
+
+Usage:
+    python3 annotation_session.py nafi_warsh                 # show session status
+    python3 annotation_session.py nafi_warsh --merge 3-50    # merge annotated pages
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from ayah_count_data import get_ayah_count
+from bounds_model import BOUNDS_DIR, atomic_write, read_json, write_json
+from validate_bounds import check_page, validate_qiraat
+
+SESSION_DIR = Path(__file__).parent / 'sessions'
+
+# validate_bounds codes that describe the whole riwaya rather than one page
+CORPUS_CODES = ('unknown_ayah', 'duplicate', 'out_of_order', 'gap')
+
+
+class AnnotationSession:
+    """Journaled {page: [annotation]} state of one riwaya's annotation campaign."""
+
+    def __init__(self, qiraat_id, session_dir=SESSION_DIR):
+        self.qiraat_id = qiraat_id
+        self.path = Path(session_dir) / f'{qiraat_id}.jsonl'
+        self.pages = {}
+        self.merged = set()
+        self._file = None
+        self._open()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # torn last line from a crash
+                    self._apply(entry)
+            self._compact()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _apply(self, entry):
+        page = entry['page']
+        annotations = self.pages.setdefault(page, [])
+        if entry['op'] == 'add':
+            annotations.append(entry['annotation'])
+            self.merged.discard(page)
+        elif entry['op'] == 'undo' and annotations:
+            annotations.pop()
+            self.merged.discard(page)
+        elif entry['op'] == 'merged':
+            self.merged.add(page)
+
+    def _entries(self):
+        for page in sorted(self.pages):
+            for annotation in self.pages[page]:
+                yield {'op': 'add', 'page': page, 'annotation': annotation}
+            if page in self.merged:
+                yield {'op': 'merged', 'page': page}
+
+    def _compact(self):
+        with atomic_write(self.path) as f:
+            for entry in self._entries():
+                f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def _record(self, entry):
+        self._apply(entry)
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def annotations(self, page):
+        """The live annotation list of a page (the annotator draws from it)."""
+        return self.pages.setdefault(page, [])
+
+    def add(self, page, annotation):
+        self._record({'op': 'add', 'page': page, 'annotation': annotation})
+
+    def undo(self, page):
+        self._record({'op': 'undo', 'page': page})
+
+    def mark_merged(self, page):
+        self._record({'op': 'merged', 'page': page})
+
+    def annotated_pages(self, first=None, last=None):
+        return [p for p in sorted(self.pages) if self.pages[p]
+                and (first is None or p >= first) and (last is None or p <= last)]
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def group_annotations(annotations):
+    """Annotator rectangles -> bounds ayah dicts, sorted by (surah, ayah)."""
+    ayah_groups = {}
+    for ann in annotations:
+        ayah_groups.setdefault((ann['surah'], ann['ayah']), []).append({
+            'x': ann['x'],
+            'y': ann['y'],
+            'width': ann['width'],
+            'height': ann['height'],
+            'lineNumber': ann['lineNumber'],
+        })
+    return [{'surahNumber': surah, 'ayahNumber': ayah, 'positions': positions}
+            for (surah, ayah), positions in sorted(ayah_groups.items())]
+
+
+def merge_page(qiraat_id, page_num, annotations, bounds_dir=BOUNDS_DIR, dry_run=False):
+    """
+    Merge a page's annotations into the bounds corpus.
+
+    Returns (path, issues). Nothing is written when issues is not empty.
+    """
+    path = Path(bounds_dir) / qiraat_id / f'page_{page_num}.json'
+    if path.exists():
+        page_data = read_json(path)
+    else:
+        page_data = {'pageNumber': page_num, 'qiraatId': qiraat_id, 'ayahs': []}
+
+    annotated = {(a['surahNumber'], a['ayahNumber']): a for a in group_annotations(annotations)}
+    ayahs = {(a['surahNumber'], a['ayahNumber']): a for a in page_data.get('ayahs', [])}
+    ayahs.update(annotated)
+    page_data['ayahs'] = [ayahs[key] for key in sorted(ayahs)]
+
+    # Known issues of ayahs nobody touched (placeholder geometry) do not block a merge
+    issues = []
+    check_page(page_data, qiraat_id, page_num, issues)
+    issues = [i for i in issues if i['surah'] is None or (i['surah'], i['ayah']) in annotated]
+    for surah, ayah in annotated:
+        if not 1 <= surah <= 114 or not 1 <= ayah <= get_ayah_count(surah, qiraat_id):
+            issues.append({
+                'qiraat': qiraat_id,
+                'page': page_num,
+                'code': 'unknown_ayah',
+                'surah': surah,
+                'ayah': ayah,
+                'message': f'{surah}:{ayah} does not exist in this counting system',
+            })
+
+    if not issues:
+        issues = corpus_issues(qiraat_id, page_num, page_data, bounds_dir)
+
+    if not issues and not dry_run:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, page_data)
+    return path, issues
+
+
+def corpus_issues(qiraat_id, page_num, page_data, bounds_dir=BOUNDS_DIR):
+    """Riwaya-wide issues (duplicates, order, coverage) the merged page would add."""
+    def corpus(overrides=None):
+        report = validate_qiraat(qiraat_id, bounds_dir, overrides)
+        return [i for i in report['issues'] if i['code'] in CORPUS_CODES]
+
+    def key(issue):
+        return issue['code'], issue['page'], issue['surah'], issue['ayah']
+
+    before = {key(i) for i in corpus()}
+    return [i for i in corpus({page_num: page_data}) if key(i) not in before]
+
+
+def _page_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or merge an annotation session.')
+    parser.add_argument('qiraat')
+    parser.add_argument('--merge', type=_page_range, metavar='A-B', help='merge annotated pages in this range')
+    parser.add_argument('--bounds-dir', default=str(BOUNDS_DIR))
+    parser.add_argument('--session-dir', default=str(SESSION_DIR))
+    parser.add_argument('--dry-run', action='store_true', help='validate without writing')
+    args = parser.parse_args()
+
+    session = AnnotationSession(args.qiraat, args.session_dir)
+    pages = session.annotated_pages(*(args.merge or (None, None)))
+
+    print('=' * 70)
+    print(f'Annotation session: {args.qiraat} ({session.path})')
+    print('=' * 70)
+    for page in pages:
+        state = 'merged' if page in session.merged else 'pending'
+        print(f'  page {page:3d}: {len(session.pages[page]):3d} rectangles, {state}')
+
+    if not args.merge:
+        return
+
+    failed = 0
+    for page in pages:
+        path, issues = merge_page(args.qiraat, page, session.pages[page], args.bounds_dir, args.dry_run)
+        if issues:
+            failed += 1
+            for issue in issues:
+                print(f'❌ page {page}: [{issue["code"]}] {issue["message"]}')
+        elif not args.dry_run:
+            session.mark_merged(page)
+    session.close()
+
+    verb = 'validated' if args.dry_run else 'merged'
+    print(f'\n✓ {len(pages) - failed} pages {verb}, {failed} rejected')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
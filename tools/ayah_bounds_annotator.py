@@ -7,23 +7,160 @@ Usage:
 2. For each page, annotate ayah boundaries
 3. Export to JSON format compatible with the app
 
+Pages of the loaded image's folder are decoded ahead of time on a background
+thread into a bounded LRU cache, so Prev/Next paging does not wait on PIL.
+The shown page's full-resolution scan is decoded the same way for zooming.
+
+Assist mode detects text lines and ayah-end markers (line_detection.py) and
+suggests one rectangle per ayah per line, with its lineNumber. Accept the
+suggestions with Enter or discard them with Escape and draw by hand.
+
+Every rectangle is journaled to tools/sessions/<qiraat>.jsonl as it is drawn
+(annotation_session.py), so closing the window loses nothing. Prev/Next stay
+inside the Range field, and Merge / Merge Range write the annotated pages
+straight into assets/json/bounds/<qiraat>/ after validation.
+
 Requirements:
 - Python 3.8+
 - PIL (Pillow)
+- NumPy
 - tkinter (usually comes with Python)
 
 Install dependencies:
-pip install pillow
+pip install pillow numpy
 
 Run:
 python ayah_bounds_annotator.py
 """
 
-import json
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
 import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from annotation_session import AnnotationSession, group_annotations, merge_page
+from ayah_count_data import get_ayah_count
+from bounds_model import write_json
+from line_detection import detect_lines, ink_mask, suggest_rectangles
+
+# Largest size a page is shown at
+DISPLAY_SIZE = (1200, 1600)
+
+# Decoded pages kept in memory (about 20 display-sized RGB pages)
+IMAGE_CACHE_BYTES = 128 * 1024 * 1024
+
+# Pages decoded ahead of time around the current one, most likely first
+PREFETCH_OFFSETS = (1, -1, 2)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Zoomed pages are rendered from the full-resolution scan in square tiles;
+# only tiles inside the visible viewport are created
+TILE_SIZE = 512
+TILE_CACHE_SIZE = 96
+ZOOM_STEP = 1.25
+MAX_ZOOM = 8.0
+
+
+def _image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def index_page_images(directory):
+    """Map page number -> image path for page_001.jpg / page_1.png / 001.png style names."""
+    pages = {}
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        numbers = re.findall(r'\d+', stem)
+        if ext.lower() in IMAGE_EXTENSIONS and numbers:
+            pages[int(numbers[-1])] = os.path.join(directory, name)
+    return pages
+
+
+class PageImageCache:
+    """
+    Bounded LRU cache of decoded, display-sized page images, filled by a
+    background prefetch thread.
+
+    Decoding and resizing happen off the Tk thread. ImageTk.PhotoImage must be
+    created on the Tk thread, so the cache holds PIL images and the annotator
+    converts only the page it shows. Full-resolution scans (for zooming) share
+    the same cache and byte budget under their own key.
+    """
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES, display_size=DISPLAY_SIZE):
+        self.max_bytes = max_bytes
+        self.display_size = display_size
+        self._images = OrderedDict()  # (path, full) -> PIL image, least recently used first
+        self._bytes = 0
+        self._wanted = []  # (path, full) keys to prefetch, most urgent first
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, name="page-prefetch", daemon=True)
+        self._thread.start()
+
+    def _decode(self, key):
+        path, full = key
+        image = Image.open(path)
+        if full:
+            return image.convert("RGB")
+        image.draft("RGB", self.display_size)  # lets JPEG decode at reduced size
+        image = image.convert("RGB")
+        image.thumbnail(self.display_size, Image.Resampling.LANCZOS)
+        return image
+
+    def _store(self, key, image):
+        # Caller holds the lock
+        if key in self._images:
+            self._images.move_to_end(key)
+            return
+        self._images[key] = image
+        self._bytes += _image_bytes(image)
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= _image_bytes(evicted)
+
+    def get(self, path, full=False):
+        """Return the display-sized (or full-resolution) image for path, decoding it now if it is not cached."""
+        key = (path, full)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        image = self._decode(key)
+        with self._lock:
+            self._store(key, image)
+        return image
+
+    def prefetch(self, paths, full=()):
+        """Replace the prefetch queue with paths, then full-resolution paths (earlier ones are decoded first)."""
+        keys = [(p, False) for p in paths] + [(p, True) for p in full]
+        with self._lock:
+            self._wanted = [key for key in keys if key not in self._images]
+            self._wake.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._wanted:
+                    self._wake.wait()
+                key = self._wanted.pop(0)
+                if key in self._images:
+                    continue
+            try:
+                image = self._decode(key)
+            except Exception as e:
+                # A bad file must not kill the prefetch thread; get() reports it when shown
+                print(f"⚠️  Could not prefetch {key[0]}: {e}", file=sys.stderr)
+                continue
+            with self._lock:
+                self._store(key, image)
 
 
 class AyahBoundsAnnotator:
@@ -36,10 +173,27 @@ class AyahBoundsAnnotator:
         self.photo = None
         self.canvas = None
         
+        self.image_cache = PageImageCache()
+        self.page_images = {}  # page number -> image path in the loaded folder
+        
+        # Canvas state: one image item at fit zoom, tiles when zoomed in,
+        # and one (rectangle, label) item pair per annotation
+        self.zoom = 1.0
+        self.full_image = None
+        self.image_item = None
+        self.tile_items = {}  # (column, row) -> canvas item
+        self.tile_photos = OrderedDict()  # (zoom, column, row) -> PhotoImage of this page, LRU
+        self.annotation_items = []  # parallel to self.annotations
+        
+        # Assist mode: detected line bands of the shown page and pending suggestions
+        self.line_bands = []
+        self.suggestions = []
+        
         self.qiraat_id = "asim_hafs"
         self.page_number = 1
         self.current_ayah = {"surah": 1, "ayah": 1}
-        self.annotations = []
+        self.annotations = []  # the shown page's list in the session
+        self.session = None  # AnnotationSession of the riwaya being annotated
         
         self.rect_start = None
         self.current_rect = None
@@ -54,6 +208,13 @@ class AyahBoundsAnnotator:
         # Load image button
         tk.Button(control_frame, text="Load Image", command=self.load_image).pack(side=tk.LEFT, padx=5)
         
+        # Page navigation
+        tk.Button(control_frame, text="◀ Prev", command=lambda: self.step_page(-1)).pack(side=tk.LEFT, padx=2)
+        tk.Button(control_frame, text="Next ▶", command=lambda: self.step_page(1)).pack(side=tk.LEFT, padx=2)
+        tk.Label(control_frame, text="Range:").pack(side=tk.LEFT, padx=2)
+        self.range_entry = tk.Entry(control_frame, width=8)
+        self.range_entry.pack(side=tk.LEFT, padx=2)
+        
         # Qiraat ID
         tk.Label(control_frame, text="Qiraat ID:").pack(side=tk.LEFT, padx=5)
         self.qiraat_entry = tk.Entry(control_frame, width=15)
@@ -77,12 +238,28 @@ class AyahBoundsAnnotator:
         self.ayah_entry.insert(0, "1")
         self.ayah_entry.pack(side=tk.LEFT, padx=5)
         
+        # Zoom
+        tk.Button(control_frame, text="−", command=lambda: self.set_zoom(self.zoom / ZOOM_STEP)).pack(side=tk.LEFT, padx=2)
+        tk.Button(control_frame, text="Fit", command=lambda: self.set_zoom(1.0)).pack(side=tk.LEFT, padx=2)
+        tk.Button(control_frame, text="+", command=lambda: self.set_zoom(self.zoom * ZOOM_STEP)).pack(side=tk.LEFT, padx=2)
+        
+        # Assist mode
+        self.assist_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Assist", variable=self.assist_var,
+                       command=self.toggle_assist).pack(side=tk.LEFT, padx=5)
+        tk.Button(control_frame, text="Suggest", command=self.suggest).pack(side=tk.LEFT, padx=2)
+        tk.Button(control_frame, text="Accept", command=self.accept_suggestions).pack(side=tk.LEFT, padx=2)
+        
         # Undo button
         tk.Button(control_frame, text="Undo", command=self.undo_last).pack(side=tk.LEFT, padx=5)
         
         # Export button
         tk.Button(control_frame, text="Export JSON", command=self.export_json).pack(side=tk.LEFT, padx=5)
         
+        # Merge into assets/json/bounds
+        tk.Button(control_frame, text="Merge", command=self.merge_current).pack(side=tk.LEFT, padx=2)
+        tk.Button(control_frame, text="Merge Range", command=self.merge_range).pack(side=tk.LEFT, padx=2)
+        
         # Canvas for image and drawing
         self.canvas = tk.Canvas(self.root, bg="gray")
         self.canvas.pack(fill=tk.BOTH, expand=True)
@@ -91,6 +268,23 @@ class AyahBoundsAnnotator:
         self.canvas.bind("<Button-1>", self.on_mouse_down)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
+        self.root.bind("<Prior>", lambda event: self.step_page(-1))
+        self.root.bind("<Next>", lambda event: self.step_page(1))
+        # Enter and Escape act on suggestions, except while typing in a field
+        # (Enter in the surah/ayah/range fields must not accept them)
+        self.root.bind("<Return>", lambda event: self.outside_entry(event, self.accept_suggestions))
+        self.root.bind("<Escape>", lambda event: self.outside_entry(event, self.clear_suggestions))
+        
+        # Zoom with Ctrl+wheel, pan with right-drag or the wheel
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.zoom_at(e, ZOOM_STEP if e.delta > 0 else 1 / ZOOM_STEP))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom_at(e, ZOOM_STEP))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom_at(e, 1 / ZOOM_STEP))
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1))
+        self.canvas.bind("<ButtonPress-3>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B3-Motion>", self.on_pan)
+        self.canvas.bind("<Configure>", lambda e: self.refresh_viewport())
         
         # Instructions
         instructions = """
@@ -102,10 +296,22 @@ class AyahBoundsAnnotator:
         5. The ayah will be saved automatically
         6. Continue with the next ayah (increment ayah number)
         7. Click "Export JSON" when done with the page
+        8. Use Prev/Next (or Page Up/Page Down) to move through the folder;
+           set Range (e.g. 3-50) to keep them inside a batch of pages
+        9. "Merge" writes the page into assets/json/bounds/<Qiraat ID>/,
+           "Merge Range" every annotated page of the range
+        
+        Assist mode:
+        - Tick "Assist" (or click "Suggest") to detect lines and ayah markers,
+          starting at the current Surah:Ayah; suggestions are dashed orange
+        - Enter accepts them, Escape discards them; fix the rest by hand
         
         Tips:
         - For multi-line ayahs, draw multiple boxes (keep surah:ayah the same)
         - Use "Undo" to remove the last annotation
+        - Every box is saved to tools/sessions/ as you draw; reopening the
+          annotator restores the session of the Qiraat ID
+        - Ctrl+wheel or +/− zooms into the full-resolution page, right-drag pans
         - Boxes are drawn in red, completed boxes turn green
         """
         
@@ -119,39 +325,123 @@ class AyahBoundsAnnotator:
         )
         
         if file_path:
-            self.image_path = file_path
-            self.image = Image.open(file_path)
-            
-            # Resize if too large
-            max_size = (1200, 1600)
-            self.image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            self.photo = ImageTk.PhotoImage(self.image)
-            self.canvas.config(width=self.image.width, height=self.image.height)
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-            
-            # Redraw existing annotations
-            self.redraw_annotations()
+            # Index the folder so Prev/Next can page through it
+            self.page_images = index_page_images(os.path.dirname(file_path))
+            page = next((n for n, p in self.page_images.items()
+                         if os.path.samefile(p, file_path)), None)
+            if page is None:
+                self.page_number = int(self.page_entry.get())
+                self.open_session()
+                self.show_image(file_path)
+            else:
+                self.show_page(page)
+    
+    def open_session(self):
+        """Switch to the journaled session of the Qiraat ID and the shown page's annotations."""
+        qiraat_id = self.qiraat_entry.get()
+        if self.session is None or self.session.qiraat_id != qiraat_id:
+            if self.session:
+                self.session.close()
+            self.session = AnnotationSession(qiraat_id)
+        self.annotations = self.session.annotations(self.page_number)
+    
+    def page_range(self):
+        """(first, last) page of the Range field, or (None, None) when it is empty."""
+        text = self.range_entry.get().strip()
+        if not text:
+            return None, None
+        first, _, last = text.partition("-")
+        return int(first), int(last or first)
+    
+    def show_page(self, page):
+        """Switch to another page of the loaded folder, keeping each page's annotations."""
+        if page not in self.page_images:
+            return
+        
+        self.page_number = page
+        self.open_session()
+        self.page_entry.delete(0, tk.END)
+        self.page_entry.insert(0, str(page))
+        
+        self.show_image(self.page_images[page])
+        
+        # Decode the neighbours in the background while this page is annotated,
+        # then this page's full-resolution scan for zooming
+        self.image_cache.prefetch([self.page_images[page + offset] for offset in PREFETCH_OFFSETS
+                                   if page + offset in self.page_images],
+                                  full=[self.page_images[page]])
+    
+    def step_page(self, delta):
+        """Show the next page of the folder in the delta direction, staying inside the Range."""
+        first, last = self.page_range()
+        pages = [p for p in sorted(self.page_images)
+                 if (first is None or p >= first) and (last is None or p <= last)]
+        if delta > 0:
+            pages = [p for p in pages if p > self.page_number]
+        else:
+            pages = [p for p in reversed(pages) if p < self.page_number]
+        if pages:
+            self.show_page(pages[min(abs(delta), len(pages)) - 1])
+    
+    def show_image(self, file_path):
+        self.image_path = file_path
+        self.image = self.image_cache.get(file_path)
+        self.full_image = None
+        self.tile_photos.clear()
+        self.zoom = 1.0
+        
+        self.photo = ImageTk.PhotoImage(self.image)
+        self.canvas.config(width=self.image.width, height=self.image.height)
+        
+        self.line_bands = []
+        self.suggestions = []
+        
+        # Redraw existing annotations
+        self.redraw_annotations()
+        
+        if self.assist_var.get() and not self.annotations:
+            self.suggest()
+    
+    # -- coordinates ------------------------------------------------------
+    
+    def page_size(self):
+        """Size of the page on the canvas at the current zoom."""
+        return self.image.width * self.zoom, self.image.height * self.zoom
+    
+    def event_point(self, event):
+        """Mouse position in canvas coordinates, clamped to the page."""
+        width, height = self.page_size()
+        x = min(max(self.canvas.canvasx(event.x), 0), width)
+        y = min(max(self.canvas.canvasy(event.y), 0), height)
+        return x, y
+    
+    def annotation_box(self, ann):
+        width, height = self.page_size()
+        x1 = ann["x"] * width
+        y1 = ann["y"] * height
+        return x1, y1, x1 + ann["width"] * width, y1 + ann["height"] * height
+    
+    # -- mouse ------------------------------------------------------------
     
     def on_mouse_down(self, event):
-        self.rect_start = (event.x, event.y)
+        self.rect_start = self.event_point(event) if self.image else None
         self.current_rect = None
     
     def on_mouse_drag(self, event):
         if self.rect_start:
+            x, y = self.event_point(event)
             if self.current_rect:
-                self.canvas.delete(self.current_rect)
-            
-            self.current_rect = self.canvas.create_rectangle(
-                self.rect_start[0], self.rect_start[1],
-                event.x, event.y,
-                outline="red", width=2
-            )
+                self.canvas.coords(self.current_rect, *self.rect_start, x, y)
+            else:
+                self.current_rect = self.canvas.create_rectangle(
+                    *self.rect_start, x, y,
+                    outline="red", width=2
+                )
     
     def on_mouse_up(self, event):
         if self.rect_start and self.image:
             x1, y1 = self.rect_start
-            x2, y2 = event.x, event.y
+            x2, y2 = self.event_point(event)
             
             # Ensure x1 < x2 and y1 < y2
             if x1 > x2:
@@ -160,8 +450,7 @@ class AyahBoundsAnnotator:
                 y1, y2 = y2, y1
             
             # Normalize coordinates
-            width = self.image.width
-            height = self.image.height
+            width, height = self.page_size()
             
             annotation = {
                 "surah": int(self.surah_entry.get()),
@@ -170,26 +459,15 @@ class AyahBoundsAnnotator:
                 "y": y1 / height,
                 "width": (x2 - x1) / width,
                 "height": (y2 - y1) / height,
-                "lineNumber": 0  # You can add UI to set this if needed
+                "lineNumber": self.line_number_at((y1 + y2) / 2 / height)
             }
             
-            self.annotations.append(annotation)
+            self.session.add(self.page_number, annotation)
             
-            # Change color to green for completed
+            # Replace the red rubber band with the finished green box
             if self.current_rect:
                 self.canvas.delete(self.current_rect)
-            
-            self.canvas.create_rectangle(
-                x1, y1, x2, y2,
-                outline="green", width=2
-            )
-            
-            # Add label
-            self.canvas.create_text(
-                x1 + 5, y1 + 5,
-                text=f"{annotation['surah']}:{annotation['ayah']}",
-                anchor=tk.NW, fill="green", font=("Arial", 10, "bold")
-            )
+            self.add_annotation_items(annotation)
             
             # Auto-increment ayah
             current_ayah = int(self.ayah_entry.get())
@@ -199,72 +477,238 @@ class AyahBoundsAnnotator:
             self.rect_start = None
             self.current_rect = None
     
-    def undo_last(self):
-        if self.annotations:
-            self.annotations.pop()
-            self.redraw_annotations()
+    def on_pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.refresh_viewport()
     
-    def redraw_annotations(self):
+    def scroll(self, direction):
+        self.canvas.yview_scroll(direction, "units")
+        self.refresh_viewport()
+    
+    # -- annotations ------------------------------------------------------
+    
+    def add_annotation_items(self, ann):
+        x1, y1, x2, y2 = self.annotation_box(ann)
+        rect = self.canvas.create_rectangle(
+            x1, y1, x2, y2,
+            outline="green", width=2, tags=("annotation",)
+        )
+        label = self.canvas.create_text(
+            x1 + 5, y1 + 5,
+            text=f"{ann['surah']}:{ann['ayah']}",
+            anchor=tk.NW, fill="green", font=("Arial", 10, "bold"), tags=("annotation",)
+        )
+        self.annotation_items.append((rect, label))
+    
+    def place_annotation_items(self):
+        """Move every annotation item to its position at the current zoom."""
+        for ann, (rect, label) in zip(self.annotations, self.annotation_items):
+            x1, y1, x2, y2 = self.annotation_box(ann)
+            self.canvas.coords(rect, x1, y1, x2, y2)
+            self.canvas.coords(label, x1 + 5, y1 + 5)
+    
+    # -- assist mode ------------------------------------------------------
+    
+    def outside_entry(self, event, action):
+        """Run action unless the key event comes from a text field."""
+        if not isinstance(event.widget, (tk.Entry, tk.Spinbox, tk.Text)):
+            action()
+    
+    def toggle_assist(self):
+        if self.assist_var.get():
+            self.suggest()
+        else:
+            self.clear_suggestions()
+    
+    def suggest(self):
+        """Suggest rectangles for the shown page starting at the current Surah:Ayah."""
         if not self.image:
             return
+        self.clear_suggestions()
+        qiraat_id = self.qiraat_entry.get()
         
-        # Clear canvas and redraw image
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-        
-        # Redraw annotations
-        width = self.image.width
-        height = self.image.height
+        start = time.perf_counter()
+        gray = np.asarray(self.image.convert("L"))
+        self.line_bands, suggestions = suggest_rectangles(
+            gray, int(self.surah_entry.get()), int(self.ayah_entry.get()),
+            lambda surah: get_ayah_count(surah, qiraat_id))
+        elapsed = (time.perf_counter() - start) * 1000
         
-        for ann in self.annotations:
-            x1 = ann["x"] * width
-            y1 = ann["y"] * height
-            x2 = x1 + (ann["width"] * width)
-            y2 = y1 + (ann["height"] * height)
-            
+        self.suggestions = [ann for ann in suggestions if ann["surah"] <= 114]
+        self.draw_suggestions()
+        self.root.title(f"Ayah Bounds Annotator - {len(self.line_bands)} lines, "
+                        f"{len(self.suggestions)} suggestions in {elapsed:.0f} ms")
+    
+    def draw_suggestions(self):
+        self.canvas.delete("suggestion")
+        for ann in self.suggestions:
+            x1, y1, x2, y2 = self.annotation_box(ann)
             self.canvas.create_rectangle(
                 x1, y1, x2, y2,
-                outline="green", width=2
+                outline="orange", width=2, dash=(4, 2), tags=("suggestion",)
             )
-            
             self.canvas.create_text(
-                x1 + 5, y1 + 5,
-                text=f"{ann['surah']}:{ann['ayah']}",
-                anchor=tk.NW, fill="green", font=("Arial", 10, "bold")
+                x2 - 5, y1 + 5,
+                text=f"{ann['surah']}:{ann['ayah']} L{ann['lineNumber']}",
+                anchor=tk.NE, fill="orange", font=("Arial", 10, "bold"), tags=("suggestion",)
             )
     
+    def accept_suggestions(self):
+        if not self.suggestions:
+            return
+        suggestions = self.suggestions
+        self.clear_suggestions()
+        
+        for ann in suggestions:
+            self.session.add(self.page_number, ann)
+            self.add_annotation_items(ann)
+        
+        # Continue numbering after the last suggested ayah
+        last = suggestions[-1]
+        surah, ayah = last["surah"], last["ayah"] + 1
+        if ayah > get_ayah_count(surah, self.qiraat_entry.get()):
+            surah, ayah = surah + 1, 1
+        self.surah_entry.delete(0, tk.END)
+        self.surah_entry.insert(0, str(surah))
+        self.ayah_entry.delete(0, tk.END)
+        self.ayah_entry.insert(0, str(ayah))
+    
+    def clear_suggestions(self):
+        self.suggestions = []
+        self.canvas.delete("suggestion")
+    
+    def line_number_at(self, y):
+        """Number of the text line nearest to normalized y (0 if no lines are found)."""
+        if not self.line_bands:
+            self.line_bands = detect_lines(ink_mask(np.asarray(self.image.convert("L"))))
+        if not self.line_bands:
+            return 0
+        y *= self.image.height
+        band = min(self.line_bands, key=lambda b: max(b.top - y, y - b.bottom + 1, 0))
+        return band.number
+    
+    def undo_last(self):
+        if self.annotations:
+            self.session.undo(self.page_number)
+            for item in self.annotation_items.pop():
+                self.canvas.delete(item)
+    
+    def redraw_annotations(self):
+        """Rebuild the whole canvas; only needed when another page is shown."""
+        if not self.image:
+            return
+        
+        self.canvas.delete("all")
+        self.image_item = None
+        self.tile_items = {}
+        self.annotation_items = []
+        self.refresh_viewport()
+        
+        for ann in self.annotations:
+            self.add_annotation_items(ann)
+    
+    # -- zoom and viewport tiles ------------------------------------------
+    
+    def zoom_at(self, event, factor):
+        self.set_zoom(self.zoom * factor, (event.x, event.y))
+    
+    def set_zoom(self, zoom, anchor=None):
+        """Zoom the page, keeping the point under anchor (window coordinates) in place."""
+        if not self.image:
+            return
+        zoom = min(max(zoom, 1.0), MAX_ZOOM)
+        if zoom == self.zoom:
+            return
+        
+        if anchor is None:
+            anchor = (self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2)
+        old_width, old_height = self.page_size()
+        fx = self.canvas.canvasx(anchor[0]) / old_width
+        fy = self.canvas.canvasy(anchor[1]) / old_height
+        
+        self.zoom = zoom
+        for item in self.tile_items.values():
+            self.canvas.delete(item)
+        self.tile_items = {}
+        width, height = self.page_size()
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto(max(fx - anchor[0] / width, 0))
+        self.canvas.yview_moveto(max(fy - anchor[1] / height, 0))
+        
+        self.place_annotation_items()
+        self.draw_suggestions()
+        self.refresh_viewport()
+    
+    def refresh_viewport(self):
+        """Show the fit-size image, or the full-resolution tiles that are visible."""
+        if not self.image:
+            return
+        
+        if self.zoom == 1.0:
+            for item in self.tile_items.values():
+                self.canvas.delete(item)
+            self.tile_items = {}
+            if self.image_item is None:
+                self.image_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags=("page",))
+            self.canvas.config(scrollregion=(0, 0, self.image.width, self.image.height))
+            self.canvas.tag_lower("page")
+            return
+        
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+            self.image_item = None
+        if self.full_image is None:
+            self.full_image = self.image_cache.get(self.image_path, full=True)
+        
+        width, height = self.page_size()
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        right = min(left + self.canvas.winfo_width(), width)
+        bottom = min(top + self.canvas.winfo_height(), height)
+        visible = {(column, row)
+                   for column in range(int(left // TILE_SIZE), int((right - 1) // TILE_SIZE) + 1)
+                   for row in range(int(top // TILE_SIZE), int((bottom - 1) // TILE_SIZE) + 1)}
+        
+        for key in list(self.tile_items):
+            if key not in visible:
+                self.canvas.delete(self.tile_items.pop(key))
+        for column, row in visible - set(self.tile_items):
+            photo = self.tile_photo(column, row)
+            self.tile_items[(column, row)] = self.canvas.create_image(
+                column * TILE_SIZE, row * TILE_SIZE, anchor=tk.NW, image=photo, tags=("page",))
+        self.canvas.tag_lower("page")
+    
+    def tile_photo(self, column, row):
+        """Render one viewport tile from the full-resolution scan (LRU cached)."""
+        key = (self.zoom, column, row)
+        photo = self.tile_photos.get(key)
+        if photo is not None:
+            self.tile_photos.move_to_end(key)
+            return photo
+        
+        width, height = self.page_size()
+        scale = self.full_image.width / width
+        box = (column * TILE_SIZE, row * TILE_SIZE,
+               min((column + 1) * TILE_SIZE, width), min((row + 1) * TILE_SIZE, height))
+        source = tuple(round(v * scale) for v in box)
+        size = (max(round(box[2] - box[0]), 1), max(round(box[3] - box[1]), 1))
+        photo = ImageTk.PhotoImage(self.full_image.resize(size, Image.Resampling.BILINEAR, box=source))
+        
+        self.tile_photos[key] = photo
+        while len(self.tile_photos) > TILE_CACHE_SIZE:
+            self.tile_photos.popitem(last=False)
+        return photo
+    
     def export_json(self):
         if not self.annotations:
             messagebox.showwarning("No Annotations", "Please annotate at least one ayah before exporting.")
             return
         
         # Group annotations by surah:ayah
-        ayah_groups = {}
-        for ann in self.annotations:
-            key = (ann["surah"], ann["ayah"])
-            if key not in ayah_groups:
-                ayah_groups[key] = []
-            ayah_groups[key].append({
-                "x": ann["x"],
-                "y": ann["y"],
-                "width": ann["width"],
-                "height": ann["height"],
-                "lineNumber": ann["lineNumber"]
-            })
-        
-        # Build final JSON structure
-        ayahs_list = []
-        for (surah, ayah), positions in sorted(ayah_groups.items()):
-            ayahs_list.append({
-                "surahNumber": surah,
-                "ayahNumber": ayah,
-                "positions": positions
-            })
-        
         output = {
             "pageNumber": int(self.page_entry.get()),
             "qiraatId": self.qiraat_entry.get(),
-            "ayahs": ayahs_list
+            "ayahs": group_annotations(self.annotations)
         }
         
         # Save to file
@@ -277,10 +721,47 @@ class AyahBoundsAnnotator:
         )
         
         if file_path:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(output, f, indent=2, ensure_ascii=False)
+            write_json(file_path, output)
             
             messagebox.showinfo("Success", f"Exported to {file_path}")
+    
+    def merge_pages(self, pages):
+        """Merge annotated pages into the bounds corpus. Returns {page: issues} of rejected pages."""
+        rejected = {}
+        for page in pages:
+            _, issues = merge_page(self.session.qiraat_id, page, self.session.annotations(page))
+            if issues:
+                rejected[page] = issues
+            else:
+                self.session.mark_merged(page)
+        return rejected
+    
+    def report_merge(self, pages, rejected):
+        if rejected:
+            lines = [f"page {page}: [{issue['code']}] {issue['message']}"
+                     for page, issues in rejected.items() for issue in issues]
+            messagebox.showerror("Merge Rejected", "\n".join(lines[:20]))
+        merged = len(pages) - len(rejected)
+        if merged:
+            messagebox.showinfo("Merged", f"Merged {merged} page(s) into "
+                                f"assets/json/bounds/{self.session.qiraat_id}/")
+    
+    def merge_current(self):
+        if not self.annotations:
+            messagebox.showwarning("No Annotations", "Please annotate at least one ayah before merging.")
+            return
+        pages = [self.page_number]
+        self.report_merge(pages, self.merge_pages(pages))
+    
+    def merge_range(self):
+        if self.session is None:
+            return
+        pages = [p for p in self.session.annotated_pages(*self.page_range())
+                 if p not in self.session.merged]
+        if not pages:
+            messagebox.showinfo("Nothing to Merge", "No unmerged annotated pages in the range.")
+            return
+        self.report_merge(pages, self.merge_pages(pages))
 
 
 if __name__ == "__main__":
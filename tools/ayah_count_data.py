@@ -2,8 +2,24 @@
 """
 Ayah Count Data for Different Qiraats
 Contains the actual ayah counts for each surah in different counting systems.
+
+Only the Kufi table is complete. The other systems have Al-Fatiha and the
+opening letters that only Kufi counts as ayahs; their differences at ayah
+ends are not transcribed yet. A system counts as verified only when it is
+in COMPLETE_SYSTEMS and its total matches PUBLISHED_TOTALS (and, for Kufi,
+every surah matches the Tanzil metadata). The check exits 1 while any
+system is unverified. Tools that take the counts as ground truth (validate_bounds.py,
+remap_bounds.py, division_index.py, khatm_planner.py) check is_verified()
+first.
+
+Usage:
+    python3 ayah_count_data.py   # check every system against the published figures
 """
 
+import sys
+
+from qiraat_registry import RIWAYAT, resolve_id
+
 # Hafs (Kufi Counting System) - 6,236 total ayahs
 # This is the most common counting system
 HAFS_AYAH_COUNTS = {
@@ -21,52 +37,100 @@ HAFS_AYAH_COUNTS = {
     111: 5, 112: 4, 113: 5, 114: 6
 }
 
-# Warsh (Madani Counting System) - 6,214 total ayahs
-# Used in North Africa, differs in ayah divisions
-WARSH_AYAH_COUNTS = {
-    1: 7, 2: 286, 3: 200, 4: 176, 5: 120, 6: 165, 7: 206, 8: 75, 9: 129, 10: 109,
-    11: 123, 12: 111, 13: 43, 14: 52, 15: 99, 16: 128, 17: 111, 18: 110, 19: 98, 20: 135,
-    21: 112, 22: 78, 23: 118, 24: 64, 25: 77, 26: 227, 27: 93, 28: 88, 29: 69, 30: 60,
-    31: 34, 32: 30, 33: 73, 34: 54, 35: 45, 36: 83, 37: 182, 38: 88, 39: 75, 40: 85,
-    41: 54, 42: 53, 43: 89, 44: 59, 45: 37, 46: 35, 47: 38, 48: 29, 49: 18, 50: 45,
-    51: 60, 52: 49, 53: 62, 54: 55, 55: 78, 56: 96, 57: 29, 58: 22, 59: 24, 60: 13,
-    61: 14, 62: 11, 63: 11, 64: 18, 65: 12, 66: 12, 67: 30, 68: 52, 69: 52, 70: 44,
-    71: 28, 72: 28, 73: 20, 74: 56, 75: 40, 76: 31, 77: 50, 78: 40, 79: 46, 80: 42,
-    81: 29, 82: 19, 83: 36, 84: 25, 85: 22, 86: 17, 87: 19, 88: 26, 89: 30, 90: 20,
-    91: 15, 92: 21, 93: 11, 94: 8, 95: 8, 96: 19, 97: 5, 98: 8, 99: 8, 100: 11,
-    101: 11, 102: 8, 103: 3, 104: 9, 105: 5, 106: 4, 107: 7, 108: 3, 109: 6, 110: 3,
-    111: 5, 112: 4, 113: 5, 114: 6
+# The six counting schools. Every one is stored as a list of differences from
+# the Kufi count above rather than as a full table of its own.
+COUNTING_SYSTEMS = ('kufi', 'madani_1', 'madani_2', 'makki', 'basri', 'shami')
+
+# Older names still used by some tools
+COUNTING_SYSTEM_ALIASES = {
+    'madani': 'madani_2',
 }
 
-# Mapping of qiraat IDs to their counting systems
-QIRAAT_COUNTING_SYSTEMS = {
-    'asim_hafs': 'kufi',
-    'asim_shuba': 'kufi',
-    'hamzah_khalaf': 'kufi',
-    'hamzah_khalaad': 'kufi',
-    'kisai_abu_harith': 'kufi',
-    'kisai_duri': 'kufi',
-    
-    'nafi_warsh': 'madani',
-    'nafi_qalun': 'madani',
-    'abu_jafar_ibn_wardan': 'madani',
-    'abu_jafar_ibn_jammaz': 'madani',
-    
-    'ibn_kathir_bazzi': 'makki',
-    'ibn_kathir_qunbul': 'makki',
-    
-    'abu_amr_duri': 'basri',
-    'abu_amr_sussi': 'basri',
-    'yaqub_ruways': 'basri',
-    'yaqub_rawh': 'basri',
-    
-    'ibn_amir_hisham': 'shami',
-    'ibn_amir_dhakwan': 'shami',
-    
-    'khalaf_ishaq': 'kufi',
-    'khalaf_idris': 'kufi',
+# Difference operations, each anchored on a Kufi ayah number n:
+#   SPLIT  the system ends an extra ayah inside Kufi ayah n (n becomes two ayahs)
+#   MERGE  the system does not end an ayah after Kufi ayah n (n and n+1 are one)
+#   DROP   the system does not count Kufi ayah n at all
+SPLIT = 'split'
+MERGE = 'merge'
+DROP = 'drop'
+
+# Al-Fatiha: the basmala is not counted, "an'amta 'alayhim" ends an ayah.
+# The Makki count agrees with the Kufi one here.
+_FATIHA_NON_KUFI = ((1, DROP), (7, SPLIT))
+
+# Opening letters that only the Kufi count takes as ayahs of their own
+# ({surah: Kufi ayahs}); every other system joins them to the next ayah.
+# Alif-Lam-Ra, Alif-Lam-Mim-Ra, Ta-Sin, Sad, Qaf and Nun are no ayah anywhere.
+_KUFI_LETTER_AYAHS = {
+    2: (1,), 3: (1,), 7: (1,), 19: (1,), 20: (1,), 26: (1,), 28: (1,),
+    29: (1,), 30: (1,), 31: (1,), 32: (1,), 36: (1,),
+    40: (1,), 41: (1,), 42: (1, 2), 43: (1,), 44: (1,), 45: (1,), 46: (1,),
+}
+
+
+def _non_kufi(fatiha):
+    """Differences every non-Kufi system shares, with its own Al-Fatiha."""
+    deltas = {surah: tuple((ayah, MERGE) for ayah in ayahs) for surah, ayahs in _KUFI_LETTER_AYAHS.items()}
+    if fatiha:
+        deltas[1] = fatiha
+    return deltas
+
+# Published totals (al-Dani, al-Bayan fi 'add ay al-Qur'an)
+PUBLISHED_TOTALS = {
+    'kufi': 6236,
+    'madani_1': 6217,
+    'madani_2': 6214,
+    'makki': 6220,
+    'basri': 6204,
+    'shami': 6226,
 }
 
+# {system: {surah: ((kufi_ayah, operation), ...)}}
+# Only transcribed differences are listed: Al-Fatiha and the opening letters.
+# The per-surah differences at ayah ends (al-Dani, al-Bayan) still have to be
+# transcribed from the book; until then any other surah falls back to the
+# Kufi division and the system stays unverified. Al-Baqarah agrees with the
+# Madani split used for Warsh in baqarah_mappings.py ("Alif Lam Mim" is not
+# an ayah of its own: Hafs page 3 has ayahs 1-5, Warsh page 3 has ayahs 1-4).
+COUNTING_DELTAS = {
+    'kufi': {},
+    'madani_1': _non_kufi(_FATIHA_NON_KUFI),
+    'madani_2': _non_kufi(_FATIHA_NON_KUFI),
+    'makki': _non_kufi(None),
+    'basri': _non_kufi(_FATIHA_NON_KUFI),
+    'shami': _non_kufi(_FATIHA_NON_KUFI),
+}
+
+# Systems whose differences are transcribed for every surah. A partial table
+# is never verified, even if its total happens to match.
+COMPLETE_SYSTEMS = ('kufi',)
+
+
+def _apply_deltas(deltas):
+    counts = dict(HAFS_AYAH_COUNTS)
+    for surah, operations in deltas.items():
+        for _, operation in operations:
+            counts[surah] += 1 if operation == SPLIT else -1
+    return counts
+
+
+# {system: {surah: ayah count}}
+AYAH_COUNTS = {system: _apply_deltas(COUNTING_DELTAS[system]) for system in COUNTING_SYSTEMS}
+
+# Warsh (Madani counting system)
+WARSH_AYAH_COUNTS = AYAH_COUNTS['madani_2']
+
+# Mapping of qiraat IDs to their counting systems (see qiraat_registry.py)
+QIRAAT_COUNTING_SYSTEMS = {riwaya.id: riwaya.counting_system for riwaya in RIWAYAT}
+_unknown = set(QIRAAT_COUNTING_SYSTEMS.values()) - set(COUNTING_SYSTEMS) - set(COUNTING_SYSTEM_ALIASES)
+if _unknown:
+    raise ValueError(f'qiraat_registry uses unknown counting systems: {sorted(_unknown)}')
+
+def counting_system_for(qiraat_id):
+    """Return the counting system of a qiraat ('kufi' for unknown ids)."""
+    system = QIRAAT_COUNTING_SYSTEMS.get(resolve_id(qiraat_id), 'kufi')
+    return COUNTING_SYSTEM_ALIASES.get(system, system)
+
 def get_ayah_count(surah_number, qiraat_id):
     """
     Get the ayah count for a specific surah in a specific qiraat.
@@ -78,23 +142,58 @@ def get_ayah_count(surah_number, qiraat_id):
     Returns:
         Number of ayahs in that surah for that qiraat
     """
-    counting_system = QIRAAT_COUNTING_SYSTEMS.get(qiraat_id, 'kufi')
-    
-    if counting_system == 'madani':
-        return WARSH_AYAH_COUNTS.get(surah_number, HAFS_AYAH_COUNTS.get(surah_number, 0))
-    else:
-        # For now, use Hafs/Kufi for all others
-        # TODO: Add specific counts for Makki, Basri, Shami systems
-        return HAFS_AYAH_COUNTS.get(surah_number, 0)
+    return AYAH_COUNTS[counting_system_for(qiraat_id)].get(surah_number, 0)
 
 def get_total_ayahs(qiraat_id):
     """Get total ayah count for a qiraat."""
-    counting_system = QIRAAT_COUNTING_SYSTEMS.get(qiraat_id, 'kufi')
+    return sum(AYAH_COUNTS[counting_system_for(qiraat_id)].values())
+
+def check_counts(system, meta=None):
+    """
+    Compare a counting system with the published figures.
+    
+    Args:
+        system: counting system name or alias
+        meta: TanzilMetadata to check the Kufi surah counts against
+        
+    Returns:
+        List of problems, empty when the system matches
+    """
+    system = COUNTING_SYSTEM_ALIASES.get(system, system)
+    counts = AYAH_COUNTS[system]
+    problems = []
+    
+    if system not in COMPLETE_SYSTEMS:
+        problems.append('differences transcribed for Al-Fatiha and the opening letters only')
+    total = sum(counts.values())
+    if total != PUBLISHED_TOTALS[system]:
+        problems.append(f'total {total}, published {PUBLISHED_TOTALS[system]}')
+    
+    for surah, operations in COUNTING_DELTAS[system].items():
+        for kufi_ayah, _ in operations:
+            if not 1 <= kufi_ayah <= HAFS_AYAH_COUNTS[surah]:
+                problems.append(f'{surah}:{kufi_ayah} is not a Kufi ayah')
+    
+    if system == 'kufi' and meta is not None:
+        for surah in range(1, 115):
+            if counts[surah] != meta.sura_ayas(surah):
+                problems.append(f'surah {surah} has {counts[surah]} ayahs, '
+                                f'Tanzil has {meta.sura_ayas(surah)}')
     
-    if counting_system == 'madani':
-        return sum(WARSH_AYAH_COUNTS.values())
-    else:
-        return sum(HAFS_AYAH_COUNTS.values())
+    return problems
+
+_verified = {}
+
+def is_verified(system):
+    """True when a counting system's table matches the published total."""
+    system = COUNTING_SYSTEM_ALIASES.get(system, system)
+    if system not in _verified:
+        _verified[system] = not check_counts(system)
+    return _verified[system]
+
+def counts_verified(qiraat_id):
+    """True when the ayah counts of a qiraat can be taken as ground truth."""
+    return is_verified(counting_system_for(qiraat_id))
 
 # Note: The actual ayah divisions (which words belong to which ayah)
 # differ between qiraats even when the total count is the same.
@@ -102,3 +201,34 @@ def get_total_ayahs(qiraat_id):
 # - Hafs page 3 has ayahs 1-5
 # - Warsh page 3 has ayahs 1-4
 # This is because the ayah boundaries are drawn differently.
+
+def main():
+    try:
+        from tanzil_metadata import get_metadata
+        meta = get_metadata()
+    except FileNotFoundError:
+        meta = None
+    
+    print('=' * 70)
+    print('Ayah Counts vs Published Figures')
+    print('=' * 70)
+    failed = 0
+    for system in COUNTING_SYSTEMS:
+        problems = check_counts(system, meta)
+        qiraats = sorted(q for q in QIRAAT_COUNTING_SYSTEMS if counting_system_for(q) == system)
+        status = '✓' if not problems else '✗'
+        print(f"{status} {system:9s} {sum(AYAH_COUNTS[system].values()):5d} ayahs "
+              f"(published {PUBLISHED_TOTALS[system]}), {len(qiraats)} riwayat")
+        for problem in problems:
+            print(f'    {problem}')
+        failed += bool(problems)
+    if meta is None:
+        print('\n⚠️  Tanzil metadata not available; Kufi surah counts not cross-checked')
+    
+    print('\n' + '=' * 70)
+    print(f'{len(COUNTING_SYSTEMS) - failed} of {len(COUNTING_SYSTEMS)} counting systems verified')
+    print('=' * 70)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
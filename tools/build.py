@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+Build orchestrator for the whole asset pipeline.
+
+Every stage is declared once as a task with explicit inputs, outputs and
+dependencies, per riwaya where the stage works per riwaya:
+
+  metadata          quran-data.xml -> tools/data (tanzil_metadata.bin, divisions)
+  pages:<q>         source PDF -> 150 DPI pages (convert_multiple_qiraats.py)
+  hashed:<q>        pages -> dist/hashed/<q> (hashed_assets.py)
+  bundle:<q>        pages -> dist/bundles/<q>.* (qiraat_bundle.py)
+  tiles:<q>         source PDF -> dist/tiles/<q> (deep_zoom.py)
+  vector:<q>        source PDF -> dist/vector/<q> (vector_pages.py)
+  validate:<q>      bounds -> dist/build/validate/<q>.json (validate_bounds.py)
+  columnar          bounds -> dist/bounds_parquet (export_bounds_columnar.py)
+  bounds:<q>        asim_hafs bounds -> <q> bounds (remap_bounds.py)
+
+Which riwayat get pages/hashed/bundle/tiles/vector comes from their tiers in
+qiraat_registry.py. Independent tasks run concurrently (--jobs, default one
+per CPU), longest remaining chain first. A task takes as many of the --jobs
+slots as its weight: rendering stages hold large page images, and stages
+with their own worker pool get a pool of exactly their weight (--workers),
+so the pools of concurrent tasks add up to --jobs instead of multiplying. A task is skipped when the hash of
+its command, its input files and the tool modules it imports is the one it
+last succeeded with and its outputs still exist; hashes are kept in
+dist/build/state.json. A failed task only blocks the tasks that depend on
+it. Each run ends with a timing report along the critical path (the chain
+of dependent tasks that bounded the wall time), also written to
+dist/build/report.json; task output goes to dist/build/logs/.
+
+Targets are task names, fnmatch patterns or groups:
+  release           everything a release ships (the default)
+  bounds            re-derive the bounds of every riwaya laid out like Hafs
+                    whose counting system is verified (ayah_count_data.py).
+                    Not part of release: it rewrites the committed corpus.
+The one-off corpus scripts (generate_*, fix_*, regenerate_*) are not tasks;
+their work is covered by remap_bounds.py and the validator.
+
+Usage:
+    python3 build.py                             # full release build
+    python3 build.py --dry-run                   # what would run, nothing is executed
+    python3 build.py 'pages:*' hashed:nafi_warsh # selected tasks and what they need
+    python3 build.py release -q nafi_warsh -q asim_shuba --jobs 4
+    python3 build.py bounds validate --force     # remap, then validate every riwaya
+    python3 build.py --list
+"""
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple
+
+from ayah_count_data import counts_verified
+from bounds_model import BOUNDS_DIR, read_json, write_json
+from file_hashes import hash_files
+from qiraat_registry import OUTPUT_TIERS, RIWAYAT, all_ids, get_riwaya, targets
+from tanzil_metadata import SOURCE_XML_PATHS, find_source_xml
+
+ROOT_DIR = Path(__file__).parent.parent
+TOOLS_DIR = Path(__file__).parent
+DIST_DIR = ROOT_DIR / 'dist'
+BUILD_DIR = DIST_DIR / 'build'
+STATE_PATH = BUILD_DIR / 'state.json'
+REPORT_PATH = BUILD_DIR / 'report.json'
+HASH_CACHE = BUILD_DIR / 'hash_cache.json'
+LOG_DIR = BUILD_DIR / 'logs'
+
+PYTHON = sys.executable
+SOURCE_QIRAAT = 'asim_hafs'  # the annotated riwaya every other one is remapped from
+
+# Tasks that never ran before are assumed to take this long when ordering
+DEFAULT_SECONDS = 1.0
+# Slots of heavy tasks: a 150 DPI render holds a poppler process and a page
+# image; hashing and tiling run worker pools of this size
+PAGES_WEIGHT = 2
+HASHED_WEIGHT = 2
+TILES_WEIGHT = 4  # 400 DPI pages, as deep_zoom.py's default pool
+LOG_TAIL = 15
+
+GROUPS = {
+    'bounds': ('bounds:*',),
+}
+
+# Final task states
+BUILT = 'built'
+CACHED = 'cached'
+KEPT = 'kept'  # inputs missing but outputs present from an earlier build
+FAILED = 'failed'
+MISSING = 'missing'
+BLOCKED = 'blocked'
+OK_STATES = (BUILT, CACHED, KEPT)
+
+
+class Task(NamedTuple):
+    name: str
+    command: tuple
+    inputs: tuple = ()  # files or directories
+    outputs: tuple = ()
+    deps: tuple = ()  # needed: selected along with the task, failures block it
+    after: tuple = ()  # ordering only, when both are selected
+    cwd: Path = TOOLS_DIR
+    weight: int = 1  # --jobs slots the task occupies (capped at --jobs)
+    workers_flag: str = ''  # option sizing the task's worker pool to its slots
+
+
+class TaskResult(NamedTuple):
+    name: str
+    status: str
+    seconds: float = 0.0
+    detail: str = ''
+
+
+def _tool(script, *args):
+    return (PYTHON, str(TOOLS_DIR / script)) + args
+
+
+def declare_tasks():
+    """Every task of the pipeline, by name."""
+    # The checked-in quran-data.xml is a placeholder: without a real source
+    # the task reports its input as missing (or keeps an earlier artifact)
+    source_xml = find_source_xml() or SOURCE_XML_PATHS[-1]
+    tasks = [Task(
+        'metadata',
+        _tool('compile_tanzil_metadata.py', str(source_xml)),
+        inputs=(source_xml, TOOLS_DIR / 'compile_tanzil_metadata.py'),
+        outputs=(TOOLS_DIR / 'data' / 'tanzil_metadata.bin', TOOLS_DIR / 'data' / 'divisions'),
+    )]
+    bounds_tasks = []
+    for riwaya in RIWAYAT:
+        q = riwaya.id
+        images = riwaya.images_dir()
+        tasks.append(Task(
+            f'pages:{q}',
+            (PYTHON, str(ROOT_DIR / 'convert_multiple_qiraats.py'), q),
+            inputs=(riwaya.pdf_path, ROOT_DIR / 'convert_multiple_qiraats.py'),
+            outputs=(images,),
+            cwd=ROOT_DIR,
+            weight=PAGES_WEIGHT,
+        ))
+        if not riwaya.bundled:
+            tasks.append(Task(
+                f'hashed:{q}', _tool('hashed_assets.py', q),
+                inputs=(images, TOOLS_DIR / 'hashed_assets.py'),
+                outputs=(DIST_DIR / 'hashed' / q / 'pages.json',),
+                deps=(f'pages:{q}',),
+                weight=HASHED_WEIGHT, workers_flag='--workers',
+            ))
+            tasks.append(Task(
+                f'bundle:{q}', _tool('qiraat_bundle.py', 'build', q),
+                inputs=(images, TOOLS_DIR / 'qiraat_bundle.py'),
+                outputs=(DIST_DIR / 'bundles' / f'{q}.index.json',),
+                deps=(f'pages:{q}',),
+            ))
+        tasks.append(Task(
+            f'tiles:{q}', _tool('deep_zoom.py', 'pdf', q),
+            inputs=(riwaya.pdf_path, TOOLS_DIR / 'deep_zoom.py'),
+            outputs=(DIST_DIR / 'tiles' / q / 'tiles.json',),
+            weight=TILES_WEIGHT, workers_flag='--workers',
+        ))
+        tasks.append(Task(
+            f'vector:{q}', _tool('vector_pages.py', q),
+            inputs=(riwaya.pdf_path, TOOLS_DIR / 'vector_pages.py'),
+            outputs=(DIST_DIR / 'vector' / q / 'vector.json',),
+        ))
+        # Only riwayat laid out like the source whose counts can be trusted;
+        # remap_bounds.py refuses the others and would fail the task
+        if (q != SOURCE_QIRAAT and riwaya.layout_family == get_riwaya(SOURCE_QIRAAT).layout_family
+                and counts_verified(q)):
+            bounds_tasks.append(f'bounds:{q}')
+            tasks.append(Task(
+                f'bounds:{q}', _tool('remap_bounds.py', q, '--source', SOURCE_QIRAAT, '--in-place'),
+                inputs=(BOUNDS_DIR / SOURCE_QIRAAT, TOOLS_DIR / 'remap_bounds.py'),
+                outputs=(BOUNDS_DIR / q,),
+            ))
+        report = BUILD_DIR / 'validate' / f'{q}.json'
+        tasks.append(Task(
+            f'validate:{q}', _tool('validate_bounds.py', q, '--workers', '1', '--report', str(report)),
+            inputs=(BOUNDS_DIR / q, TOOLS_DIR / 'validate_bounds.py'),
+            outputs=(report,),
+            after=(f'bounds:{q}',),
+        ))
+    tasks.append(Task(
+        'columnar', _tool('export_bounds_columnar.py', 'export', '--incremental'),
+        inputs=(BOUNDS_DIR, TOOLS_DIR / 'export_bounds_columnar.py'),
+        outputs=(DIST_DIR / 'bounds_parquet',),
+        after=tuple(bounds_tasks),
+    ))
+    return {task.name: task for task in tasks}
+
+
+def release_targets():
+    names = ['metadata', 'columnar']
+    for tier in OUTPUT_TIERS:
+        names += [target.name for target in targets(tier)]
+    names += [f'validate:{q}' for q in all_ids()]
+    return names
+
+
+def select(tasks, patterns, qiraat_ids=None):
+    """Names of the tasks matched by patterns, plus everything they depend on."""
+    groups = dict(GROUPS, release=tuple(release_targets()))
+    wanted = []
+    for pattern in patterns:
+        expanded = groups.get(pattern, (pattern,))
+        for item in expanded:
+            # A bare stage name means that stage for every riwaya
+            if ':' not in item and item not in tasks:
+                item = f'{item}:*'
+            matched = fnmatch.filter(tasks, item)
+            if not matched:
+                raise ValueError(f'No task matches {pattern!r}')
+            wanted += matched
+
+    if qiraat_ids:
+        keep = {get_riwaya(q).id for q in qiraat_ids}
+        wanted = [name for name in wanted if ':' not in name or name.split(':', 1)[1] in keep]
+
+    selected = set()
+    stack = list(wanted)
+    while stack:
+        name = stack.pop()
+        if name in selected:
+            continue
+        selected.add(name)
+        stack.extend(tasks[name].deps)
+    return selected
+
+
+def predecessors(task, selected):
+    """Selected tasks that must finish before task starts."""
+    return [name for name in task.deps + task.after if name in selected]
+
+
+def topological_order(tasks, selected):
+    pending = {name: set(predecessors(tasks[name], selected)) for name in selected}
+    order = []
+    ready = sorted(name for name, deps in pending.items() if not deps)
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for other in sorted(pending):
+            if name in pending[other]:
+                pending[other].discard(name)
+                if not pending[other]:
+                    ready.append(other)
+        del pending[name]
+    if pending:
+        raise ValueError(f'Dependency cycle between: {", ".join(sorted(pending))}')
+    return order
+
+
+def remaining_chain(tasks, selected, durations):
+    """Seconds from a task's start to the end of the longest chain that follows it."""
+    chain = {}
+    for name in reversed(topological_order(tasks, selected)):
+        followers = [other for other in selected if name in predecessors(tasks[other], selected)]
+        chain[name] = durations.get(name, DEFAULT_SECONDS) + max((chain[f] for f in followers), default=0)
+    return chain
+
+
+def _local_modules(script, seen=None):
+    """script plus the sibling tool modules it imports, recursively."""
+    seen = set() if seen is None else seen
+    if script in seen or not script.exists():
+        return seen
+    seen.add(script)
+    try:
+        tree = ast.parse(script.read_text(encoding='utf-8'))
+    except SyntaxError:
+        return seen
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            for directory in (script.parent, TOOLS_DIR):
+                module = directory / f'{name.split(".")[0]}.py'
+                if module.exists():
+                    _local_modules(module, seen)
+                    break
+    return seen
+
+
+def _input_files(task):
+    """{key: path} of every file the task reads, or None if an input is missing."""
+    files = {}
+    scripts = [Path(arg) for arg in task.command[1:2] if arg.endswith('.py')]
+    for path in list(task.inputs) + sorted(set().union(*(_local_modules(s) for s in scripts))):
+        path = Path(path)
+        if path.is_dir():
+            for child in sorted(path.rglob('*')):
+                if child.is_file() and not child.name.startswith('.') and '__pycache__' not in child.parts:
+                    files[str(child)] = child
+        elif path.is_file():
+            files[str(path)] = path
+        else:
+            return None, path
+    return files, None
+
+
+def input_digest(task):
+    """(digest of the command and input contents, missing input path or None)."""
+    files, missing = _input_files(task)
+    if files is None:
+        return None, missing
+    hashes = hash_files(files, cache_path=HASH_CACHE)
+    h = hashlib.sha256(json.dumps(list(task.command[1:]), ensure_ascii=False).encode('utf-8'))
+    for key in sorted(hashes):
+        h.update(f'{key}\0{hashes[key]["sha256"]}\n'.encode('utf-8'))
+    return h.hexdigest(), None
+
+
+def outputs_exist(task):
+    return all(Path(path).exists() for path in task.outputs)
+
+
+def log_path(name):
+    return LOG_DIR / f'{name.replace(":", "_")}.log'
+
+
+def command_for(task, slots):
+    """The task's command, with its worker pool sized to its slots."""
+    return task.command + ((task.workers_flag, str(slots)) if task.workers_flag else ())
+
+
+def execute(task, slots=1):
+    """Run a task's command with its output in its log. Returns (returncode, seconds)."""
+    command = command_for(task, slots)
+    path = log_path(task.name)
+    for output in task.outputs:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with open(path, 'w', encoding='utf-8') as log:
+        log.write(f'$ {" ".join(command)}\n')
+        log.flush()
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        returncode = subprocess.run(command, cwd=task.cwd, stdout=log, stderr=subprocess.STDOUT,
+                                    stdin=subprocess.DEVNULL, env=env).returncode
+    return returncode, time.perf_counter() - start
+
+
+def _log_tail(name, lines=LOG_TAIL):
+    try:
+        return log_path(name).read_text(encoding='utf-8', errors='replace').splitlines()[-lines:]
+    except OSError:
+        return []
+
+
+def load_state():
+    if STATE_PATH.exists():
+        try:
+            return read_json(STATE_PATH)
+        except ValueError:
+            pass
+    return {}
+
+
+def run(tasks, selected, jobs=None, force=False, dry_run=False, progress=print):
+    """Run the selected tasks. Returns {name: TaskResult}."""
+    jobs = jobs or os.cpu_count() or 1
+    state = load_state()
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    chain = remaining_chain(tasks, selected, {name: entry.get('seconds', DEFAULT_SECONDS)
+                                              for name, entry in state.items()})
+    waiting = {name: set(predecessors(tasks[name], selected)) for name in selected}
+    ready = [(-chain[name], name) for name, deps in waiting.items() if not deps]
+    heapq.heapify(ready)
+    results = {}
+    will_run = set()  # dry run: tasks that would run, so their dependents would too
+
+    def finish(result):
+        results[result.name] = result
+        ok = result.status in OK_STATES
+        for other, deps in waiting.items():
+            if result.name not in deps:
+                continue
+            deps.discard(result.name)
+            if not ok and result.name in tasks[other].deps:
+                # Blocked tasks are final as soon as a dependency fails
+                finish_blocked(other, result.name)
+            elif not deps and other not in results:
+                heapq.heappush(ready, (-chain[other], other))
+
+    def finish_blocked(name, cause):
+        if name not in results:
+            progress(f'  {BLOCKED:8s} {name}  (needs {cause})')
+            finish(TaskResult(name, BLOCKED, detail=f'needs {cause}'))
+
+    def prepare(task):
+        """Result for a task that does not have to run, or (None, digest)."""
+        if any(dep in will_run for dep in predecessors(task, selected)):
+            # Dry run: the inputs are not built yet, but will change
+            return None, None
+        digest, missing = input_digest(task)
+        if digest is None:
+            if outputs_exist(task):
+                return TaskResult(task.name, KEPT, detail=f'no {missing}, keeping outputs'), None
+            return TaskResult(task.name, MISSING, detail=f'no {missing}'), None
+        if (not force and state.get(task.name, {}).get('inputs') == digest
+                and outputs_exist(task)):
+            return TaskResult(task.name, CACHED), None
+        return None, digest
+
+    def slots(task):
+        return max(1, min(task.weight, jobs))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}  # future -> (task, digest)
+        busy = 0  # slots taken by running tasks
+        while ready or running:
+            while ready and busy < jobs:
+                name = ready[0][1]
+                if name in results:
+                    heapq.heappop(ready)
+                    continue
+                task = tasks[name]
+                if running and busy + slots(task) > jobs:
+                    # The next task in line waits for slots rather than being overtaken
+                    break
+                heapq.heappop(ready)
+                result, digest = prepare(task)
+                if result is not None:
+                    progress(f'  {result.status:8s} {name}{"  (" + result.detail + ")" if result.detail else ""}')
+                    finish(result)
+                elif dry_run:
+                    will_run.add(name)
+                    progress(f'  {"run":8s} {name}')
+                    finish(TaskResult(name, BUILT))
+                else:
+                    progress(f'  {"start":8s} {name}')
+                    running[pool.submit(execute, task, slots(task))] = (task, digest)
+                    busy += slots(task)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, digest = running.pop(future)
+                busy -= slots(task)
+                try:
+                    returncode, seconds = future.result()
+                except OSError as e:
+                    returncode, seconds = -1, 0.0
+                    print(f'❌ {task.name}: {e}')
+                if returncode == 0:
+                    state[task.name] = {'inputs': digest, 'seconds': round(seconds, 3)}
+                    write_json(STATE_PATH, state)
+                    progress(f'  {BUILT:8s} {task.name} in {seconds:.1f}s')
+                    finish(TaskResult(task.name, BUILT, seconds))
+                else:
+                    state.pop(task.name, None)
+                    write_json(STATE_PATH, state)
+                    progress(f'  {FAILED:8s} {task.name} (exit {returncode}, log {log_path(task.name)})')
+                    for line in _log_tail(task.name):
+                        progress(f'           | {line}')
+                    finish(TaskResult(task.name, FAILED, seconds, f'exit {returncode}'))
+    return results
+
+
+def critical_path(tasks, selected, results):
+    """(seconds, [names]) of the longest chain of dependent tasks in this run."""
+    end = {}
+    previous = {}
+    for name in topological_order(tasks, selected):
+        before = predecessors(tasks[name], selected)
+        start = max((end[b] for b in before), default=0.0)
+        previous[name] = max(before, key=lambda b: end[b]) if before else None
+        end[name] = start + results[name].seconds if name in results else start
+    if not end:
+        return 0.0, []
+    name = max(end, key=end.get)
+    total = end[name]
+    path = []
+    while name:
+        path.append(name)
+        name = previous[name]
+    return total, path[::-1]
+
+
+def report(tasks, selected, results, wall, jobs):
+    """Print the timing report and write it as JSON."""
+    total, path = critical_path(tasks, selected, results)
+    task_seconds = sum(result.seconds for result in results.values())
+    counts = {}
+    for result in results.values():
+        counts[result.status] = counts.get(result.status, 0) + 1
+
+    print('\n' + '=' * 70)
+    print('Critical path')
+    print('=' * 70)
+    elapsed = 0.0
+    for name in path:
+        elapsed += results[name].seconds
+        print(f'  {results[name].seconds:8.1f}s  {elapsed:8.1f}s  {name} ({results[name].status})')
+    print(f'\n  wall time          {wall:8.1f}s')
+    print(f'  critical path      {total:8.1f}s')
+    print(f'  task time          {task_seconds:8.1f}s  '
+          f'(parallelism {task_seconds / wall if wall else 0:.1f} of {jobs} jobs)')
+    slowest = sorted((r for r in results.values() if r.seconds), key=lambda r: -r.seconds)[:10]
+    if slowest:
+        print('\n  slowest tasks')
+        for result in slowest:
+            print(f'  {result.seconds:8.1f}s  {result.name}')
+    print('\n  ' + ', '.join(f'{count} {status}' for status, count in sorted(counts.items())))
+
+    write_json(REPORT_PATH, {
+        'wallSeconds': round(wall, 3),
+        'jobs': jobs,
+        'taskSeconds': round(task_seconds, 3),
+        'criticalPath': {'seconds': round(total, 3), 'tasks': path},
+        'tasks': {name: {'status': r.status, 'seconds': round(r.seconds, 3), 'detail': r.detail}
+                  for name, r in sorted(results.items())},
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the asset pipeline as a cached, parallel task graph.')
+    parser.add_argument('targets', nargs='*', default=['release'],
+                        help='task names, patterns (pages:*) or groups (release, bounds); default: release')
+    parser.add_argument('-q', '--qiraat', action='append', help='only these riwayat (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='parallel tasks (default: CPUs)')
+    parser.add_argument('--force', action='store_true', help='run tasks even if their inputs are unchanged')
+    parser.add_argument('--dry-run', action='store_true', help='show what would run without running it')
+    parser.add_argument('--list', action='store_true', help='list the selected tasks and their inputs')
+    args = parser.parse_args()
+
+    tasks = declare_tasks()
+    try:
+        selected = select(tasks, args.targets, args.qiraat)
+        order = topological_order(tasks, selected)
+    except ValueError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+
+    if args.list:
+        for name in order:
+            task = tasks[name]
+            needs = predecessors(task, selected)
+            print(f'{name}{"  <- " + ", ".join(needs) if needs else ""}')
+            for path in task.inputs:
+                print(f'    in   {path}')
+            for path in task.outputs:
+                print(f'    out  {path}')
+            if task.weight > 1:
+                print(f'    uses {task.weight} job slots')
+        return
+
+    print('=' * 70)
+    print(f'Build: {len(selected)} tasks, {args.jobs} jobs{" (dry run)" if args.dry_run else ""}')
+    print('=' * 70)
+    start = time.perf_counter()
+    results = run(tasks, selected, args.jobs, args.force, args.dry_run)
+    wall = time.perf_counter() - start
+
+    if args.dry_run:
+        would_run = sum(r.status == BUILT for r in results.values())
+        print(f'\n✓ {would_run} of {len(selected)} tasks would run')
+        return
+
+    report(tasks, selected, results, wall, args.jobs)
+    failed = [r for r in results.values() if r.status not in OK_STATES]
+    if failed:
+        print(f'\n❌ {len(failed)} tasks did not build:')
+        for result in sorted(failed):
+            print(f'  {result.status:8s} {result.name}  {result.detail}')
+        sys.exit(1)
+    print(f'\n✓ Build complete in {wall:.1f}s (report: {REPORT_PATH})')
+
+
+if __name__ == '__main__':
+    main()
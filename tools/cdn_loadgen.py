@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Load generator for the qiraat download path.
+
+Simulates N concurrent app clients downloading a whole riwaya from a CDN
+(cdn_server.py locally, or a real endpoint) and reports throughput and
+tail latency. Strategies:
+  sequential   what DownloadService.downloadQiraat does today: one page at a
+               time, with a 50 ms pause every 10 pages
+  parallel     the same page URLs, --concurrency requests in flight per client
+  hashed       pages.json, then the content-hashed pages (hashed_assets.py)
+  bundle       <qiraat>.index.json, then one GET per segment (qiraat_bundle.py)
+
+Each client keeps its own HTTP/1.1 keep-alive connections. Failed requests
+(5xx, dropped connections) are retried up to --retries times.
+
+Usage:
+    python3 cdn_loadgen.py http://127.0.0.1:8080 --clients 20 --strategy parallel
+    python3 cdn_loadgen.py --spawn --latency 80 --bandwidth 2MB --strategy sequential bundle
+    python3 cdn_loadgen.py --spawn --prefix /bounds --page-name 'page_{page}.json' --pages 604
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from cdn_server import CDNServer, add_shaping_arguments, parse_mounts, shaping_from_args
+
+STRATEGIES = ('sequential', 'parallel', 'hashed', 'bundle')
+
+# downloadQiraat pauses 50 ms after every 10th page
+SEQUENTIAL_PAUSE_EVERY = 10
+SEQUENTIAL_PAUSE = 0.05
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, path):
+        """(status, headers, body) of one GET; the connection is reopened when needed."""
+        request = (f'GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                   f'User-Agent: mushaf-loadgen\r\n\r\n')
+        try:
+            if self.writer is None:
+                await self._connect()
+            self.writer.write(request.encode('latin-1'))
+            await self.writer.drain()
+            head = await self.reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            status = int(lines[0].split(' ')[1])
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        except (asyncio.IncompleteReadError, OSError, IndexError, ValueError) as e:
+            self.close()
+            raise RequestFailed(f'{path}: {type(e).__name__}') from e
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers, body
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.bytes = 0
+        self.retries = 0
+        self.failures = 0
+        self.client_times = []
+
+
+class Client:
+    """One simulated app install."""
+
+    def __init__(self, host, port, stats, retries, concurrency):
+        self.connections = asyncio.Queue()
+        for _ in range(concurrency):
+            self.connections.put_nowait(Connection(host, port))
+        self.stats = stats
+        self.retries = retries
+
+    async def fetch(self, path):
+        """Body of path, retrying failures; None when every attempt failed."""
+        connection = await self.connections.get()
+        try:
+            for attempt in range(self.retries + 1):
+                start = time.perf_counter()
+                try:
+                    status, _, body = await connection.get(path)
+                except RequestFailed:
+                    status, body = None, b''
+                if status == 200:
+                    self.stats.latencies.append(time.perf_counter() - start)
+                    self.stats.bytes += len(body)
+                    return body
+                if status == 404:
+                    break
+                if attempt < self.retries:
+                    self.stats.retries += 1
+            self.stats.failures += 1
+            return None
+        finally:
+            self.connections.put_nowait(connection)
+
+    async def fetch_all(self, paths):
+        return await asyncio.gather(*(self.fetch(p) for p in paths))
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+def page_paths(args):
+    return [f'{args.prefix.rstrip("/")}/{args.qiraat}/{args.page_name.format(page=page)}'
+            for page in range(1, args.pages + 1)]
+
+
+async def run_client(client, strategy, args):
+    if strategy == 'sequential':
+        for number, path in enumerate(page_paths(args), start=1):
+            await client.fetch(path)
+            if number % SEQUENTIAL_PAUSE_EVERY == 0:
+                await asyncio.sleep(SEQUENTIAL_PAUSE)
+    elif strategy == 'parallel':
+        await client.fetch_all(page_paths(args))
+    elif strategy == 'hashed':
+        manifest = await client.fetch(f'/hashed/{args.qiraat}/pages.json')
+        if manifest is not None:
+            pages = json.loads(manifest)['pages']
+            await client.fetch_all([f'/hashed/{args.qiraat}/{p["name"]}' for p in pages.values()])
+    elif strategy == 'bundle':
+        index = await client.fetch(f'/bundles/{args.qiraat}.index.json')
+        if index is not None:
+            segments = json.loads(index)['segments']
+            await client.fetch_all([f'/bundles/{s["name"]}' for s in segments])
+
+
+async def run_strategy(host, port, strategy, args):
+    stats = Stats()
+    concurrency = 1 if strategy == 'sequential' else args.concurrency
+
+    async def one_client():
+        client = Client(host, port, stats, args.retries, concurrency)
+        start = time.perf_counter()
+        try:
+            await run_client(client, strategy, args)
+        finally:
+            client.close()
+        stats.client_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(args.clients)))
+    return stats, time.perf_counter() - start
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(share * len(values)), len(values) - 1)]
+
+
+def report(strategy, stats, elapsed):
+    latencies = stats.latencies
+    return {
+        'strategy': strategy,
+        'requests': len(latencies),
+        'failures': stats.failures,
+        'retries': stats.retries,
+        'megabytes': round(stats.bytes / 1024 / 1024, 2),
+        'seconds': round(elapsed, 3),
+        'throughputMBps': round(stats.bytes / 1024 / 1024 / elapsed, 2) if elapsed else 0.0,
+        'latencyMs': {name: round(percentile(latencies, share) * 1000, 1)
+                      for name, share in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))},
+        'clientSeconds': {name: round(percentile(stats.client_times, share), 2)
+                          for name, share in (('p50', 0.5), ('p95', 0.95), ('max', 1.0))},
+    }
+
+
+async def run(args):
+    server = None
+    if args.spawn:
+        server = CDNServer(parse_mounts(args.mount), shaping_from_args(args))
+        await server.start('127.0.0.1', 0)
+        host, port = '127.0.0.1', server.port
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    results = []
+    try:
+        for strategy in args.strategy:
+            stats, elapsed = await run_strategy(host, port, strategy, args)
+            results.append(report(strategy, stats, elapsed))
+    finally:
+        if server:
+            await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate concurrent qiraat downloads against a CDN.')
+    parser.add_argument('url', nargs='?', default='http://127.0.0.1:8080', help='CDN base URL')
+    parser.add_argument('--strategy', nargs='+', choices=STRATEGIES, default=['sequential', 'parallel'])
+    parser.add_argument('--qiraat', default='nafi_warsh')
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=6, help='requests in flight per client')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=605)
+    parser.add_argument('--prefix', default='/qiraats', help='URL prefix of the page folders')
+    parser.add_argument('--page-name', default='page_{page:03d}.jpg', help='page file name template')
+    parser.add_argument('--json', help='write the results here')
+    parser.add_argument('--spawn', action='store_true', help='run a cdn_server in-process with the shaping below')
+    parser.add_argument('--mount', action='append', help='extra mount for --spawn, /prefix=directory')
+    add_shaping_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print('=' * 70)
+    print(f'Download load test: {args.clients} clients, {args.qiraat}')
+    print('=' * 70)
+    print(f'  {"strategy":10s} {"reqs":>6s} {"fail":>5s} {"MB":>8s} {"MB/s":>7s} '
+          f'{"p50 ms":>8s} {"p95 ms":>8s} {"p99 ms":>8s} {"client p95 s":>13s}')
+    for r in results:
+        lat = r['latencyMs']
+        print(f'  {r["strategy"]:10s} {r["requests"]:6d} {r["failures"]:5d} {r["megabytes"]:8.1f} '
+              f'{r["throughputMBps"]:7.1f} {lat["p50"]:8.1f} {lat["p95"]:8.1f} {lat["p99"]:8.1f} '
+              f'{r["clientSeconds"]["p95"]:13.2f}')
+    if any(r['requests'] == 0 for r in results):
+        print('⚠️  Some strategies fetched nothing: check --prefix/--page-name or build bundles/hashed pages first')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'✓ Results written to {args.json}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Local CDN stand-in for measuring the download path without R2.
+
+A small asyncio HTTP/1.1 static server (keep-alive, GET/HEAD) that serves
+the pipeline outputs under URL prefixes:
+  /qiraats/   assets/images/qiraats      page images
+  /bounds/    assets/json/bounds         ayah bounds pages
+  /bundles/   dist/bundles               packed bundles (qiraat_bundle.py)
+  /hashed/    dist/hashed                content-hashed pages (hashed_assets.py)
+  /tiles/     dist/tiles                 deep-zoom tile pyramids (deep_zoom.py)
+
+Like the real edge it answers single Range requests (206, or 416 when the
+range lies past the end; multi-range and malformed Range headers are
+ignored and get the whole file with 200), sends strong
+ETags (quoted MD5, as S3/R2 do) and honours If-None-Match with 304, and uses
+the same Cache-Control as the publisher. Every response can be shaped:
+  --latency / --jitter   time to first byte, in ms (uniform jitter)
+  --bandwidth            per-connection transfer rate, e.g. 2MB (per second)
+  --error-rate           share of requests answered 503
+  --drop-rate            share of responses cut off halfway through the body
+Shaping is random but reproducible with --seed.
+
+Usage:
+    python3 cdn_server.py                                    # http://127.0.0.1:8080/
+    python3 cdn_server.py --latency 80 --jitter 40 --bandwidth 1MB --error-rate 0.01
+    python3 cdn_server.py --mount /pngs=/data/png_pages --port 9000
+
+Benchmark it with cdn_loadgen.py.
+"""
+
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import mimetypes
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from hashed_assets import cache_control
+
+ROOT_DIR = Path(__file__).parent.parent
+DEFAULT_MOUNTS = {
+    '/qiraats/': ROOT_DIR / 'assets' / 'images' / 'qiraats',
+    '/bounds/': ROOT_DIR / 'assets' / 'json' / 'bounds',
+    '/bundles/': ROOT_DIR / 'dist' / 'bundles',
+    '/hashed/': ROOT_DIR / 'dist' / 'hashed',
+    '/tiles/': ROOT_DIR / 'dist' / 'tiles',
+}
+mimetypes.add_type('application/xml', '.dzi')
+
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+
+# Load tests open hundreds of connections at once; a short listen backlog
+# drops SYNs and shows up as 1 s retransmit stalls in the tail latency
+LISTEN_BACKLOG = 1024
+
+REASONS = {200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request',
+           404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable',
+           503: 'Service Unavailable'}
+
+
+def parse_size(text):
+    """'2MB' / '512K' / '1000' -> bytes."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([KMG]?)B?', str(text).strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f'invalid size: {text}')
+    return int(float(match.group(1)) * 1024 ** ' KMG'.index(match.group(2) or ' '))
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single byte range, clamped to the file, or None when
+    the header is malformed or asks for several ranges and is to be ignored.
+
+    An unsatisfiable range comes back with start >= size.
+    """
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last n bytes
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class Shaping:
+    """Latency, bandwidth and failure injection applied to every response."""
+
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=0, error_rate=0.0, drop_rate=0.0, seed=None):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+
+    def first_byte_delay(self):
+        return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+
+    def fails(self):
+        return self.random.random() < self.error_rate
+
+    def drops(self):
+        return self.random.random() < self.drop_rate
+
+
+class CDNServer:
+    """Static file server with CDN-like headers and response shaping."""
+
+    def __init__(self, mounts=None, shaping=None):
+        mounts = DEFAULT_MOUNTS if mounts is None else mounts
+        # Longest prefix first so /a/b/ wins over /a/
+        self.mounts = sorted(((prefix, Path(root).resolve()) for prefix, root in mounts.items()),
+                             key=lambda m: -len(m[0]))
+        self.shaping = shaping or Shaping()
+        self._etags = {}  # (path, size, mtime_ns) -> future of the ETag
+        self.requests = 0
+        self.bytes_sent = 0
+        self.server = None
+        self._writers = set()
+
+    def resolve(self, url_path):
+        """Map a URL path to a file below a mount, or None."""
+        for prefix, root in self.mounts:
+            if url_path.startswith(prefix):
+                path = (root / url_path[len(prefix):]).resolve()
+                try:
+                    path.relative_to(root)  # Path.is_relative_to needs Python 3.9
+                except ValueError:
+                    continue
+                if path.is_file():
+                    return path
+        return None
+
+    @staticmethod
+    def _md5_etag(path):
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return f'"{digest.hexdigest()}"'
+
+    async def etag(self, path, stat):
+        """Quoted MD5 of a file, hashed once per version in a worker thread.
+
+        Concurrent requests for a file that is not hashed yet share one job,
+        and the event loop keeps serving other connections meanwhile.
+        """
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        future = self._etags.get(key)
+        if future is None:
+            future = self._etags[key] = asyncio.get_running_loop().run_in_executor(None, self._md5_etag, path)
+        try:
+            return await asyncio.shield(future)
+        except OSError:
+            self._etags.pop(key, None)
+            raise
+
+    async def start(self, host='127.0.0.1', port=8080):
+        self.server = await asyncio.start_server(self._handle, host, port, backlog=LISTEN_BACKLOG)
+        return self.server
+
+    async def stop(self):
+        """Stop listening and close every open connection."""
+        self.server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self.server.wait_closed()
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+                keep_alive = await self._respond(head, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # client went away, or the server is shutting down
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def _send_head(self, writer, status, headers):
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+    async def _respond(self, head, writer):
+        """Answer one request. Returns whether the connection stays open."""
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            await self._send_head(writer, 400, {'Content-Length': '0', 'Connection': 'close'})
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        self.requests += 1
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+        base = {'Server': 'mushaf-cdn-stand-in', 'Connection': 'keep-alive' if keep_alive else 'close'}
+
+        await asyncio.sleep(self.shaping.first_byte_delay())
+
+        if method not in ('GET', 'HEAD'):
+            await self._send_head(writer, 405, {**base, 'Allow': 'GET, HEAD', 'Content-Length': '0'})
+            return keep_alive
+        if self.shaping.fails():
+            await self._send_head(writer, 503, {**base, 'Retry-After': '1', 'Content-Length': '0'})
+            return keep_alive
+
+        url_path = unquote(urlsplit(target).path)
+        path = self.resolve(url_path)
+        if path is None:
+            await self._send_head(writer, 404, {**base, 'Content-Length': '0'})
+            return keep_alive
+
+        stat = path.stat()
+        size = stat.st_size
+        try:
+            etag = await self.etag(path, stat)
+        except OSError:
+            await self._send_head(writer, 404, {**base, 'Content-Length': '0'})
+            return keep_alive
+        common = {
+            **base,
+            'ETag': etag,
+            'Cache-Control': cache_control(url_path),
+            'Last-Modified': email.utils.formatdate(stat.st_mtime, usegmt=True),
+            'Accept-Ranges': 'bytes',
+        }
+
+        if etag in [t.strip() for t in headers.get('if-none-match', '').split(',')]:
+            await self._send_head(writer, 304, {**common, 'Content-Length': '0'})
+            return keep_alive
+
+        start, end, status = 0, size - 1, 200
+        byte_range = parse_range(headers['range'], size) if 'range' in headers else None
+        if byte_range:
+            start, end = byte_range
+            if start >= size or start > end:
+                await self._send_head(writer, 416, {**common, 'Content-Range': f'bytes */{size}',
+                                                    'Content-Length': '0'})
+                return keep_alive
+            status = 206
+            common['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+        length = end - start + 1
+        await self._send_head(writer, status, {
+            **common,
+            'Content-Type': mimetypes.guess_type(path.name)[0] or 'application/octet-stream',
+            'Content-Length': str(length),
+        })
+        if method == 'HEAD':
+            return keep_alive
+
+        # A dropped response stops halfway and closes the connection
+        limit = length // 2 if self.shaping.drops() else length
+        await self._send_body(writer, path, start, limit)
+        return keep_alive and limit == length
+
+    async def _send_body(self, writer, path, start, length):
+        bandwidth = self.shaping.bandwidth
+        began = time.perf_counter()
+        sent = 0
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while sent < length:
+                chunk = f.read(min(CHUNK_SIZE, length - sent))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                sent += len(chunk)
+                self.bytes_sent += len(chunk)
+                if bandwidth:
+                    ahead = sent / bandwidth - (time.perf_counter() - began)
+                    if ahead > 0:
+                        await asyncio.sleep(ahead)
+
+
+def parse_mounts(values):
+    mounts = dict(DEFAULT_MOUNTS)
+    for value in values or []:
+        prefix, _, directory = value.partition('=')
+        if not directory:
+            raise argparse.ArgumentTypeError(f'--mount expects /prefix=directory, got {value}')
+        mounts['/' + prefix.strip('/') + '/'] = Path(directory)
+    return mounts
+
+
+def add_shaping_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.0, help='time to first byte in ms')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform latency jitter in ms')
+    parser.add_argument('--bandwidth', type=parse_size, default=0, help='per-connection bytes/s, e.g. 2MB')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered 503')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='share of responses cut off mid-body')
+    parser.add_argument('--seed', type=int, help='seed for reproducible shaping')
+
+
+def shaping_from_args(args):
+    return Shaping(args.latency, args.jitter, args.bandwidth, args.error_rate, args.drop_rate, args.seed)
+
+
+async def _serve(server, host, port):
+    await server.start(host, port)
+    print(f'✓ CDN stand-in on http://{host}:{server.port}/')
+    for prefix, root in server.mounts:
+        print(f'    {prefix:12s} {root}{"" if root.is_dir() else "  (missing)"}')
+    shaping = server.shaping
+    print(f'    latency {shaping.latency * 1000:.0f}±{shaping.jitter * 1000:.0f} ms, '
+          f'bandwidth {"unlimited" if not shaping.bandwidth else f"{shaping.bandwidth / 1024:.0f} KB/s"}, '
+          f'errors {shaping.error_rate:.1%}, drops {shaping.drop_rate:.1%}')
+    async with server.server:
+        await server.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local CDN stand-in with latency/bandwidth/failure shaping.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--mount', action='append', help='extra mount, /prefix=directory (repeatable)')
+    add_shaping_arguments(parser)
+    args = parser.parse_args()
+
+    server = CDNServer(parse_mounts(args.mount), shaping_from_args(args))
+    try:
+        asyncio.run(_serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print(f'\n✓ {server.requests} requests, {server.bytes_sent / 1024 / 1024:.1f} MB sent')
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Compile Tanzil's quran-data.xml into the packed metadata artifact.
+
+Run this once whenever the Tanzil metadata changes; every other tool then
+loads tools/data/tanzil_metadata.bin through tanzil_metadata.py instead of
+re-parsing the XML.
+
+The artifact holds these uint16 tables (see tanzil_metadata.py for the layout):
+  sura     ayas, global start, type, revelation order, rukus   (114 rows)
+  juz, quarter, manzil, ruku, page                 first (sura, aya)
+  sajda    sura, aya, type
+  ayapage, ayajuz, ayaqrtr, ayamnzl, ayaruku       one value per ayah (6236)
+plus a UTF-8 `names` table with the Arabic, transliterated and English names.
+
+It then writes the per-riwaya juz/hizb/rub'/manzil indexes (division_index.py)
+next to the artifact.
+
+Usage:
+    python3 compile_tanzil_metadata.py /path/to/quran-data.xml
+    python3 compile_tanzil_metadata.py quran-data.xml --output data/tanzil_metadata.bin
+
+Download quran-data.xml from https://tanzil.net/docs/quran_metadata
+
+Requirements:
+pip install numpy
+"""
+
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+
+from bounds_model import write_bytes_atomic
+from tanzil_metadata import (DEFAULT_PATH, FORMAT_VERSION, HEADER, MAGIC, SAJDA_TYPES,
+                             SURA_TYPES, TABLE_ENTRY, TanzilMetadata)
+from tanzil_reader import DIVISION_KINDS, Division, Sura, iter_tanzil
+from division_index import DEFAULT_DIR as DIVISIONS_DIR, write_indexes
+
+# Per-ayah lookup table built from each division's start list
+PER_AYAH_TABLES = {
+    'page': 'ayapage',
+    'juz': 'ayajuz',
+    'quarter': 'ayaqrtr',
+    'manzil': 'ayamnzl',
+    'ruku': 'ayaruku',
+}
+
+
+def parse_quran_data(xml_path):
+    """Stream quran-data.xml into plain Python lists."""
+    suras = []
+    divisions = {kind: [] for kind in DIVISION_KINDS}
+    sajdas = []
+
+    for record in iter_tanzil(xml_path, {'sura', 'sajda', *DIVISION_KINDS}):
+        if isinstance(record, Sura):
+            suras.append({
+                'index': record.index,
+                'ayas': record.ayas,
+                'start': record.start,
+                'type': SURA_TYPES.index(record.type),
+                'order': record.order,
+                'rukus': record.rukus,
+                'names': (record.name, record.tname, record.ename),
+            })
+        elif isinstance(record, Division):
+            divisions[record.kind].append((record.sura, record.aya))
+        else:
+            sajdas.append((record.sura, record.aya, SAJDA_TYPES.index(record.type)))
+
+    return suras, divisions, sajdas
+
+
+def per_ayah_division(starts, sura_starts, total_ayas):
+    """Expand a sorted list of division starts into one division number per ayah."""
+    values = [0] * total_ayas
+    marks = [sura_starts[sura - 1] + aya - 1 for sura, aya in starts]
+    for number, (first, nxt) in enumerate(zip(marks, marks[1:] + [total_ayas]), start=1):
+        values[first:nxt] = [number] * (nxt - first)
+    return values
+
+
+def build_tables(suras, divisions, sajdas):
+    """Return {name: (typecode, width, values)} ready to be packed."""
+    suras = sorted(suras, key=lambda s: s['index'])
+    total_ayas = sum(s['ayas'] for s in suras)
+    sura_starts = [s['start'] for s in suras]
+
+    # Sanity checks: the tables below assume a consistent source
+    running = 0
+    for sura in suras:
+        if sura['start'] != running:
+            raise ValueError(f"sura {sura['index']} starts at {sura['start']}, expected {running}")
+        running += sura['ayas']
+    for table, starts in divisions.items():
+        if starts != sorted(starts) or starts[0] != (1, 1):
+            raise ValueError(f'{table} starts are not sorted from 1:1')
+
+    tables = {
+        'sura': ('H', 5, [v for s in suras
+                          for v in (s['ayas'], s['start'], s['type'], s['order'], s['rukus'])]),
+        'sajda': ('H', 3, [v for row in sajdas for v in row]),
+    }
+    for table, starts in divisions.items():
+        tables[table] = ('H', 2, [v for row in starts for v in row])
+        tables[PER_AYAH_TABLES[table]] = ('H', 1, per_ayah_division(starts, sura_starts, total_ayas))
+
+    names = '\n'.join('\t'.join(s['names']) for s in suras).encode('utf-8')
+    tables['names'] = ('s', 1, names)
+    return tables, total_ayas
+
+
+def pack_artifact(tables, total_ayas):
+    """Pack tables behind a header and directory, 8-byte aligned for mmap views."""
+    directory_size = HEADER.size + TABLE_ENTRY.size * len(tables)
+    offset = (directory_size + 7) & ~7
+
+    entries = []
+    blobs = []
+    for name, (typecode, width, values) in tables.items():
+        if typecode == 's':
+            blob = bytes(values)
+            rows = len(blob)
+        else:
+            blob = struct.pack(f'<{len(values)}H', *values)
+            rows = len(values) // width
+        entries.append(TABLE_ENTRY.pack(name.encode('ascii'), typecode.encode('ascii'),
+                                        offset, rows, width))
+        padding = (-len(blob)) % 8
+        blobs.append(blob + b'\0' * padding)
+        offset += len(blob) + padding
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(tables), total_ayas) + b''.join(entries)
+    header += b'\0' * ((-len(header)) % 8)
+    return header + b''.join(blobs)
+
+
+def compile_xml(xml_path):
+    """The artifact bytes for a quran-data.xml, without writing them anywhere."""
+    tables, total_ayas = build_tables(*parse_quran_data(xml_path))
+    return pack_artifact(tables, total_ayas)
+
+
+def write_artifact(tables, total_ayas, output_path):
+    write_bytes_atomic(output_path, pack_artifact(tables, total_ayas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile Tanzil quran-data.xml into a packed artifact.')
+    parser.add_argument('xml', help='path to quran-data.xml')
+    parser.add_argument('--output', default=str(DEFAULT_PATH))
+    parser.add_argument('--divisions', default=str(DIVISIONS_DIR), help='per-riwaya division index directory')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print('Compiling Tanzil Metadata')
+    print('=' * 70)
+
+    start = time.perf_counter()
+    suras, divisions, sajdas = parse_quran_data(args.xml)
+    tables, total_ayas = build_tables(suras, divisions, sajdas)
+    write_artifact(tables, total_ayas, args.output)
+    elapsed = time.perf_counter() - start
+
+    # Round-trip check through the loader
+    load_start = time.perf_counter()
+    meta = TanzilMetadata(args.output)
+    load_ms = (time.perf_counter() - load_start) * 1000
+    if meta.total_ayas != total_ayas or meta.page_count != len(divisions['page']):
+        print('❌ Artifact does not round-trip')
+        sys.exit(1)
+
+    print(f'  Suras:    {len(suras)}')
+    print(f'  Ayahs:    {total_ayas}')
+    for table, starts in divisions.items():
+        print(f'  {table.capitalize() + "s:":9s} {len(starts)}')
+    print(f'  Sajdas:   {len(sajdas)}')
+    print(f'\n✓ Wrote {args.output} ({Path(args.output).stat().st_size} bytes) in {elapsed:.2f}s')
+    print(f'✓ Loader opens it in {load_ms:.2f} ms')
+
+    paths = write_indexes(args.divisions, meta=meta)
+    print(f'✓ Wrote {len(paths)} juz/hizb/rub\'/manzil indexes to {args.divisions}')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,33 +5,14 @@ This ensures all riwayats have the same ayah coordinates for audio playback,
 so that audio only plays ayahs present on each page.
 """
 
-import json
 import shutil
 from pathlib import Path
 
-# All qiraat IDs based on the folder structure and provider
-QIRAAT_IDS = [
-    'nafi_qalun',
-    'nafi_warsh',
-    'ibn_kathir_bazzi',
-    'ibn_kathir_qunbul',
-    'abu_amr_duri',
-    'abu_amr_sussi',
-    'ibn_amir_hisham',
-    'ibn_amir_ibn_dhakwan',
-    'asim_hafs',  # Source - already exists
-    'asim_shuabah',
-    'hamzah_khalaf',
-    'hamzah_khallad',
-    'al_kisai_duri',
-    'al_kisai_abu_harith',
-    'abu_jafar_ibn_wardan',
-    'abu_jafar_ibn_jammaz',
-    'yaqub_ruways',
-    'yaqub_rouh',
-    'khalaf_ishaq',
-    'khalaf_idris',
-]
+from bounds_model import BOUNDS_DIR, load_page, page_files, save_page
+from qiraat_registry import all_ids
+
+# All qiraat IDs, as registered in qiraat_registry.py
+QIRAAT_IDS = all_ids()
 
 def copy_bounds_to_qiraat(source_dir: Path, target_qiraat: str, base_dir: Path):
     """Copy all page JSON files from source to target qiraat, updating qiraatId."""
@@ -41,30 +22,27 @@ def copy_bounds_to_qiraat(source_dir: Path, target_qiraat: str, base_dir: Path):
     target_dir.mkdir(parents=True, exist_ok=True)
     
     # Get all page JSON files from source
-    page_files = sorted(source_dir.glob('page_*.json'))
+    source_files = page_files(source_dir)
     
-    print(f'\nCopying {len(page_files)} pages to {target_qiraat}...')
+    print(f'\nCopying {len(source_files)} pages to {target_qiraat}...')
     
-    for page_file in page_files:
-        # Read source JSON
-        with open(page_file, 'r', encoding='utf-8') as f:
-            page_data = json.load(f)
+    for _, page_file in source_files:
+        # Read source page
+        page = load_page(page_file)
         
         # Update qiraatId
-        page_data['qiraatId'] = target_qiraat
+        page.qiraat_id = target_qiraat
         
         # Write to target
-        target_file = target_dir / page_file.name
-        with open(target_file, 'w', encoding='utf-8') as f:
-            json.dump(page_data, f, ensure_ascii=False, indent=2)
+        save_page(target_dir / page_file.name, page)
     
-    print(f'✓ Completed {target_qiraat}: {len(page_files)} files created')
+    print(f'✓ Completed {target_qiraat}: {len(source_files)} files created')
 
 def main():
     """Copy bounds from asim_hafs to all other qiraats."""
     
     # Base directory for bounds
-    base_dir = Path(__file__).parent.parent / 'assets' / 'json' / 'bounds'
+    base_dir = BOUNDS_DIR
     source_dir = base_dir / 'asim_hafs'
     
     if not source_dir.exists():
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Ayah counting-system engine.
+
+Expands the Kufi-relative delta tables in ayah_count_data.py into flat index
+arrays, one pair per counting system:
+  to_kufi[i]    first and last Kufi ayah covered by ayah i of the system
+  from_kufi[k]  first and last system ayah covering Kufi ayah k (-1: not counted)
+Indexes are global 0-based positions in the whole Quran, so converting any
+(surah, ayah) between two systems is a couple of array lookups.
+
+Page mappings for every riwaya come from one numpy gather: each system ayah is
+placed on the Mushaf page of the first Kufi ayah it covers.
+
+Usage:
+    from counting_systems import convert, page_mappings, kufi_page_array
+    convert(2, 5, 'kufi', 'madani_2')        # -> (4, 4)
+    pages = page_mappings(kufi_page_array(), ['asim_hafs', 'nafi_warsh'])
+    pages['nafi_warsh'][3]                  # -> [(2, 1), (2, 2), (2, 3), (2, 4)]
+
+    python3 counting_systems.py              # per-system totals
+
+Requirements:
+pip install numpy
+"""
+
+import numpy as np
+
+from ayah_count_data import (COUNTING_DELTAS, COUNTING_SYSTEM_ALIASES, COUNTING_SYSTEMS, DROP,
+                             HAFS_AYAH_COUNTS, MERGE, SPLIT, AYAH_COUNTS, counting_system_for)
+
+
+def _starts(counts):
+    starts = np.zeros(114, dtype=np.int32)
+    np.cumsum([counts[s] for s in range(1, 114)], out=starts[1:])
+    return starts
+
+
+KUFI_STARTS = _starts(HAFS_AYAH_COUNTS)
+KUFI_TOTAL = sum(HAFS_AYAH_COUNTS.values())
+
+
+class CountingSystem:
+    """Index arrays for one counting system."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = AYAH_COUNTS[name]
+        self.starts = _starts(self.counts)
+        self.total = sum(self.counts.values())
+
+        self.from_kufi = np.full((KUFI_TOTAL, 2), -1, dtype=np.int32)
+        self.to_kufi = np.zeros((self.total, 2), dtype=np.int32)
+        self.surahs = np.zeros(self.total, dtype=np.int16)
+        self.ayahs = np.zeros(self.total, dtype=np.int16)
+
+        deltas = COUNTING_DELTAS[name]
+        for surah in range(1, 115):
+            self._expand_surah(surah, dict(deltas.get(surah, ())))
+
+    def _expand_surah(self, surah, operations):
+        kufi_base = KUFI_STARTS[surah - 1]
+        base = self.starts[surah - 1]
+        ayah = 0
+        merging = False
+
+        for kufi_ayah in range(1, HAFS_AYAH_COUNTS[surah] + 1):
+            k = kufi_base + kufi_ayah - 1
+            operation = operations.get(kufi_ayah)
+            if operation == DROP:
+                continue
+
+            if merging:
+                self.to_kufi[base + ayah - 1, 1] = k
+            else:
+                ayah += 1
+                self.to_kufi[base + ayah - 1] = (k, k)
+            first = ayah
+            if operation == SPLIT:
+                ayah += 1
+                self.to_kufi[base + ayah - 1] = (k, k)
+            self.from_kufi[k] = (base + first - 1, base + ayah - 1)
+            merging = operation == MERGE
+
+        if ayah != self.counts[surah]:
+            raise ValueError(f'{self.name}: surah {surah} expands to {ayah} ayahs, '
+                             f'expected {self.counts[surah]}')
+        self.surahs[base:base + ayah] = surah
+        self.ayahs[base:base + ayah] = np.arange(1, ayah + 1)
+
+    def global_index(self, surah, ayah):
+        if not 1 <= ayah <= self.counts.get(surah, 0):
+            raise ValueError(f'{surah}:{ayah} does not exist in the {self.name} count')
+        return int(self.starts[surah - 1]) + ayah - 1
+
+    def __repr__(self):
+        return f'CountingSystem({self.name}, {self.total} ayahs)'
+
+
+_systems = {}
+
+
+def get_system(name):
+    """Return the (cached) CountingSystem for a system name or alias."""
+    name = COUNTING_SYSTEM_ALIASES.get(name, name)
+    if name not in COUNTING_SYSTEMS:
+        raise ValueError(f'Unknown counting system: {name}')
+    if name not in _systems:
+        _systems[name] = CountingSystem(name)
+    return _systems[name]
+
+
+def system_for_qiraat(qiraat_id):
+    return get_system(counting_system_for(qiraat_id))
+
+
+def to_kufi(surah, ayah, system):
+    """(surah, ayah) in a system -> (first, last) Kufi ayah numbers it covers."""
+    system = get_system(system)
+    first, last = system.to_kufi[system.global_index(surah, ayah)]
+    base = int(KUFI_STARTS[surah - 1])
+    return int(first) - base + 1, int(last) - base + 1
+
+
+def from_kufi(surah, ayah, system):
+    """Kufi (surah, ayah) -> (first, last) ayah numbers in a system, or None if not counted."""
+    system = get_system(system)
+    first, last = system.from_kufi[get_system('kufi').global_index(surah, ayah)]
+    if first < 0:
+        return None
+    base = int(system.starts[surah - 1])
+    return int(first) - base + 1, int(last) - base + 1
+
+
+def convert(surah, ayah, source, target):
+    """
+    Map (surah, ayah) from one counting system to another.
+
+    Returns the (first, last) range of target ayahs that overlap it, or None
+    when the target does not count that text as an ayah (Al-Fatiha's basmala).
+    """
+    first_kufi, last_kufi = to_kufi(surah, ayah, source)
+    covered = [r for r in (from_kufi(surah, k, target) for k in range(first_kufi, last_kufi + 1))
+               if r is not None]
+    if not covered:
+        return None
+    return covered[0][0], covered[-1][1]
+
+
+def kufi_page_array(meta=None):
+    """Mushaf page of every Kufi ayah, from the compiled Tanzil metadata."""
+    from tanzil_metadata import MUSHAF_PAGE_OFFSET, get_metadata
+
+    meta = meta or get_metadata()
+    return np.asarray(meta.per_ayah('ayapage'), dtype=np.int32) + MUSHAF_PAGE_OFFSET
+
+
+def page_mappings(kufi_pages, qiraat_ids):
+    """
+    Build {qiraat_id: {page: [(surah, ayah), ...]}} for several riwayat at once.
+
+    kufi_pages holds the Mushaf page of every Kufi ayah (see kufi_page_array).
+    Riwayat that share a counting system share one result.
+    """
+    kufi_pages = np.asarray(kufi_pages)
+    if len(kufi_pages) != KUFI_TOTAL:
+        raise ValueError(f'expected {KUFI_TOTAL} Kufi ayah pages, got {len(kufi_pages)}')
+
+    names = sorted({counting_system_for(q) for q in qiraat_ids})
+    systems = [get_system(name) for name in names]
+
+    # One gather for every system: page of the first Kufi ayah of each ayah
+    first_kufi = np.concatenate([s.to_kufi[:, 0] for s in systems])
+    pages = kufi_pages[first_kufi]
+    surahs = np.concatenate([s.surahs for s in systems]).tolist()
+    ayahs = np.concatenate([s.ayahs for s in systems]).tolist()
+
+    by_system = {}
+    offset = 0
+    for system in systems:
+        end = offset + system.total
+        segment = pages[offset:end]
+        breaks = np.flatnonzero(np.diff(segment)) + 1
+        bounds = np.concatenate(([0], breaks, [system.total])) + offset
+        by_system[system.name] = {
+            int(pages[lo]): list(zip(surahs[lo:hi], ayahs[lo:hi]))
+            for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+        }
+        offset = end
+
+    return {q: by_system[counting_system_for(q)] for q in qiraat_ids}
+
+
+def main():
+    print('=' * 70)
+    print('Ayah Counting Systems')
+    print('=' * 70)
+    for name in COUNTING_SYSTEMS:
+        system = get_system(name)
+        differing = sorted(COUNTING_DELTAS[name])
+        print(f'  {name:10s} {system.total:5d} ayahs, '
+              f'{len(differing)} surahs differ from Kufi {differing or ""}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Deep-zoom tile pyramids for high-DPI page rendering.
+
+The reader pages are 150 DPI, which looks soft once a reader zooms in.
+Instead of raising the DPI of every page, pages can also be rendered at
+300-600 DPI into a Deep Zoom (DZI) tile pyramid; clients keep the 150 DPI
+page for the normal view and fetch high-resolution tiles only for the
+zoomed viewport.
+
+Output (dist/tiles/<qiraat>/), the layout OpenSeadragon and most DZI viewers
+read directly:
+  page_1.dzi                      <Image TileSize Overlap Format><Size Width Height/>
+  page_1_files/<level>/<col>_<row>.jpg
+  tiles.json                      per-qiraat manifest:
+  {"version": 1, "qiraatId": "nafi_warsh", "dpi": 400, "baseDpi": 150,
+   "tileSize": 254, "overlap": 1, "format": "jpg",
+   "pages": {"1": {"dzi": "page_1.dzi", "tiles": "page_1_files",
+                   "width": 3307, "height": 4677, "maxLevel": 13}}}
+
+Level L is the page scaled by 1 / 2^(maxLevel - L), rounded up; level
+maxLevel is full resolution and level 0 is 1x1. A tile (col, row) covers
+[col * tileSize, (col + 1) * tileSize) plus `overlap` pixels on each inner
+edge. visible_tiles() is the reference for picking the tiles of a viewport.
+
+Serve the tiles locally with cdn_server.py (mounted under /tiles/).
+
+Usage:
+    python3 deep_zoom.py pdf nafi_warsh ../assets/pdfs/Nafi3/Warsh.pdf --dpi 400
+    python3 deep_zoom.py pdf nafi_warsh --pages 1-20             # the registry's PDF
+    python3 deep_zoom.py image nafi_warsh scans/page_1.png scans/page_2.png
+    python3 ../convert_multiple_qiraats.py nafi_warsh --deep-zoom   # with the 150 DPI pages
+    python3 cdn_server.py                       # http://127.0.0.1:8080/tiles/nafi_warsh/page_1.dzi
+
+Requirements:
+pip install Pillow pdf2image        (pdf2image needs poppler)
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from bounds_model import read_json, write_bytes_atomic, write_json
+from qiraat_registry import get_riwaya, resolve_id
+
+ROOT_DIR = Path(__file__).parent.parent
+TILES_DIR = ROOT_DIR / 'dist' / 'tiles'
+
+MANIFEST_NAME = 'tiles.json'
+MANIFEST_VERSION = 1
+
+DEFAULT_DPI = 400
+BASE_DPI = 150  # the reader's normal page images (convert_multiple_qiraats.py)
+# 254 + 2 * 1 overlap keeps inner tiles at 256 px
+TILE_SIZE = 254
+TILE_OVERLAP = 1
+TILE_FORMAT = 'jpg'
+TILE_QUALITY = 80
+
+DZI_TEMPLATE = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile_size}" '
+                'Overlap="{overlap}" Format="{format}"><Size Width="{width}" Height="{height}"/></Image>\n')
+
+
+def max_level(width, height):
+    return math.ceil(math.log2(max(width, height, 1)))
+
+
+def level_size(width, height, level, top):
+    scale = 2 ** (top - level)
+    return math.ceil(width / scale), math.ceil(height / scale)
+
+
+def tile_box(col, row, width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Pixel box of a tile within its level image."""
+    left = col * tile_size - (overlap if col else 0)
+    top = row * tile_size - (overlap if row else 0)
+    right = min(width, (col + 1) * tile_size + overlap)
+    bottom = min(height, (row + 1) * tile_size + overlap)
+    return left, top, right, bottom
+
+
+def visible_tiles(page, zoom, viewport, tile_size=TILE_SIZE):
+    """
+    (level, [(col, row)]) needed to draw a viewport of a page.
+
+    zoom is screen pixels per full-resolution pixel; viewport is
+    (left, top, right, bottom) in full-resolution pixels.
+    """
+    top_level = page['maxLevel']
+    # The smallest level that is at least as sharp as the screen
+    level = max(0, min(top_level, top_level + math.ceil(math.log2(max(zoom, 1e-9)))))
+    scale = 2 ** (top_level - level)
+    width, height = level_size(page['width'], page['height'], level, top_level)
+    left, top, right, bottom = (max(0, v / scale) for v in viewport)
+    cols = range(int(left // tile_size), min(math.ceil(min(right, width) / tile_size), math.ceil(width / tile_size)))
+    rows = range(int(top // tile_size), min(math.ceil(min(bottom, height) / tile_size), math.ceil(height / tile_size)))
+    return level, [(col, row) for row in rows for col in cols]
+
+
+def build_pyramid(image, output_dir, name, tile_size=TILE_SIZE, overlap=TILE_OVERLAP,
+                  tile_format=TILE_FORMAT, quality=TILE_QUALITY, workers=4):
+    """Write <name>.dzi and <name>_files/ for an image. Returns the page's manifest entry."""
+    output_dir = Path(output_dir)
+    tiles_dir = output_dir / f'{name}_files'
+    image = image.convert('L' if image.mode in ('L', '1', 'LA') else 'RGB')
+    width, height = image.size
+    top_level = max_level(width, height)
+    save_options = {'quality': quality, 'optimize': True} if tile_format == 'jpg' else {}
+
+    def save_tile(job):
+        level_image, path, box = job
+        level_image.crop(box).save(path, 'JPEG' if tile_format == 'jpg' else tile_format.upper(),
+                                   **save_options)
+
+    current = image
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for level in range(top_level, -1, -1):
+            level_dir = tiles_dir / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            level_width, level_height = current.size
+            jobs = [(current, level_dir / f'{col}_{row}.{tile_format}',
+                     tile_box(col, row, level_width, level_height, tile_size, overlap))
+                    for row in range(math.ceil(level_height / tile_size))
+                    for col in range(math.ceil(level_width / tile_size))]
+            list(pool.map(save_tile, jobs))
+            if level:
+                # reduce() rounds up, matching the DZI level sizes
+                current = current.reduce(2)
+
+    dzi_path = output_dir / f'{name}.dzi'
+    # The .dzi goes last: it marks the pyramid complete
+    write_bytes_atomic(dzi_path, DZI_TEMPLATE.format(tile_size=tile_size, overlap=overlap, format=tile_format,
+                                                     width=width, height=height).encode('utf-8'))
+    return {'dzi': dzi_path.name, 'tiles': tiles_dir.name, 'width': width, 'height': height,
+            'maxLevel': top_level}
+
+
+class TileManifest:
+    """tiles.json of one riwaya, updated page by page."""
+
+    def __init__(self, qiraat_id, output_dir=TILES_DIR, dpi=DEFAULT_DPI):
+        self.path = Path(output_dir) / qiraat_id / MANIFEST_NAME
+        self.data = read_json(self.path) if self.path.exists() else {
+            'version': MANIFEST_VERSION,
+            'qiraatId': qiraat_id,
+            'dpi': dpi,
+            'baseDpi': BASE_DPI,
+            'tileSize': TILE_SIZE,
+            'overlap': TILE_OVERLAP,
+            'format': TILE_FORMAT,
+            'pages': {},
+        }
+        if self.data['dpi'] != dpi:
+            raise ValueError(f'{self.path} was built at {self.data["dpi"]} DPI, not {dpi}; '
+                             f'remove it to rebuild')
+
+    def has_page(self, page):
+        entry = self.data['pages'].get(str(page))
+        return entry is not None and (self.path.parent / entry['dzi']).exists()
+
+    def add_page(self, page, entry):
+        self.data['pages'][str(page)] = entry
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data['pages'] = dict(sorted(self.data['pages'].items(), key=lambda item: int(item[0])))
+        write_json(self.path, self.data)
+
+
+def _parse_pages(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def build_from_pdf(qiraat_id, pdf_path, output_dir=TILES_DIR, dpi=DEFAULT_DPI, pages=None,
+                   force=False, workers=4, progress=print):
+    """Render PDF pages one at a time at dpi and tile them. Returns the number of pages built."""
+    try:
+        from pdf2image import convert_from_path, pdfinfo_from_path
+    except ImportError:
+        raise SystemExit('Rendering PDFs needs pdf2image: pip install pdf2image')
+
+    manifest = TileManifest(qiraat_id, output_dir, dpi)
+    target = manifest.path.parent
+    first, last = pages or (1, pdfinfo_from_path(str(pdf_path))['Pages'])
+    built = 0
+    try:
+        for page in range(first, last + 1):
+            if not force and manifest.has_page(page):
+                continue
+            # One page at a time: a 600 DPI page is ~100 MB decoded
+            image = convert_from_path(str(pdf_path), dpi=dpi, first_page=page, last_page=page)[0]
+            manifest.add_page(page, build_pyramid(image, target, f'page_{page}', workers=workers))
+            built += 1
+            if built % 10 == 0:
+                manifest.save()
+                progress(f'  {qiraat_id}: page {page}/{last}')
+    finally:
+        manifest.save()
+    return built
+
+
+def build_from_images(qiraat_id, image_paths, output_dir=TILES_DIR, dpi=DEFAULT_DPI, force=False, workers=4):
+    """Tile already rendered high-resolution page images (page number taken from the file name)."""
+    manifest = TileManifest(qiraat_id, output_dir, dpi)
+    built = 0
+    try:
+        for path in image_paths:
+            numbers = re.findall(r'\d+', Path(path).stem)
+            if not numbers:
+                raise ValueError(f'{path}: no page number in the file name')
+            page = int(numbers[-1])
+            if not force and manifest.has_page(page):
+                continue
+            with Image.open(path) as image:
+                manifest.add_page(page, build_pyramid(image, manifest.path.parent, f'page_{page}',
+                                                      workers=workers))
+            built += 1
+    finally:
+        manifest.save()
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build deep-zoom tile pyramids of qiraat pages.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    from_pdf = commands.add_parser('pdf', help='render a PDF at high DPI and tile every page')
+    from_pdf.add_argument('qiraat')
+    from_pdf.add_argument('pdf', nargs='?', help="source PDF (default: the riwaya's PDF in qiraat_registry)")
+    from_pdf.add_argument('--pages', type=_parse_pages, help='page range, e.g. 1-20')
+
+    from_images = commands.add_parser('image', help='tile high-resolution page images')
+    from_images.add_argument('qiraat')
+    from_images.add_argument('images', nargs='+')
+
+    for command in (from_pdf, from_images):
+        command.add_argument('--dpi', type=int, default=DEFAULT_DPI,
+                             help='render DPI (recorded in tiles.json for images)')
+        command.add_argument('--output', default=str(TILES_DIR))
+        command.add_argument('--force', action='store_true', help='rebuild pages that are already tiled')
+        command.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    args.qiraat = resolve_id(args.qiraat)
+
+    print('=' * 70)
+    print(f'Deep-zoom tiles: {args.qiraat} at {args.dpi} DPI -> {Path(args.output) / args.qiraat}')
+    print('=' * 70)
+    start = time.perf_counter()
+    try:
+        if args.command == 'pdf':
+            pdf = args.pdf or get_riwaya(args.qiraat).pdf_path
+            if not Path(pdf).exists():
+                print(f'❌ PDF not found: {pdf}')
+                sys.exit(1)
+            built = build_from_pdf(args.qiraat, pdf, args.output, args.dpi, args.pages,
+                                   args.force, args.workers)
+        else:
+            built = build_from_images(args.qiraat, args.images, args.output, args.dpi,
+                                      args.force, args.workers)
+    except ValueError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    print(f'✓ {built} pages tiled in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Juz / hizb / rub' / manzil index for every riwaya.
+
+Built from the compiled Tanzil metadata (Kufi division starts and Madinah
+pages) and the counting_systems engine, then written as one small JSON file
+per riwaya with dense arrays:
+
+  juz, hizb, rub, manzil   {"page": [...], "surah": [...], "ayah": [...]}
+                           start of division n at index n - 1
+  pages                    {"juz": [...], "hizb": [...], "rub": [...], "manzil": [...]}
+                           division in effect at the top of page p at
+                           index p - 1 (0 before Al-Fatiha)
+
+Division starts are Kufi ayahs; other counting systems start the division
+at the ayah that holds the same text, so navigation and khatm planning are
+plain list lookups in any riwaya. Pages are those of the Hafs layout
+(Tanzil "page"): right for the riwayat of the hafs layout family in
+qiraat_registry.py, not for the Madani-layout riwayat (Warsh, Qalun), whose
+Mushaf breaks pages elsewhere. Each index records what it can vouch for:
+"pageLayout" and "pagesVerified" for the pages, "countsVerified" for the
+ayah numbers (false while the counting system is unverified in
+ayah_count_data.py).
+
+compile_tanzil_metadata.py writes the index right after the metadata
+artifact. To rebuild or check it on its own:
+    python3 division_index.py             # write tools/data/divisions/<qiraat>.json
+    python3 division_index.py --check     # verify known boundaries
+
+--check always runs check_committed(), which needs only committed data
+(tanzil_page_mappings.json and the ayah_count_data.py tables); the full index
+check runs as well when the Tanzil metadata is available.
+
+Usage:
+    from division_index import DivisionIndex
+    index = DivisionIndex('nafi_warsh')
+    index.start('juz', 2)        # -> (page, surah, ayah)
+    index.of_page('hizb', 300)   # -> hizb number at the top of page 300
+
+Requirements:
+pip install numpy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from ayah_count_data import COMPLETE_SYSTEMS, check_counts, counting_system_for, counts_verified, is_verified
+from bounds_model import read_json, write_json
+from counting_systems import from_kufi, get_system, kufi_page_array
+from qiraat_registry import HAFS_LAYOUT, all_ids, get_riwaya
+
+DEFAULT_DIR = Path(__file__).parent / 'data' / 'divisions'
+PAGE_MAPPINGS = Path(__file__).parent / 'tanzil_page_mappings.json'
+
+DIVISIONS = ('juz', 'hizb', 'rub', 'manzil')
+DIVISION_COUNTS = {'juz': 30, 'hizb': 60, 'rub': 240, 'manzil': 7}
+
+# Well-known Madinah Mushaf boundaries in Kufi numbering:
+# (division, number, surah, ayah, Mushaf page)
+KNOWN_BOUNDARIES = (
+    ('juz', 1, 1, 1, 2),
+    ('juz', 2, 2, 142, 23),
+    ('juz', 3, 2, 253, 43),
+    ('juz', 15, 17, 1, 283),
+    ('juz', 30, 78, 1, 583),
+    ('hizb', 2, 2, 75, None),
+    ('manzil', 2, 5, 1, None),
+    ('manzil', 4, 17, 1, None),
+    ('manzil', 7, 50, 1, None),
+)
+
+# The same starts in the Madani count of Warsh and Qalun, where "Alif Lam
+# Mim" belongs to the first ayah of Al-Baqarah: (division, number, surah, ayah)
+MADANI_BOUNDARIES = (
+    ('juz', 2, 2, 141),
+    ('juz', 3, 2, 252),
+    ('juz', 15, 17, 1),
+    ('juz', 30, 78, 1),
+    ('manzil', 2, 5, 1),
+    ('manzil', 7, 50, 1),
+)
+
+
+def _kufi_starts(meta):
+    """{division: [(surah, ayah)]} of Kufi division starts from the metadata."""
+    quarters = meta.quarter_starts()
+    return {
+        'juz': meta.juz_starts(),
+        'hizb': quarters[::4],
+        'rub': quarters,
+        'manzil': meta.manzil_starts(),
+    }
+
+
+def build_index(qiraat_id, meta=None, kufi_pages=None):
+    """Build the division index dict for one riwaya."""
+    from tanzil_metadata import MUSHAF_PAGE_OFFSET, get_metadata
+
+    meta = meta or get_metadata()
+    kufi_pages = kufi_page_array(meta) if kufi_pages is None else kufi_pages
+    system_name = counting_system_for(qiraat_id)
+    system = get_system(system_name)
+    kufi = get_system('kufi')
+
+    # Page of every ayah of this system (page of the first Kufi ayah it covers)
+    ayah_pages = kufi_pages[system.to_kufi[:, 0]]
+    page_count = meta.page_count + MUSHAF_PAGE_OFFSET
+    page_numbers = np.arange(1, page_count + 1)
+
+    # Ayah in effect at the top of every page: the first ayah starting on it,
+    # or the one running over from the previous page
+    top = np.searchsorted(ayah_pages, page_numbers, side='left')
+    starts_here = (top < system.total) & (ayah_pages[np.minimum(top, system.total - 1)] == page_numbers)
+    top = np.where(starts_here, top, top - 1)
+
+    index = {
+        'qiraatId': qiraat_id,
+        'countingSystem': system_name,
+        'countsVerified': is_verified(system_name),
+        'pageLayout': HAFS_LAYOUT,
+        'pagesVerified': get_riwaya(qiraat_id).layout_family == HAFS_LAYOUT,
+        'pageCount': int(page_count),
+    }
+    # A Kufi start this system does not count begins at the next counted ayah
+    first = system.from_kufi[:, 0]
+    counted = np.flatnonzero(first >= 0)
+
+    pages = {}
+    for division, starts in _kufi_starts(meta).items():
+        kufi_index = np.array([kufi.starts[s - 1] + a - 1 for s, a in starts], dtype=np.int32)
+        kufi_index = counted[np.searchsorted(counted, kufi_index)]
+        target = first[kufi_index]
+
+        index[division] = {
+            'page': ayah_pages[target].tolist(),
+            'surah': system.surahs[target].tolist(),
+            'ayah': system.ayahs[target].tolist(),
+        }
+        in_effect = np.searchsorted(target, top, side='right')
+        pages[division] = np.where(top >= 0, in_effect, 0).tolist()
+
+    index['pages'] = pages
+    return index
+
+
+def write_indexes(output_dir=DEFAULT_DIR, qiraat_ids=None, meta=None):
+    """Write <qiraat>.json for every riwaya. Returns the paths written."""
+    from tanzil_metadata import get_metadata
+
+    meta = meta or get_metadata()
+    kufi_pages = kufi_page_array(meta)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for qiraat_id in qiraat_ids or sorted(all_ids()):
+        path = output_dir / f'{qiraat_id}.json'
+        write_json(path, build_index(qiraat_id, meta, kufi_pages))
+        paths.append(path)
+    return paths
+
+
+class DivisionIndex:
+    """O(1) division lookups for one riwaya."""
+
+    def __init__(self, qiraat_id, index_dir=DEFAULT_DIR):
+        path = Path(index_dir) / f'{qiraat_id}.json'
+        if not path.exists():
+            raise FileNotFoundError(
+                f'{path} not found. Build it with:\n  python3 division_index.py')
+        data = read_json(path)
+        self.qiraat_id = qiraat_id
+        self.counting_system = data['countingSystem']
+        self.counts_verified = data.get('countsVerified', True)
+        self.pages_verified = data.get('pagesVerified', True)
+        self.page_count = data['pageCount']
+        self._starts = {d: data[d] for d in DIVISIONS}
+        self._pages = data['pages']
+
+    def _check(self, division):
+        if division not in self._starts:
+            raise ValueError(f'Unknown division: {division} (expected one of {", ".join(DIVISIONS)})')
+
+    def start(self, division, number):
+        """(page, surah, ayah) where division `number` begins."""
+        self._check(division)
+        starts = self._starts[division]
+        if not 1 <= number <= len(starts['page']):
+            raise ValueError(f'{division} {number} does not exist')
+        i = number - 1
+        return starts['page'][i], starts['surah'][i], starts['ayah'][i]
+
+    def end_page(self, division, number):
+        """Last page of division `number` (the page the next one starts on, or the last page)."""
+        self.start(division, number)
+        starts = self._starts[division]['page']
+        return starts[number] if number < len(starts) else self.page_count
+
+    def of_page(self, division, page):
+        """Division number in effect at the top of a page (0 before Al-Fatiha)."""
+        self._check(division)
+        if not 1 <= page <= self.page_count:
+            raise ValueError(f'Page {page} is out of range 1-{self.page_count}')
+        return self._pages[division][page - 1]
+
+    def count(self, division):
+        self._check(division)
+        return len(self._starts[division]['page'])
+
+
+def check(qiraat_ids=None, meta=None):
+    """Self-test: known Kufi boundaries and structural invariants. Returns a list of failures."""
+    failures = []
+    for qiraat_id in qiraat_ids or sorted(all_ids()):
+        index = build_index(qiraat_id, meta)
+        system = index['countingSystem']
+        if index['countsVerified'] != counts_verified(qiraat_id):
+            failures.append(f'{qiraat_id}: countsVerified is {index["countsVerified"]}')
+        if index['pagesVerified'] != (get_riwaya(qiraat_id).layout_family == index['pageLayout']):
+            failures.append(f'{qiraat_id}: pagesVerified is {index["pagesVerified"]} '
+                            f'for the {get_riwaya(qiraat_id).layout_family} layout')
+
+        for division in DIVISIONS:
+            starts = index[division]
+            if len(starts['page']) != DIVISION_COUNTS[division]:
+                failures.append(f'{qiraat_id}: {len(starts["page"])} {division} starts, '
+                                f'expected {DIVISION_COUNTS[division]}')
+            keys = list(zip(starts['surah'], starts['ayah']))
+            if keys != sorted(set(keys)) or starts['page'] != sorted(starts['page']):
+                failures.append(f'{qiraat_id}: {division} starts are not increasing')
+            per_page = index['pages'][division]
+            if per_page != sorted(per_page) or per_page[-1] != DIVISION_COUNTS[division]:
+                failures.append(f'{qiraat_id}: page -> {division} is not a non-decreasing cover')
+            for number, page in enumerate(starts['page'], start=1):
+                if per_page[page - 1] < number - 1 or per_page[page - 1] > number:
+                    failures.append(f'{qiraat_id}: {division} {number} starts on page {page} '
+                                    f'but that page maps to {per_page[page - 1]}')
+
+        for n in range(DIVISION_COUNTS['hizb']):
+            hizb = (index['hizb']['surah'][n], index['hizb']['ayah'][n])
+            if hizb != (index['rub']['surah'][n * 4], index['rub']['ayah'][n * 4]):
+                failures.append(f'{qiraat_id}: hizb {n + 1} does not start on rub\' {n * 4 + 1}')
+
+        if system != 'kufi':
+            continue
+        for division, number, surah, ayah, page in KNOWN_BOUNDARIES:
+            i = number - 1
+            got = (index[division]['surah'][i], index[division]['ayah'][i])
+            if got != (surah, ayah):
+                failures.append(f'{qiraat_id}: {division} {number} starts at {got[0]}:{got[1]}, '
+                                f'expected {surah}:{ayah}')
+            if page is not None and index[division]['page'][i] != page:
+                failures.append(f'{qiraat_id}: {division} {number} starts on page '
+                                f'{index[division]["page"][i]}, expected {page}')
+    return failures
+
+
+def committed_kufi_pages(path=PAGE_MAPPINGS):
+    """Mushaf page of every Kufi ayah, from the committed Hafs page mappings."""
+    pages = read_json(path)['all_pages_hafs']
+    kufi = get_system('kufi')
+    kufi_pages = np.zeros(kufi.total, dtype=np.int32)
+    for page, span in pages.items():
+        first = kufi.global_index(span['sura'], span['start'])
+        kufi_pages[first:] = int(page)
+    return kufi_pages
+
+
+def check_committed(qiraat_ids=None, meta=None):
+    """Checks that need no metadata artifact. Returns a list of failures."""
+    failures = []
+    kufi = get_system('kufi')
+    kufi_pages = committed_kufi_pages()
+    if np.any(np.diff(kufi_pages) < 0) or np.any(np.diff(kufi_pages) > 1):
+        failures.append(f'{PAGE_MAPPINGS.name}: pages do not run in order without gaps')
+    # Only the page starts are used: the stored "end" values came from an
+    # older, wrong copy of the counts (page 477 ends at 40:56)
+    for page, span in read_json(PAGE_MAPPINGS)['all_pages_hafs'].items():
+        if not 1 <= span['start'] <= kufi.counts[span['sura']]:
+            failures.append(f'{PAGE_MAPPINGS.name}: page {page} starts at {span["sura"]}:{span["start"]}, '
+                            f'outside the Kufi count')
+
+    for division, number, surah, ayah, page in KNOWN_BOUNDARIES:
+        if page is None:
+            continue
+        mapped = int(kufi_pages[kufi.global_index(surah, ayah)])
+        if mapped != page:
+            failures.append(f'{PAGE_MAPPINGS.name}: {division} {number} ({surah}:{ayah}) '
+                            f'is on page {mapped}, expected {page}')
+
+    # Every counting system must map each of its ayahs to Kufi text and back
+    for system_name in sorted({counting_system_for(q) for q in qiraat_ids or all_ids()}):
+        system = get_system(system_name)
+        counted = system.from_kufi[:, 0] >= 0
+        ayahs = np.arange(system.total)
+        back = system.from_kufi[system.to_kufi[:, 0]]
+        if np.any(back[:, 0] > ayahs) or np.any(back[:, 1] < ayahs):
+            failures.append(f'{system_name}: ayahs do not round-trip through Kufi numbering')
+        if np.any(np.diff(system.from_kufi[counted, 0]) < 0):
+            failures.append(f'{system_name}: Kufi order is not preserved')
+
+        # A partial table must never pass for ground truth
+        verified = is_verified(system_name)
+        if verified != (not check_counts(system_name)) or (verified and system_name not in COMPLETE_SYSTEMS):
+            failures.append(f'{system_name}: counts verified is {verified}, '
+                            f'but the table is {"complete" if system_name in COMPLETE_SYSTEMS else "partial"}')
+
+    # Known starts mapped from Kufi numbering into the Madani count
+    kufi_starts = {(d, n): (s, a) for d, n, s, a, _ in KNOWN_BOUNDARIES}
+    for division, number, surah, ayah in MADANI_BOUNDARIES:
+        kufi_surah, kufi_ayah = kufi_starts[division, number]
+        mapped = from_kufi(kufi_surah, kufi_ayah, 'madani_2')
+        if mapped is None or (kufi_surah, mapped[0]) != (surah, ayah):
+            got = 'not counted' if mapped is None else f'{kufi_surah}:{mapped[0]}'
+            failures.append(f'madani_2: {division} {number} ({kufi_surah}:{kufi_ayah} Kufi) '
+                            f'maps to {got}, expected {surah}:{ayah}')
+
+    if meta is not None and not np.array_equal(kufi_page_array(meta), kufi_pages):
+        failures.append(f'Tanzil metadata pages differ from {PAGE_MAPPINGS.name}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or check the juz/hizb/rub\'/manzil index.')
+    parser.add_argument('qiraats', nargs='*', help='riwaya ids (default: all)')
+    parser.add_argument('--output', default=str(DEFAULT_DIR))
+    parser.add_argument('--check', action='store_true', help='verify known boundaries instead of writing')
+    args = parser.parse_args()
+
+    if args.check:
+        from tanzil_metadata import get_metadata
+        try:
+            meta = get_metadata()
+        except FileNotFoundError:
+            meta = None
+        failures = check_committed(args.qiraats, meta=meta)
+        if meta is not None:
+            failures += check(args.qiraats, meta)
+        for failure in failures:
+            print(f'❌ {failure}')
+        if failures:
+            sys.exit(1)
+        if meta is None:
+            print('⚠️  Tanzil metadata not available; checked the committed page mappings only')
+            print('✓ Committed pages match all known boundaries')
+        else:
+            print('✓ Division index matches all known boundaries')
+        return
+
+    paths = write_indexes(args.output, args.qiraats)
+    print(f'✓ Wrote {len(paths)} division indexes to {args.output}')
+    qiraat_ids = args.qiraats or all_ids()
+    unverified = sorted(q for q in qiraat_ids if not counts_verified(q))
+    if unverified:
+        print(f'⚠️  Ayah numbers not verified for {len(unverified)} riwayat: {", ".join(unverified)}')
+    other_layout = sorted(q for q in qiraat_ids if get_riwaya(q).layout_family != HAFS_LAYOUT)
+    if other_layout:
+        print(f'⚠️  Pages follow the {HAFS_LAYOUT} layout, not that of: {", ".join(other_layout)}')
+
+
+if __name__ == '__main__':
+    main()
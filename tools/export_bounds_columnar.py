@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Export the whole ayah bounds corpus to one columnar (Parquet) dataset.
+
+Every rectangle of every riwaya becomes one row:
+    qiraat, page, surah, ayah, line, rect, x, y, w, h
+where `rect` is the index of the rectangle inside its ayah's positions list.
+
+The dataset is partitioned by riwaya (dist/bounds_parquet/<qiraat>.parquet),
+so rebuilding a few pages only rewrites the partitions that changed.
+
+Usage:
+    python3 export_bounds_columnar.py export              # full export
+    python3 export_bounds_columnar.py export --incremental  # only rebuilt pages
+    python3 export_bounds_columnar.py diff --threshold 0.02 # pages differing from Hafs
+
+Requirements:
+pip install pyarrow
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from bounds_model import BOUNDS_DIR, discover_qiraats, page_files, read_json, write_json
+
+DEFAULT_OUTPUT = Path(__file__).parent.parent / 'dist' / 'bounds_parquet'
+
+# Sidecar that records (mtime_ns, size) of every exported page file
+STATE_FILE = '_pages.json'
+
+SCHEMA = pa.schema([
+    ('qiraat', pa.dictionary(pa.int8(), pa.string())),
+    ('page', pa.int16()),
+    ('surah', pa.int16()),
+    ('ayah', pa.int16()),
+    ('line', pa.int16()),
+    ('rect', pa.int16()),
+    ('x', pa.float32()),
+    ('y', pa.float32()),
+    ('w', pa.float32()),
+    ('h', pa.float32()),
+])
+
+COORDINATES = ('x', 'y', 'w', 'h')
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def pages_to_table(qiraat_id, files):
+    """Flatten [(page_number, path)] of one riwaya into an Arrow table."""
+    columns = {name: [] for name in SCHEMA.names if name != 'qiraat'}
+
+    for page_num, path in files:
+        page_data = read_json(path)
+        for ayah in page_data['ayahs']:
+            surah, ayah_num = ayah['surahNumber'], ayah['ayahNumber']
+            for rect, position in enumerate(ayah['positions']):
+                columns['page'].append(page_num)
+                columns['surah'].append(surah)
+                columns['ayah'].append(ayah_num)
+                columns['line'].append(position.get('lineNumber', 0))
+                columns['rect'].append(rect)
+                columns['x'].append(position['x'])
+                columns['y'].append(position['y'])
+                columns['w'].append(position['width'])
+                columns['h'].append(position['height'])
+
+    row_count = len(columns['page'])
+    arrays = [pa.DictionaryArray.from_arrays(
+        pa.array([0] * row_count, type=pa.int8()), pa.array([qiraat_id]))]
+    arrays += [pa.array(columns[field.name], type=field.type) for field in SCHEMA if field.name != 'qiraat']
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def partition_path(output_dir, qiraat_id):
+    return Path(output_dir) / f'{qiraat_id}.parquet'
+
+
+def export_qiraat(qiraat_id, output_dir, state, incremental=False, bounds_dir=BOUNDS_DIR):
+    """
+    Export one riwaya partition. Returns the number of pages (re)read.
+
+    In incremental mode only pages whose mtime or size changed since the last
+    export are re-read; their old rows are dropped and the new rows appended.
+    """
+    files = page_files(Path(bounds_dir) / qiraat_id)
+    current = {str(num): _file_state(path) for num, path in files}
+    previous = state.get(qiraat_id, {})
+    target = partition_path(output_dir, qiraat_id)
+
+    if incremental and target.exists():
+        changed = [(num, path) for num, path in files if previous.get(str(num)) != current[str(num)]]
+        removed = [int(num) for num in previous if num not in current]
+        if not changed and not removed:
+            return 0
+
+        stale_pages = pa.array([num for num, _ in changed] + removed, type=pa.int16())
+        table = pq.read_table(target)
+        table = table.filter(pc.invert(pc.is_in(table['page'], value_set=stale_pages)))
+        table = pa.concat_tables([table, pages_to_table(qiraat_id, changed)]).unify_dictionaries()
+        # Keep partitions sorted so scans and joins see pages in order
+        table = table.sort_by([('page', 'ascending'), ('surah', 'ascending'),
+                               ('ayah', 'ascending'), ('rect', 'ascending')])
+        reread = len(changed)
+    else:
+        table = pages_to_table(qiraat_id, files)
+        reread = len(files)
+
+    pq.write_table(table, target, compression='zstd')
+    state[qiraat_id] = current
+    return reread
+
+
+def export_corpus(output_dir=DEFAULT_OUTPUT, qiraat_ids=None, incremental=False, bounds_dir=BOUNDS_DIR):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = output_dir / STATE_FILE
+    # A full export starts over; exporting a subset keeps the other riwayat's entries
+    keep_state = (incremental or qiraat_ids) and state_path.exists()
+    state = read_json(state_path) if keep_state else {}
+
+    totals = {}
+    for qiraat_id in qiraat_ids or discover_qiraats(bounds_dir):
+        totals[qiraat_id] = export_qiraat(qiraat_id, output_dir, state, incremental, bounds_dir)
+
+    write_json(state_path, state)
+    return totals
+
+
+def load_corpus(output_dir=DEFAULT_OUTPUT, qiraat_ids=None):
+    """Read the exported partitions into one Arrow table."""
+    output_dir = Path(output_dir)
+    paths = sorted(output_dir.glob('*.parquet'))
+    if qiraat_ids:
+        paths = [p for p in paths if p.stem in qiraat_ids]
+    return pa.concat_tables([pq.read_table(p) for p in paths]).unify_dictionaries()
+
+
+def pages_differing_from(table, reference='asim_hafs', threshold=0.02):
+    """
+    Find pages whose rectangles differ from the reference riwaya.
+
+    Rectangles are matched on (page, surah, ayah, rect); a page is reported
+    when any coordinate of any matched rectangle moved by more than
+    `threshold` (in normalized page units), or when a rectangle exists on only
+    one side. Returns a table of (qiraat, page, max_delta, unmatched).
+    """
+    keys = ['page', 'surah', 'ayah', 'rect']
+    qiraat = table['qiraat'].cast(pa.string())
+    table = table.set_column(0, 'qiraat', qiraat)
+
+    ref = table.filter(pc.equal(table['qiraat'], reference)).drop_columns(['qiraat', 'line'])
+    ref = ref.rename_columns([c if c in keys else f'ref_{c}' for c in ref.column_names])
+    others = table.filter(pc.not_equal(table['qiraat'], reference)).drop_columns(['line'])
+
+    # One full outer join per riwaya, so reference rectangles missing from a
+    # riwaya are charged to that riwaya
+    parts = []
+    for qiraat_id in sorted(pc.unique(others['qiraat']).to_pylist()):
+        side = others.filter(pc.equal(others['qiraat'], qiraat_id)).drop_columns(['qiraat'])
+        joined = side.join(ref, keys=keys, join_type='full outer')
+        deltas = [pc.abs(pc.subtract(joined[c], joined[f'ref_{c}'])) for c in COORDINATES]
+        max_delta = deltas[0]
+        for delta in deltas[1:]:
+            max_delta = pc.max_element_wise(max_delta, delta)
+        unmatched = pc.or_(pc.is_null(joined['x']), pc.is_null(joined['ref_x']))
+        parts.append(pa.table({
+            'qiraat': pa.array([qiraat_id] * joined.num_rows, pa.string()),
+            'page': joined['page'],
+            'delta': pc.fill_null(max_delta, 0.0),
+            'unmatched': pc.cast(unmatched, pa.int32()),
+        }))
+    if not parts:
+        return pa.table({'qiraat': pa.array([], pa.string()), 'page': pa.array([], pa.int16()),
+                         'max_delta': pa.array([], pa.float32()), 'unmatched': pa.array([], pa.int64())})
+    per_rect = pa.concat_tables(parts)
+    per_page = per_rect.group_by(['qiraat', 'page']).aggregate([('delta', 'max'), ('unmatched', 'sum')])
+    per_page = per_page.rename_columns(['qiraat', 'page', 'max_delta', 'unmatched'])
+    flagged = pc.or_(pc.greater(per_page['max_delta'], threshold), pc.greater(per_page['unmatched'], 0))
+    return per_page.filter(flagged).sort_by([('qiraat', 'ascending'), ('page', 'ascending')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar export and analytics for the bounds corpus.')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='dataset directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_cmd = sub.add_parser('export', help='flatten bounds JSON into Parquet partitions')
+    export_cmd.add_argument('qiraats', nargs='*', help='riwaya ids (default: all)')
+    export_cmd.add_argument('--incremental', action='store_true', help='only re-read changed pages')
+
+    diff_cmd = sub.add_parser('diff', help='list pages whose rectangles differ from a reference riwaya')
+    diff_cmd.add_argument('--reference', default='asim_hafs')
+    diff_cmd.add_argument('--threshold', type=float, default=0.02)
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        start = time.perf_counter()
+        totals = export_corpus(args.output, args.qiraats, args.incremental)
+        elapsed = time.perf_counter() - start
+        for qiraat_id, count in totals.items():
+            print(f'  {qiraat_id:24s} {count:4d} pages re-read')
+        print(f'\n✓ Exported {len(totals)} riwayat to {args.output} in {elapsed:.2f}s')
+        return
+
+    table = load_corpus(args.output)
+    start = time.perf_counter()
+    flagged = pages_differing_from(table, args.reference, args.threshold)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'Scanned {table.num_rows} rectangles in {elapsed:.1f} ms')
+    print(f'{flagged.num_rows} pages differ from {args.reference} by more than {args.threshold:.0%}')
+    for row in flagged.to_pylist()[:50]:
+        print(f"  {row['qiraat']:24s} page {row['page']:3d}  max delta {row['max_delta']:.4f}"
+              f"  unmatched {row['unmatched']}")
+    if flagged.num_rows > 50:
+        print(f'  ... {flagged.num_rows - 50} more')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,12 +6,12 @@ Analyzes PDFs to determine which ayahs appear on which pages for each qiraat.
 
 import os
 import re
-import json
 from pathlib import Path
 from pdf2image import convert_from_path
 import pytesseract
 from PIL import Image
 import logging
+from bounds_model import write_json
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -147,8 +147,7 @@ def analyze_qiraat_mushaf(qiraat_id, pdf_path, output_file):
         }
         
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_json(output_file, result)
         
         logger.info(f"\n✓ Saved mappings to: {output_file}")
         logger.info(f"  Total pages analyzed: {len(mappings)}")
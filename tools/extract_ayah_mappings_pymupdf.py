@@ -6,11 +6,11 @@ Reads text directly from PDFs to determine which ayahs appear on which pages.
 
 import os
 import re
-import json
 import fitz  # PyMuPDF
 from pathlib import Path
 import logging
 from collections import defaultdict
+from bounds_model import read_json, write_json
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -168,8 +168,7 @@ def analyze_qiraat_mushaf(qiraat_id, pdf_path, output_file, num_pages=20):
         }
         
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_json(output_file, result)
         
         logger.info(f"\n✓ Saved mappings to: {output_file}")
         logger.info(f"  Total pages analyzed: {len(mappings)}")
@@ -193,10 +192,8 @@ def compare_qiraats(hafs_mapping_file, warsh_mapping_file):
     logger.info(f"{'='*70}\n")
     
     try:
-        with open(hafs_mapping_file, 'r') as f:
-            hafs = json.load(f)
-        with open(warsh_mapping_file, 'r') as f:
-            warsh = json.load(f)
+        hafs = read_json(hafs_mapping_file)
+        warsh = read_json(warsh_mapping_file)
         
         hafs_pages = hafs['pageMappings']
         warsh_pages = warsh['pageMappings']
@@ -0,0 +1,83 @@
+"""
+Content hashes of file trees, shared by the build runner, the publisher,
+the hashed-asset stager and the release differ.
+
+hash_files() hashes a {key: path} map concurrently; with a cache path, files
+whose size and mtime match the cache are not re-read. file_digests() computes
+several digests (e.g. SHA-256 and the MD5 ETag) in one read. CONTENT_TYPES
+maps the published file suffixes to their HTTP Content-Type.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bounds_model import write_bytes_atomic
+
+HASH_CHUNK = 1024 * 1024
+
+IMAGE_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp'}
+CONTENT_TYPES = {**IMAGE_TYPES, '.json': 'application/json'}
+
+
+def content_type(path):
+    return CONTENT_TYPES.get(Path(path).suffix.lower(), 'application/octet-stream')
+
+
+def file_digests(path, algorithms=('sha256',)):
+    """Hex digests of a file for each hashlib algorithm, in one pass."""
+    digests = [hashlib.new(name) for name in algorithms]
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            for digest in digests:
+                digest.update(chunk)
+    return tuple(digest.hexdigest() for digest in digests)
+
+
+def sha256_file(path):
+    return file_digests(path)[0]
+
+
+def hash_files(files, workers=8, cache_path=None):
+    """
+    Hash files concurrently into {key: {"sha256", "size"}}.
+
+    Files whose size and mtime match the hash cache are not re-read.
+    """
+    cache_path = Path(cache_path) if cache_path else None
+    cache = {}
+    if cache_path and cache_path.exists():
+        try:
+            cache = json.loads(cache_path.read_text(encoding='utf-8'))
+        except ValueError:
+            cache = {}
+
+    stats = {key: path.stat() for key, path in files.items()}
+    manifest = {}
+    stale = []
+    for key, path in files.items():
+        cached = cache.get(str(path))
+        st = stats[key]
+        if cached and cached['size'] == st.st_size and cached['mtime'] == st.st_mtime_ns:
+            manifest[key] = {'sha256': cached['sha256'], 'size': st.st_size}
+        else:
+            stale.append(key)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for key, digest in zip(stale, pool.map(lambda k: sha256_file(files[k]), stale)):
+            manifest[key] = {'sha256': digest, 'size': stats[key].st_size}
+
+    if cache_path and stale:
+        for key in stale:
+            cache[str(files[key])] = {'sha256': manifest[key]['sha256'], 'size': stats[key].st_size,
+                                      'mtime': stats[key].st_mtime_ns}
+        write_bytes_atomic(cache_path, json.dumps(cache).encode('utf-8'))
+    return manifest
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
+        size /= 1024
@@ -4,15 +4,14 @@ Fix all page JSON files to only include ayahs that are actually on each page.
 Removes duplicate ayahs 1-X that were incorrectly added.
 """
 
-import json
 import os
 from pathlib import Path
+from bounds_model import read_json, write_json
 
 def fix_page_json(page_path):
     """Fix a single page JSON by removing ayahs from 1 to actual_first_ayah-1."""
     try:
-        with open(page_path, 'r', encoding='utf-8') as f:
-            page_data = json.load(f)
+        page_data = read_json(page_path)
         
         ayahs = page_data.get('ayahs', [])
         if not ayahs:
@@ -76,8 +75,7 @@ def fix_page_json(page_path):
         page_data['ayahs'] = filtered_ayahs
         
         # Write back to file
-        with open(page_path, 'w', encoding='utf-8') as f:
-            json.dump(page_data, f, ensure_ascii=False, indent=2)
+        write_json(page_path, page_data)
         
         return True
         
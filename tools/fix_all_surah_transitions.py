@@ -5,23 +5,16 @@ This script identifies pages where Tanzil shows a surah starting at ayah > 1,
 meaning the previous page should have the earlier ayahs of that surah.
 """
 
-import json
-import xml.etree.ElementTree as ET
 from pathlib import Path
-
-# Parse Tanzil data
-tree = ET.parse('/tmp/quran-data.xml')
-root = tree.getroot()
+from bounds_model import read_json, write_json
+from tanzil_metadata import MUSHAF_PAGE_OFFSET, get_metadata
 
 # Get all page entries from Tanzil
 page_entries = []
-for page in root.findall('.//page'):
-    page_idx = int(page.get('index'))
-    sura = int(page.get('sura'))
-    aya = int(page.get('aya'))
+for mushaf_page, sura, aya in get_metadata().page_starts():
     page_entries.append({
-        'tanzil_page': page_idx,
-        'mushaf_page': page_idx + 1,  # Tanzil is 0-indexed, Mushaf is 1-indexed
+        'tanzil_page': mushaf_page - MUSHAF_PAGE_OFFSET,
+        'mushaf_page': mushaf_page,
         'sura': sura,
         'aya': aya
     })
@@ -66,8 +59,7 @@ for qiraat_dir in ['asim_hafs', 'nafi_warsh']:
             continue
         
         # Read current page data
-        with open(page_file, 'r') as f:
-            page_data = json.load(f)
+        page_data = read_json(page_file)
         
         # Check if the new surah ayahs are already present
         new_sura_ayahs = [a for a in page_data['ayahs'] if a['surahNumber'] == transition['sura']]
@@ -108,8 +100,7 @@ for qiraat_dir in ['asim_hafs', 'nafi_warsh']:
                     page_data['ayahs'].append(new_ayah)
                 
                 # Write back
-                with open(page_file, 'w', encoding='utf-8') as f:
-                    json.dump(page_data, f, ensure_ascii=False, indent=2)
+                write_json(page_file, page_data)
                 
                 print(f"    ✓ Updated page {page_num}")
 
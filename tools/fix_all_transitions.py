@@ -4,23 +4,14 @@ Find and fix ALL pages where a surah starts mid-page.
 This happens when Tanzil shows a page starting at ayah > 1.
 """
 
-import json
-import xml.etree.ElementTree as ET
 from pathlib import Path
-
-# Parse Tanzil
-tree = ET.parse('/tmp/quran-data.xml')
-root = tree.getroot()
+from bounds_model import read_json, write_json
+from tanzil_metadata import get_metadata
 
 # Find all cases where a page starts at ayah > 1
 transition_cases = []
 
-for page in root.findall('.//page'):
-    tanzil_page = int(page.get('index'))
-    mushaf_page = tanzil_page + 1
-    sura = int(page.get('sura'))
-    aya = int(page.get('aya'))
-    
+for mushaf_page, sura, aya in get_metadata().page_starts():
     if aya > 1:
         # This page starts at ayah > 1
         # So the PREVIOUS page should have ayahs 1 through (aya-1)
@@ -59,11 +50,9 @@ for qiraat in ['asim_hafs', 'nafi_warsh']:
             continue
         
         # Read both pages
-        with open(prev_file, 'r') as f:
-            prev_data = json.load(f)
+        prev_data = read_json(prev_file)
         
-        with open(next_file, 'r') as f:
-            next_data = json.load(f)
+        next_data = read_json(next_file)
         
         # Check if prev_page already has the missing ayahs
         existing_ayahs = [(a['surahNumber'], a['ayahNumber']) for a in prev_data['ayahs'] if a['surahNumber'] == sura]
@@ -92,8 +81,7 @@ for qiraat in ['asim_hafs', 'nafi_warsh']:
             prev_data['ayahs'].append(new_ayah)
         
         # Write prev_page
-        with open(prev_file, 'w', encoding='utf-8') as f:
-            json.dump(prev_data, f, ensure_ascii=False, indent=2)
+        write_json(prev_file, prev_data)
         
         # Remove ayahs 1 through (aya-1) from next_page if they exist
         original_count = len(next_data['ayahs'])
@@ -102,8 +90,7 @@ for qiraat in ['asim_hafs', 'nafi_warsh']:
         
         if len(next_data['ayahs']) != original_count:
             print(f"  Page {next_page}: Removed {original_count - len(next_data['ayahs'])} duplicate ayahs")
-            with open(next_file, 'w', encoding='utf-8') as f:
-                json.dump(next_data, f, ensure_ascii=False, indent=2)
+            write_json(next_file, next_data)
 
 print("\n" + "=" * 80)
 print("DONE!")
@@ -4,8 +4,8 @@ Fix page JSON files to have consecutive ayah sequences.
 Each page should continue from where the previous page ended.
 """
 
-import json
 from pathlib import Path
+from bounds_model import read_json, write_json
 
 def fix_all_pages(qiraat_path):
     """Fix all pages in a qiraat directory to have consecutive ayahs."""
@@ -19,8 +19,7 @@ def fix_all_pages(qiraat_path):
     for page_file in page_files:
         page_num = int(page_file.stem.split('_')[1])
         
-        with open(page_file, 'r', encoding='utf-8') as f:
-            page_data = json.load(f)
+        page_data = read_json(page_file)
         
         ayahs = page_data.get('ayahs', [])
         if not ayahs:
@@ -75,8 +74,7 @@ def fix_all_pages(qiraat_path):
         
         if changed:
             page_data['ayahs'] = fixed_ayahs
-            with open(page_file, 'w', encoding='utf-8') as f:
-                json.dump(page_data, f, ensure_ascii=False, indent=2)
+            write_json(page_file, page_data)
     
     return fixed_count
 
@@ -4,9 +4,9 @@ Fix the last pages of the Quran that should contain multiple complete surahs.
 Based on standard Hafs and Warsh page layouts.
 """
 
-import json
 import os
 from pathlib import Path
+from bounds_model import read_json, write_json
 
 # Define which surahs appear on which pages (based on standard Mushaf layout)
 # Format: {page_num: [surah_numbers]}
@@ -34,8 +34,7 @@ WARSH_MULTI_SURAH_PAGES = {
 def get_surah_info(surah_dir, surah_num):
     """Load surah info from surah JSON file."""
     surah_file = surah_dir / f'surah_{str(surah_num).zfill(3)}.json'
-    with open(surah_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return read_json(surah_file)
 
 def create_placeholder_ayahs(surah_num, start_ayah, end_ayah):
     """Create placeholder ayah entries when surah file is incomplete."""
@@ -110,8 +109,7 @@ def fix_multi_surah_pages(qiraat, page_mapping):
         
         # Write page file
         page_file = qiraat_dir / f'page_{page_num}.json'
-        with open(page_file, 'w', encoding='utf-8') as f:
-            json.dump(page_data, f, ensure_ascii=False, indent=2)
+        write_json(page_file, page_data)
         
         print(f"  ✓ Saved page_{page_num}.json with {len(page_data['surahs'])} surahs, "
               f"{len(page_data['ayahs'])} total ayahs\n")
@@ -4,9 +4,9 @@ Fix pages that should contain multiple complete surahs.
 Based on surah JSON files which show the correct page distribution.
 """
 
-import json
 import os
 from pathlib import Path
+from bounds_model import read_json, write_json
 
 def fix_multi_surah_pages():
     """Fix pages that should have multiple surahs."""
@@ -30,8 +30,7 @@ def fix_multi_surah_pages():
             if not surah_file.exists():
                 continue
                 
-            with open(surah_file, 'r', encoding='utf-8') as f:
-                surah_data = json.load(f)
+            surah_data = read_json(surah_file)
             
             # Check each page this surah appears on
             for page_info in surah_data['pages']:
@@ -87,8 +86,7 @@ def fix_multi_surah_pages():
             
             # Write to file
             page_file = qiraat_dir / f'page_{page_num}.json'
-            with open(page_file, 'w', encoding='utf-8') as f:
-                json.dump(page_data, f, ensure_ascii=False, indent=2)
+            write_json(page_file, page_data)
             
             print(f"  ✓ Updated page_{page_num}.json with {len(surahs_on_page)} surahs, {len(all_ayahs)} total ayahs\n")
 
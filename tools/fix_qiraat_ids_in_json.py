@@ -3,22 +3,17 @@
 Fix qiraatId values inside JSON files to match folder names and qiraat provider IDs.
 """
 
-import json
 from pathlib import Path
 
+from bounds_model import BOUNDS_DIR, load_page, page_files, save_page
+from qiraat_registry import LEGACY_IDS
+
 # Mapping of old qiraatId to new qiraatId
-ID_CORRECTIONS = {
-    'asim_shuabah': 'asim_shuba',
-    'ibn_amir_ibn_dhakwan': 'ibn_amir_dhakwan',
-    'hamzah_khallad': 'hamzah_khalaad',
-    'al_kisai_abu_harith': 'kisai_abu_harith',
-    'al_kisai_duri': 'kisai_duri',
-    'yaqub_rouh': 'yaqub_rawh',
-}
+ID_CORRECTIONS = LEGACY_IDS
 
 def fix_json_files_in_directory(dir_path: Path, correct_id: str):
     """Fix all JSON files in a directory to have the correct qiraatId."""
-    json_files = list(dir_path.glob('page_*.json'))
+    json_files = [path for _, path in page_files(dir_path)]
     
     if not json_files:
         print(f'  ⚠️  No JSON files found in {dir_path.name}')
@@ -27,28 +22,27 @@ def fix_json_files_in_directory(dir_path: Path, correct_id: str):
     print(f'  Fixing {len(json_files)} files...')
     
     for json_file in json_files:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        page = load_page(json_file)
         
         # Update qiraatId
-        data['qiraatId'] = correct_id
+        page.qiraat_id = correct_id
         
         # Write back
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        save_page(json_file, page)
     
     print(f'  ✓ Fixed {len(json_files)} files with qiraatId: {correct_id}')
 
 def main():
     """Fix qiraatId in all JSON files that need correction."""
     
-    base_dir = Path(__file__).parent.parent / 'assets' / 'json' / 'bounds'
+    base_dir = BOUNDS_DIR
     
     print('='*70)
     print('Fixing qiraatId Values in JSON Files')
     print('='*70)
     
-    for old_id, new_id in ID_CORRECTIONS.items():
+    for new_id in sorted(set(ID_CORRECTIONS.values())):
+        old_ids = sorted(old_id for old_id, current in ID_CORRECTIONS.items() if current == new_id)
         # The folder has already been renamed to match new_id
         folder = base_dir / new_id
         
@@ -57,7 +51,7 @@ def main():
             continue
         
         print(f'\n{new_id}:')
-        print(f'  Changing qiraatId from "{old_id}" to "{new_id}"')
+        print(f'  Changing qiraatId from {" / ".join(repr(o) for o in old_ids)} to "{new_id}"')
         fix_json_files_in_directory(folder, new_id)
     
     print('\n' + '='*70)
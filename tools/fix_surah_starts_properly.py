@@ -6,23 +6,15 @@ This will REBUILD pages to include both:
 2. The complete beginning of the new surah (from ayah 1)
 """
 
-import json
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from collections import defaultdict
-
-# Parse Tanzil data
-tree = ET.parse('/tmp/quran-data.xml')
-root = tree.getroot()
+from bounds_model import read_json, write_json
+from tanzil_metadata import get_metadata
 
 # Build a complete mapping of which surahs appear on which pages
 page_to_surahs = defaultdict(set)  # page_num -> set of (sura, first_ayah)
 
-for page in root.findall('.//page'):
-    page_idx = int(page.get('index'))
-    mushaf_page = page_idx + 1
-    sura = int(page.get('sura'))
-    aya = int(page.get('aya'))
+for mushaf_page, sura, aya in get_metadata().page_starts():
     page_to_surahs[mushaf_page].add((sura, aya))
 
 print("=" * 80)
@@ -49,8 +41,7 @@ for qiraat_dir in ['asim_hafs', 'nafi_warsh']:
             continue
         
         # Read the current page
-        with open(page_file, 'r') as f:
-            page_data = json.load(f)
+        page_data = read_json(page_file)
         
         print(f"\n  Page {mushaf_page}: {len(surah_list)} surahs")
         
@@ -66,8 +57,7 @@ for qiraat_dir in ['asim_hafs', 'nafi_warsh']:
                 print(f"      WARNING: {surah_file} doesn't exist")
                 continue
             
-            with open(surah_file, 'r') as f:
-                surah_data = json.load(f)
+            surah_data = read_json(surah_file)
             
             # Find this page in the surah data
             for page in surah_data['pages']:
@@ -102,8 +92,7 @@ for qiraat_dir in ['asim_hafs', 'nafi_warsh']:
             print(f"    UPDATING: was {existing_ayah_ids[:3]}...{existing_ayah_ids[-2:]}, now {correct_ayah_ids[:3]}...{correct_ayah_ids[-2:]}")
             page_data['ayahs'] = correct_ayahs
             
-            with open(page_file, 'w', encoding='utf-8') as f:
-                json.dump(page_data, f, ensure_ascii=False, indent=2)
+            write_json(page_file, page_data)
             print(f"    ✓ Updated")
         else:
             print(f"    Already correct ✓")
@@ -4,26 +4,19 @@ Generate complete page JSON files using Tanzil page data.
 This ensures ALL pages 2-606 are covered.
 """
 
-import json
 from pathlib import Path
-import re
+from bounds_model import read_json, write_json
+from tanzil_metadata import get_metadata
 
 def parse_tanzil_data():
-    """Parse the Tanzil XML to get complete page mappings"""
-    with open('/tmp/quran-data.xml', 'r') as f:
-        content = f.read()
-    
-    # Extract all page entries
-    pages_raw = re.findall(r'<page index="(\d+)" sura="(\d+)" aya="(\d+)"', content)
-    
+    """Get complete page mappings from the compiled Tanzil metadata"""
     # Build page-to-(surah, start_ayah) mapping
     pages = []
-    for tanzil_page, sura, aya in pages_raw:
-        mushaf_page = int(tanzil_page) + 1  # Tanzil is 0-indexed, add 1 for Mushaf
+    for mushaf_page, sura, aya in get_metadata().page_starts():
         pages.append({
             'page': mushaf_page,
-            'surah': int(sura),
-            'start_ayah': int(aya)
+            'surah': sura,
+            'start_ayah': aya
         })
     
     return pages
@@ -34,10 +27,9 @@ def load_surah_data(qiraat_id):
     surah_data = {}
     
     for surah_file in sorted(base_path.glob('surah_*.json')):
-        with open(surah_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            surah_num = data['surahNumber']
-            surah_data[surah_num] = data
+        data = read_json(surah_file)
+        surah_num = data['surahNumber']
+        surah_data[surah_num] = data
     
     return surah_data
 
@@ -117,8 +109,7 @@ def generate_all_page_jsons():
             
             # Write to file
             page_file = output_path / f'page_{page_num}.json'
-            with open(page_file, 'w', encoding='utf-8') as f:
-                json.dump(page_json, f, ensure_ascii=False, indent=2)
+            write_json(page_file, page_json)
             
             pages_created += 1
             if ayahs:
@@ -5,10 +5,10 @@ This creates page_X.json files that the Flutter app expects.
 Handles pages that span multiple surahs.
 """
 
-import json
 import os
 from pathlib import Path
 from collections import defaultdict
+from bounds_model import read_json, write_json
 
 def generate_page_jsons():
     """Generate page-based JSON files for both qiraats"""
@@ -25,8 +25,7 @@ def generate_page_jsons():
         
         # Read all surah JSON files
         for surah_file in sorted(qiraat_path.glob('surah_*.json')):
-            with open(surah_file, 'r', encoding='utf-8') as f:
-                surah_data = json.load(f)
+            surah_data = read_json(surah_file)
             
             # Extract pages from this surah
             for page in surah_data['pages']:
@@ -50,8 +49,7 @@ def generate_page_jsons():
         for page_number in sorted(all_pages.keys()):
             page_data = dict(all_pages[page_number])  # Convert defaultdict to regular dict
             page_file = qiraat_path / f'page_{page_number}.json'
-            with open(page_file, 'w', encoding='utf-8') as f:
-                json.dump(page_data, f, ensure_ascii=False, indent=2)
+            write_json(page_file, page_data)
             
         print(f'  ✓ Created {len(all_pages)} page JSON files for {qiraat_id}')
         
@@ -4,10 +4,11 @@ Generate surah-based JSON files for ayah bounds.
 Instead of one JSON per page, this creates one JSON per surah containing all pages.
 """
 
-import json
 import os
 from pathlib import Path
 from baqarah_mappings import get_baqarah_page_range
+from bounds_model import write_json
+from ayah_count_data import get_ayah_count
 
 # Complete Surah data with page ranges
 SURAHS = [
@@ -131,19 +132,7 @@ def get_ayah_count_for_qiraat(surah_number, qiraat_id):
     """
     Get the correct ayah count for a surah in a specific qiraat.
     """
-    # Al-Baqarah (Surah 2) is different between Warsh and Hafs
-    if surah_number == 2:
-        if qiraat_id == "nafi_warsh":
-            return 285  # Warsh has 285 ayahs
-        else:
-            return 286  # Hafs has 286 ayahs
-    
-    # For all other surahs, use the standard count
-    for surah in SURAHS:
-        if surah["number"] == surah_number:
-            return surah["numberOfAyahs"]
-    
-    return 0
+    return get_ayah_count(surah_number, qiraat_id)
 
 def generate_placeholder_ayah_data(surah_number, ayah_number, page_number):
     """
@@ -280,8 +269,7 @@ def main():
             filepath = qiraat_dir / filename
             
             # Write JSON file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(surah_json, f, ensure_ascii=False, indent=2)
+            write_json(filepath, surah_json)
             
             print(f"  ✓ Created {filename} - {surah['nameArabic']} ({surah['name']}) - Pages {surah['startPage']}-{surah['endPage']}")
         
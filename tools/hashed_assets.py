@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Content-hashed page names and precomputed HTTP cache metadata.
+
+Pages are published under immutable names derived from their content,
+  <qiraat>/page_<n>.<sha256[:16]>.<ext>
+next to a small per-qiraat manifest that clients re-check instead of the
+pages themselves:
+  <qiraat>/pages.json
+  {"version": 1, "qiraatId": "nafi_warsh",
+   "cacheControl": {"pages": "public, max-age=31536000, immutable", "manifest": "no-cache"},
+   "pages": {"1": {"name": "page_1.3f2a...c9.jpg", "size": 123456,
+                   "sha256": "...", "etag": "\"<md5>\"", "contentType": "image/jpeg",
+                   "firstScanBytes": 9876,
+                   "placeholder": {"width": 1131, "height": 1600, "data": "<base64 JPEG>"}}}}
+
+A page whose content changes gets a new name, so clients and CDN edges can
+cache every page forever and only refetch what the manifest says changed;
+there is no global version to bump. "etag" is the quoted MD5, which is what
+S3 and R2 return for single-part uploads, so it can be used in
+If-None-Match as-is. "placeholder" is a ~24 px thumbnail to paint before the
+page arrives and "firstScanBytes" the prefix holding a progressive JPEG's
+first full-page scan (see progressive_pages.py).
+
+The staging folder (dist/hashed) holds copies of the pages and is
+published with publish_qiraats.py, which uploads pages with the immutable
+Cache-Control and manifests with no-cache:
+    python3 hashed_assets.py                    # all riwayat -> dist/hashed
+    python3 hashed_assets.py nafi_warsh
+    python3 publish_qiraats.py s3://mushaf-qiraats --source ../dist/hashed
+"""
+
+import argparse
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bounds_model import atomic_write, write_json
+from file_hashes import IMAGE_TYPES, file_digests
+from progressive_pages import jpeg_scans, placeholder
+from qiraat_registry import published_ids
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+HASHED_DIR = ROOT_DIR / 'dist' / 'hashed'
+
+MANIFEST_NAME = 'pages.json'
+MANIFEST_VERSION = 1
+HASH_LENGTH = 16
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'no-cache'
+HASHED_NAME = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def cache_control(key):
+    """Cache-Control for a published object: immutable for hashed names, revalidate otherwise."""
+    return CACHE_IMMUTABLE if HASHED_NAME.search(key) else CACHE_REVALIDATE
+
+
+def hash_file(path):
+    """(sha256, md5) hex digests of a file in one pass."""
+    return file_digests(path, ('sha256', 'md5'))
+
+
+def page_preview(path):
+    """Placeholder thumbnail and progressive first-scan size of a page."""
+    preview = {'placeholder': placeholder(path)}
+    if path.suffix.lower() in ('.jpg', '.jpeg'):
+        progressive, scan_ends = jpeg_scans(path.read_bytes())
+        if progressive and scan_ends:
+            preview['firstScanBytes'] = scan_ends[0]
+    return preview
+
+
+def page_number(path):
+    numbers = re.findall(r'\d+', Path(path).stem)
+    return int(numbers[-1]) if numbers else None
+
+
+def hashed_name(page, sha256, suffix):
+    return f'page_{page}.{sha256[:HASH_LENGTH]}{suffix.lower()}'
+
+
+def _copy_page(source, target):
+    """
+    Copy a page to its hashed name, unless an unshared copy is already there.
+
+    Copies, not hard links: the converters save pages in place, which would
+    rewrite a linked "immutable" copy too. Links staged by older builds are
+    replaced.
+    """
+    try:
+        st = target.stat()
+        if st.st_nlink == 1 and st.st_size == source.stat().st_size:
+            return
+    except FileNotFoundError:
+        pass
+    with open(source, 'rb') as f, atomic_write(target) as out:
+        shutil.copyfileobj(f, out)
+
+
+def build_qiraat(qiraat_id, source_dir=IMAGES_DIR, output_dir=HASHED_DIR, workers=8):
+    """Stage hashed pages and pages.json for one riwaya. Returns the manifest dict."""
+    source = Path(source_dir) / qiraat_id
+    target = Path(output_dir) / qiraat_id
+    target.mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    for path in sorted(source.iterdir()):
+        page = page_number(path)
+        if path.is_file() and not path.name.startswith('.') and page is not None \
+                and path.suffix.lower() in IMAGE_TYPES:
+            if page in files:
+                raise ValueError(f'{qiraat_id}: page {page} appears twice ({files[page].name}, {path.name})')
+            files[page] = path
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = dict(zip(files, pool.map(hash_file, files.values())))
+        previews = dict(zip(files, pool.map(page_preview, files.values())))
+
+    pages = {}
+    for page in sorted(files):
+        path = files[page]
+        sha256, md5 = digests[page]
+        name = hashed_name(page, sha256, path.suffix)
+        _copy_page(path, target / name)
+        pages[str(page)] = {
+            'name': name,
+            'size': path.stat().st_size,
+            'sha256': sha256,
+            'etag': f'"{md5}"',
+            'contentType': IMAGE_TYPES[path.suffix.lower()],
+            **previews[page],
+        }
+
+    # Only the current generation is staged; the store keeps older names until --delete
+    current = {entry['name'] for entry in pages.values()} | {MANIFEST_NAME}
+    for old in target.iterdir():
+        if old.name not in current and not old.name.startswith('.'):
+            old.unlink()
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'qiraatId': qiraat_id,
+        'cacheControl': {'pages': CACHE_IMMUTABLE, 'manifest': CACHE_REVALIDATE},
+        'pages': pages,
+    }
+    write_json(target / MANIFEST_NAME, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stage content-hashed page names and per-qiraat manifests.')
+    parser.add_argument('qiraats', nargs='*', help='riwaya ids (default: every published riwaya)')
+    parser.add_argument('--source', default=str(IMAGES_DIR))
+    parser.add_argument('--output', default=str(HASHED_DIR))
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    if not source.is_dir():
+        print(f'❌ Source folder not found: {source}')
+        sys.exit(1)
+    qiraat_ids = args.qiraats or [q for q in published_ids() if (source / q).is_dir()]
+
+    print('=' * 70)
+    print(f'Staging content-hashed pages -> {args.output}')
+    print('=' * 70)
+    start = time.perf_counter()
+    for qiraat_id in qiraat_ids:
+        manifest = build_qiraat(qiraat_id, source, args.output, args.workers)
+        size = sum(p['size'] for p in manifest['pages'].values())
+        print(f'  {qiraat_id:24s} {len(manifest["pages"]):4d} pages, {size / 1024 / 1024:8.1f} MB')
+    print(f'\n✓ {len(qiraat_ids)} riwayat staged in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Khatm / reading-plan planner.
+
+Splits the Mushaf (or a page range of it) into N balanced portions for a
+group khatm. Portions never break an ayah and can optionally be snapped to
+surah boundaries. Balance is measured in one of three units:
+  pages    each page weighs 1, shared between the ayahs on it
+  ayahs    each ayah weighs 1
+  length   each ayah weighs the letters of its text in a Tanzil quran-text
+           file (--text quran-uthmani.xml); ayahs a counting system splits
+           or merges get their share of the Kufi ayahs they cover
+
+The ayah order and pages come from the riwaya's bounds pages. Cuts are
+found with one prefix sum and one vectorized search, so planning for
+thousands of participants costs the same as planning for thirty.
+
+Usage:
+    python3 khatm_planner.py 30                         # 30 portions by pages
+    python3 khatm_planner.py 1000 --unit ayahs --qiraat nafi_warsh
+    python3 khatm_planner.py 7 --surah-boundaries --json plan.json
+    python3 khatm_planner.py 30 --unit length --text quran-uthmani.xml
+    python3 khatm_planner.py 10 --pages 283-322         # split juz 15-16 only
+
+Requirements:
+pip install numpy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from ayah_count_data import counts_verified, get_total_ayahs
+from bounds_model import BOUNDS_DIR, page_files, read_json, write_json
+from counting_systems import get_system, system_for_qiraat
+
+UNITS = ('pages', 'ayahs', 'length')
+
+
+class Portion(NamedTuple):
+    participant: int
+    start_page: int
+    start_surah: int
+    start_ayah: int
+    end_page: int
+    end_surah: int
+    end_ayah: int
+    ayahs: int
+    weight: float
+
+
+def text_lengths(text_path, qiraat_id):
+    """
+    Letters per ayah of a riwaya, indexed by its counting system's global index.
+
+    Tanzil text files use Kufi numbering; an ayah the riwaya splits shares its
+    Kufi ayah's letters evenly, one it merges sums them.
+    """
+    from tanzil_reader import iter_ayas
+
+    kufi = get_system('kufi')
+    kufi_lengths = np.zeros(kufi.total, dtype=np.float64)
+    for aya in iter_ayas(text_path):
+        kufi_lengths[kufi.global_index(aya.sura, aya.index)] = len(aya.text.replace(' ', ''))
+    if not kufi_lengths.all():
+        raise ValueError(f'{text_path} does not have the text of every ayah')
+
+    system = system_for_qiraat(qiraat_id)
+    sharing = system.from_kufi[:, 1] - system.from_kufi[:, 0] + 1
+    prefix = np.concatenate(([0.0], np.cumsum(kufi_lengths / np.maximum(sharing, 1))))
+    first, last = system.to_kufi[:, 0], system.to_kufi[:, 1]
+    return prefix[last + 1] - prefix[first]
+
+
+class AyahSequence:
+    """Every ayah of a riwaya in reading order, with its page."""
+
+    def __init__(self, qiraat_id, bounds_dir=BOUNDS_DIR, first_page=None, last_page=None, text_path=None):
+        self.qiraat_id = qiraat_id
+        self.text_path = text_path
+        pages, surahs, ayahs = [], [], []
+        for page_num, path in page_files(Path(bounds_dir) / qiraat_id):
+            if first_page is not None and page_num < first_page:
+                continue
+            if last_page is not None and page_num > last_page:
+                break
+            for ayah in read_json(path)['ayahs']:
+                pages.append(page_num)
+                surahs.append(ayah['surahNumber'])
+                ayahs.append(ayah['ayahNumber'])
+
+        self.page = np.array(pages, dtype=np.int32)
+        self.surah = np.array(surahs, dtype=np.int32)
+        self.ayah = np.array(ayahs, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.page)
+
+    def weights(self, unit):
+        if unit == 'pages':
+            per_page = np.bincount(self.page)
+            return 1.0 / per_page[self.page]
+        if unit == 'ayahs':
+            return np.ones(len(self), dtype=np.float64)
+        if unit == 'length':
+            if self.text_path is None:
+                raise ValueError('weighing by length needs a Tanzil text file (--text)')
+            lengths = text_lengths(self.text_path, self.qiraat_id)
+            system = system_for_qiraat(self.qiraat_id)
+            return lengths[system.starts[self.surah - 1] + self.ayah - 1]
+        raise ValueError(f'Unknown unit: {unit} (expected one of {", ".join(UNITS)})')
+
+
+def plan(sequence, participants, unit='pages', surah_boundaries=False):
+    """
+    Split an AyahSequence into `participants` consecutive portions.
+
+    Returns a list of Portion, one per participant, in reading order.
+    """
+    n = len(sequence)
+    if participants < 1:
+        raise ValueError('need at least one participant')
+    if n == 0:
+        raise ValueError('no ayahs in the selected range')
+
+    weights = sequence.weights(unit)
+    prefix = np.cumsum(weights)
+    total = prefix[-1]
+
+    # Candidate cuts: a portion may start at ayah i (i >= 1)
+    candidates = np.arange(1, n)
+    if surah_boundaries:
+        candidates = candidates[sequence.surah[1:] != sequence.surah[:-1]]
+    cuts_needed = participants - 1
+    if cuts_needed > len(candidates):
+        where = 'surah boundaries' if surah_boundaries else 'ayahs'
+        raise ValueError(f'cannot split {len(candidates) + 1} {where} into {participants} portions')
+
+    if cuts_needed:
+        weight_before = prefix[candidates - 1]
+        targets = total * np.arange(1, participants) / participants
+        pos = np.searchsorted(weight_before, targets)
+        # Take whichever neighbouring cut lands closer to the target
+        lower = np.maximum(pos - 1, 0)
+        upper = np.minimum(pos, len(candidates) - 1)
+        pos = np.where(np.abs(weight_before[lower] - targets) <= np.abs(weight_before[upper] - targets),
+                       lower, upper)
+        # Keep cuts strictly increasing and leave room for every later portion
+        k = np.arange(cuts_needed)
+        pos = np.maximum.accumulate(pos - k) + k
+        pos = np.minimum(pos, len(candidates) - cuts_needed + k)
+        cuts = candidates[pos]
+    else:
+        cuts = np.array([], dtype=np.int64)
+
+    starts = np.concatenate(([0], cuts))
+    ends = np.concatenate((cuts, [n])) - 1
+    portion_weight = prefix[ends] - np.concatenate(([0.0], prefix[cuts - 1]))
+
+    columns = [
+        sequence.page[starts], sequence.surah[starts], sequence.ayah[starts],
+        sequence.page[ends], sequence.surah[ends], sequence.ayah[ends],
+        ends - starts + 1,
+    ]
+    columns = [c.tolist() for c in columns] + [np.round(portion_weight, 4).tolist()]
+    return [Portion(i + 1, *row) for i, row in enumerate(zip(*columns))]
+
+
+def _page_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split the Mushaf into balanced khatm portions.')
+    parser.add_argument('participants', type=int)
+    parser.add_argument('--qiraat', default='asim_hafs')
+    parser.add_argument('--unit', choices=UNITS, default='pages')
+    parser.add_argument('--surah-boundaries', action='store_true', help='only cut where a surah begins')
+    parser.add_argument('--pages', type=_page_range, help='page range to split, e.g. 283-322')
+    parser.add_argument('--bounds-dir', default=str(BOUNDS_DIR))
+    parser.add_argument('--text', help='Tanzil quran-text XML for --unit length (e.g. quran-uthmani.xml)')
+    parser.add_argument('--json', help='write the plan here')
+    parser.add_argument('--max-print', type=int, default=40)
+    args = parser.parse_args()
+
+    first_page, last_page = args.pages or (None, None)
+    sequence = AyahSequence(args.qiraat, args.bounds_dir, first_page, last_page, args.text)
+    if not counts_verified(args.qiraat):
+        print(f'⚠️  {args.qiraat} ayah counts are not verified; ayah numbers may be off')
+    elif args.pages is None and len(sequence) != get_total_ayahs(args.qiraat):
+        print(f'⚠️  {args.qiraat} bounds list {len(sequence)} ayahs, '
+              f'expected {get_total_ayahs(args.qiraat)}')
+
+    try:
+        portions = plan(sequence, args.participants, args.unit, args.surah_boundaries)
+    except ValueError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+
+    print('=' * 70)
+    print(f'Khatm plan: {args.participants} portions of {args.qiraat} by {args.unit}')
+    print('=' * 70)
+    for p in portions[:args.max_print]:
+        print(f'  {p.participant:5d}  page {p.start_page:3d} {p.start_surah:3d}:{p.start_ayah:<3d} -> '
+              f'page {p.end_page:3d} {p.end_surah:3d}:{p.end_ayah:<3d}  '
+              f'{p.ayahs:4d} ayahs  {p.weight:8.3f} {args.unit}')
+    if len(portions) > args.max_print:
+        print(f'  ... {len(portions) - args.max_print} more')
+
+    weights = [p.weight for p in portions]
+    print(f'\nPortion size: min {min(weights):.3f}, max {max(weights):.3f} {args.unit}')
+
+    if args.json:
+        write_json(args.json, {
+            'qiraatId': args.qiraat,
+            'unit': args.unit,
+            'surahBoundaries': args.surah_boundaries,
+            'portions': [p._asdict() for p in portions],
+        })
+        print(f'✓ Plan written to {args.json}')
+
+
+if __name__ == '__main__':
+    main()
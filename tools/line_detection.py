@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Text-line and ayah-marker detection for Mushaf page scans.
+
+Used by the annotator's assist mode to pre-populate per-line ayah
+rectangles:
+  1. The page is binarized (Otsu threshold) and frame rules (rows or
+     columns with one unbroken stroke across most of the page) are masked out.
+  2. The row-ink projection is smoothed; rows above a fraction of the
+     typical text-row ink form line bands. Bands split by thin gaps
+     (diacritics) are merged back.
+  3. Inside each band, the column projection is cut into ink runs. Runs
+     about one line-height wide, roughly round and hollow in the middle
+     are taken as ayah-end markers.
+  4. Reading right to left, each line is cut after every marker; every
+     marker closes the current ayah.
+
+Everything is numpy on a display-sized page, well under 100 ms per page.
+The result is a suggestion for a human to accept or adjust.
+
+Usage:
+    python3 line_detection.py page_003.jpg --surah 2 --ayah 1
+"""
+
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+# A row or column with one unbroken ink run this share of the page long is a frame rule
+RULE_COVERAGE = 0.6
+
+# Rows with at least this share of the typical text-row ink belong to a line
+ROW_INK_FRACTION = 0.15
+
+# Gaps thinner than this share of the median line height are merged (diacritics)
+MERGE_GAP_RATIO = 0.35
+
+# Bands shorter than this share of the median line height are noise
+MIN_HEIGHT_RATIO = 0.4
+
+# Ayah-end marker shape limits, relative to the line height
+MARKER_MIN_WIDTH = 0.45
+MARKER_MAX_WIDTH = 1.4
+MARKER_MAX_ASPECT = 1.4
+MARKER_HOLLOWNESS = 0.6  # centre ink density / ring ink density must stay below this
+MARKER_MARGIN = 0.3  # markers may stand this share of the line height above and below the text
+
+
+class LineBand(NamedTuple):
+    number: int  # 1-based line number from the top
+    top: int
+    bottom: int  # exclusive
+    left: int
+    right: int  # exclusive
+
+
+def otsu_threshold(gray):
+    """Otsu's threshold for a uint8 grayscale array (-1 for a single-level page)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * levels)
+    total, total_mean = weight[-1], mean[-1]
+    background = total - weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (total_mean * weight - mean * total) ** 2 / (weight * background)
+    between = between[:-1]
+    if np.isnan(between).all():
+        return -1
+    return int(np.nanargmax(between))
+
+
+def _longest_runs(mask):
+    """Length of the longest True run in every row of a 2-D boolean array."""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    longest = np.zeros(mask.shape[0], dtype=np.int64)
+    np.maximum.at(longest, rows, ends - starts)
+    return longest
+
+
+def ink_mask(gray):
+    """Boolean ink mask with frame rules removed."""
+    threshold = otsu_threshold(gray)
+    if threshold < 0:
+        return np.zeros(gray.shape, dtype=bool)
+    ink = gray <= threshold
+    height, width = ink.shape
+    rows = _longest_runs(ink) > RULE_COVERAGE * width
+    cols = _longest_runs(ink.T) > RULE_COVERAGE * height
+    ink[rows, :] = False
+    ink[:, cols] = False
+    return ink
+
+
+def _runs(mask):
+    """[(start, end)] of True runs in a 1-D boolean array (end exclusive)."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def _merge_runs(runs, max_gap):
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def detect_lines(ink):
+    """Find text-line bands in an ink mask, top to bottom."""
+    height, width = ink.shape
+    profile = ink.sum(axis=1).astype(np.float64)
+    window = max(height // 400, 1) * 2 + 1
+    profile = np.convolve(profile, np.ones(window) / window, mode='same')
+
+    inked = profile[profile > 0]
+    if not len(inked):
+        return []
+    text_level = np.percentile(inked, 75)
+    runs = _runs(profile > text_level * ROW_INK_FRACTION)
+    if not runs:
+        return []
+
+    line_height = np.median([end - start for start, end in runs])
+    runs = _merge_runs(runs, line_height * MERGE_GAP_RATIO)
+    line_height = np.median([end - start for start, end in runs])
+    runs = [(start, end) for start, end in runs if end - start >= line_height * MIN_HEIGHT_RATIO]
+
+    bands = []
+    for start, end in runs:
+        columns = np.flatnonzero(ink[start:end].any(axis=0))
+        if len(columns):
+            bands.append(LineBand(len(bands) + 1, start, end, int(columns[0]), int(columns[-1]) + 1))
+    return bands
+
+
+def detect_markers(ink, band):
+    """Column spans [(left, right)] of ayah-end markers in a band, right to left."""
+    line_height = band.bottom - band.top
+    margin = int(line_height * MARKER_MARGIN)
+    band_ink = ink[max(band.top - margin, 0):band.bottom + margin, band.left:band.right]
+    columns = band_ink.any(axis=0)
+    runs = _merge_runs(_runs(columns), max(line_height // 20, 1))
+
+    markers = []
+    for start, end in runs:
+        width = end - start
+        if not MARKER_MIN_WIDTH * line_height <= width <= MARKER_MAX_WIDTH * line_height:
+            continue
+        blob = band_ink[:, start:end]
+        rows = np.flatnonzero(blob.any(axis=1))
+        blob = blob[rows[0]:rows[-1] + 1]
+        blob_height = blob.shape[0]
+        if max(width, blob_height) > MARKER_MAX_ASPECT * min(width, blob_height):
+            continue
+
+        # A marker is a ring around a small number: hollow compared to its rim
+        cy, cx = blob_height // 2, width // 2
+        ry, rx = max(blob_height // 5, 1), max(width // 5, 1)
+        centre = blob[cy - ry:cy + ry + 1, cx - rx:cx + rx + 1].mean()
+        rim = np.concatenate((blob[0], blob[-1], blob[:, 0], blob[:, -1])).mean()
+        if rim > 0 and centre < MARKER_HOLLOWNESS * rim:
+            markers.append((band.left + start, band.left + end))
+
+    return markers[::-1]
+
+
+def suggest_rectangles(gray, surah, ayah, ayah_count=None):
+    """
+    Suggest per-line ayah rectangles for a page, starting at surah:ayah.
+
+    gray is a uint8 array (height, width). ayah_count(surah) gives the number
+    of ayahs in a surah so numbering can roll over into the next one.
+    Returns (bands, annotations) where annotations use the annotator's
+    normalized format (surah, ayah, x, y, width, height, lineNumber).
+    """
+    height, width = gray.shape
+    ink = ink_mask(gray)
+    bands = detect_lines(ink)
+
+    annotations = []
+    for band in bands:
+        right = band.right
+        for marker_left, marker_right in detect_markers(ink, band) + [(band.left, band.left)]:
+            left = marker_left
+            # Skip slivers left of a marker that ends the line
+            if right - left > (band.bottom - band.top) * 0.3:
+                annotations.append({
+                    'surah': surah,
+                    'ayah': ayah,
+                    'x': left / width,
+                    'y': band.top / height,
+                    'width': (right - left) / width,
+                    'height': (band.bottom - band.top) / height,
+                    'lineNumber': band.number,
+                })
+            if marker_right > marker_left:
+                # The marker closes this ayah
+                ayah += 1
+                if ayah_count is not None and ayah > ayah_count(surah):
+                    surah, ayah = surah + 1, 1
+            right = marker_left
+
+    return bands, annotations
+
+
+def main():
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description='Detect text lines and ayah markers on a page image.')
+    parser.add_argument('image')
+    parser.add_argument('--surah', type=int, default=1)
+    parser.add_argument('--ayah', type=int, default=1)
+    args = parser.parse_args()
+
+    image = Image.open(args.image)
+    image.thumbnail((1200, 1600))
+    gray = np.asarray(image.convert('L'))
+
+    start = time.perf_counter()
+    bands, annotations = suggest_rectangles(gray, args.surah, args.ayah)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for band in bands:
+        print(f'  line {band.number:2d}: rows {band.top}-{band.bottom}, cols {band.left}-{band.right}')
+    print(f'\n✓ {len(bands)} lines, {len(annotations)} rectangles in {elapsed:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
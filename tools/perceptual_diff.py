@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Perceptual-diff regression gate for re-rendered pages.
+
+Compares the old and new renders of every page (two image trees matched by
+relative path, e.g. a release snapshot from release_patch.py and a fresh
+convert_multiple_qiraats.py output) after a DPI, backend or encoder change:
+  ssim          mean structural similarity (7x7 windows, grayscale)
+  minBlockSsim  worst 16x16 block, which catches a missing glyph, dot or
+                ayah marker that the page mean hides
+  psnr          peak signal-to-noise ratio in dB
+Pages of different sizes are compared at the smaller size; blocks are
+measured in compared pixels, so --scale below 1 coarsens them. SSIM window
+sums are separable cumulative sums in numpy and pages run in parallel
+processes, so the full corpus takes minutes (~0.2 s per page per core).
+
+A page regresses when any metric falls below its threshold. The gate writes
+report.json (every page) and index.html (worst offenders with old/new/diff
+images) and exits 1 when there are regressions or missing pages.
+
+Usage:
+    python3 perceptual_diff.py releases/2025-01/images ../assets/images/qiraats
+    python3 perceptual_diff.py old/ new/ --min-ssim 0.98 --min-psnr 32 --worst 50
+    python3 perceptual_diff.py old/ new/ --scale 0.5 --workers 16    # faster, half resolution
+
+Requirements:
+pip install numpy Pillow
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = Path(__file__).parent.parent
+REPORT_DIR = ROOT_DIR / 'dist' / 'perceptual_diff'
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+
+MIN_SSIM = 0.97
+# Calibrated on 150 DPI pages of Arabic text (46 px type, 90 px line pitch)
+# re-encoded as JPEG against copies with ink removed, worst 16x16 block:
+#   JPEG quality 85 -> 90      0.87
+#   JPEG quality 85 -> 75      0.80
+#   one letter erased          0.22
+#   a letter's dots erased     0.45
+#   an 8-letter word erased    0.02
+# With 64x64 blocks the erased dots scored 0.96 and the word 0.62, too close
+# to re-encoding noise; a missing word on a real page scored 0.85 there.
+MIN_BLOCK_SSIM = 0.6
+MIN_PSNR = 30.0
+PSNR_IDENTICAL = 100.0
+
+WINDOW = 7
+BLOCK = 16  # about one letter at 150 DPI
+# SSIM constants for 8-bit images
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+
+
+def image_files(root):
+    root = Path(root)
+    return {path.relative_to(root).as_posix(): path
+            for path in sorted(root.rglob('*'))
+            if path.suffix.lower() in IMAGE_SUFFIXES and not path.name.startswith('.')}
+
+
+def load_gray(path, size=None):
+    with Image.open(path) as image:
+        image = image.convert('L')
+        if size is not None and image.size != size:
+            image = image.resize(size, Image.LANCZOS)
+        return np.asarray(image, dtype=np.uint8)
+
+
+def _window_sums(values, window):
+    """
+    Sum over every window x window patch (valid region), separably.
+
+    Exact in int32 for 8-bit squares up to ~4600 px per side; the result is
+    float32, which is all the SSIM arithmetic needs and twice as fast.
+    """
+    columns = np.cumsum(values, axis=0, dtype=np.int32)
+    columns = np.concatenate((columns[window - 1:window], columns[window:] - columns[:-window]), axis=0)
+    rows = np.cumsum(columns, axis=1, dtype=np.int32)
+    rows = np.concatenate((rows[:, window - 1:window], rows[:, window:] - rows[:, :-window]), axis=1)
+    return rows.astype(np.float32)
+
+
+def ssim_map(old, new, window=WINDOW):
+    """Per-window SSIM of two equally sized 8-bit grayscale arrays."""
+    old = old.astype(np.int32)
+    new = new.astype(np.int32)
+    count = window * window
+    sum_old, sum_new = _window_sums(old, window), _window_sums(new, window)
+    mean_old, mean_new = sum_old / count, sum_new / count
+    # Sample covariance, as in the reference implementation
+    correction = np.float32(1 / (count - 1))
+    var_sum = (_window_sums(old * old, window) - sum_old * mean_old
+               + _window_sums(new * new, window) - sum_new * mean_new) * correction
+    covariance = (_window_sums(old * new, window) - sum_old * mean_new) * correction
+    return (((2 * mean_old * mean_new + np.float32(C1)) * (2 * covariance + np.float32(C2)))
+            / ((mean_old * mean_old + mean_new * mean_new + np.float32(C1)) * (var_sum + np.float32(C2))))
+
+
+def block_minimum(values, block=BLOCK):
+    """Smallest mean over block x block tiles (partial edge tiles included)."""
+    rows = -(-values.shape[0] // block)
+    cols = -(-values.shape[1] // block)
+    padded = np.full((rows * block, cols * block), np.nan, dtype=np.float32)
+    padded[:values.shape[0], :values.shape[1]] = values
+    tiles = padded.reshape(rows, block, cols, block)
+    return float(np.nanmin(np.nanmean(tiles, axis=(1, 3))))
+
+
+def psnr(old, new):
+    """PSNR in dB, capped at PSNR_IDENTICAL for identical pages."""
+    mse = float(np.mean(np.square(old.astype(np.int32) - new.astype(np.int32)), dtype=np.float64))
+    return PSNR_IDENTICAL if mse == 0 else min(PSNR_IDENTICAL, 10 * np.log10(255 ** 2 / mse))
+
+
+def compare_page(job):
+    """Metrics of one page; job is (key, old path, new path, scale)."""
+    key, old_path, new_path, scale = job
+    try:
+        with Image.open(old_path) as old_image, Image.open(new_path) as new_image:
+            old_size, new_size = old_image.size, new_image.size
+        # Compare at the smaller of the two resolutions
+        size = min(old_size, new_size, key=lambda s: s[0] * s[1])
+        size = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+        old = load_gray(old_path, size)
+        new = load_gray(new_path, size)
+        if min(size) < WINDOW:
+            raise ValueError(f'page smaller than the {WINDOW} px SSIM window')
+        similarity = ssim_map(old, new)
+        return {
+            'key': key,
+            'oldSize': list(old_size),
+            'newSize': list(new_size),
+            'ssim': round(float(similarity.mean(dtype=np.float64)), 5),
+            'minBlockSsim': round(block_minimum(similarity), 5),
+            'psnr': round(psnr(old, new), 2),
+            'oldBytes': os.path.getsize(old_path),
+            'newBytes': os.path.getsize(new_path),
+        }
+    except (OSError, ValueError) as e:
+        return {'key': key, 'error': str(e)}
+
+
+def is_regression(result, min_ssim, min_block_ssim, min_psnr):
+    return ('error' in result or result['ssim'] < min_ssim
+            or result['minBlockSsim'] < min_block_ssim or result['psnr'] < min_psnr)
+
+
+def compare_trees(old_root, new_root, scale=1.0, workers=None):
+    """(results, missing, added) for two image trees."""
+    old_files, new_files = image_files(old_root), image_files(new_root)
+    common = sorted(set(old_files) & set(new_files))
+    jobs = [(key, old_files[key], new_files[key], scale) for key in common]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(compare_page, jobs, chunksize=8))
+    missing = sorted(set(old_files) - set(new_files))
+    added = sorted(set(new_files) - set(old_files))
+    return results, missing, added
+
+
+def write_diff_images(result, old_root, new_root, output_dir, width=500):
+    """old/new/diff PNGs of one page for the HTML report. Returns their relative names."""
+    key = result['key']
+    stem = key.replace('/', '__').rsplit('.', 1)[0]
+    size = tuple(min(result['oldSize'], result['newSize'], key=lambda s: s[0] * s[1]))
+    old = load_gray(Path(old_root) / key, size).astype(np.float64)
+    new = load_gray(Path(new_root) / key, size).astype(np.float64)
+    diff = np.clip(np.abs(old - new) * 4, 0, 255).astype(np.uint8)
+    # Differences in red over the faded new page
+    overlay = np.stack([np.maximum(new * 0.3 + 178, diff), new * 0.3 + 178 - diff * 0.7,
+                        new * 0.3 + 178 - diff * 0.7], axis=-1)
+    names = {}
+    height = max(1, round(size[1] * width / size[0]))
+    for label, pixels in (('old', old), ('new', new), ('diff', overlay)):
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        image.resize((width, height), Image.LANCZOS).save(output_dir / f'{stem}.{label}.png', optimize=True)
+        names[label] = f'{stem}.{label}.png'
+    return names
+
+
+def write_html(path, offenders, images, summary):
+    rows = []
+    for result in offenders:
+        pictures = images.get(result['key'])
+        cells = ''.join(f'<td><img src="{html.escape(pictures[label])}" width="250"></td>'
+                        for label in ('old', 'new', 'diff')) if pictures else '<td colspan="3"></td>'
+        metrics = (html.escape(result['error']) if 'error' in result else
+                   f'SSIM {result["ssim"]:.4f}<br>block {result["minBlockSsim"]:.4f}<br>'
+                   f'PSNR {result["psnr"]:.1f} dB<br>{result["oldBytes"] // 1024} → {result["newBytes"] // 1024} KB')
+        rows.append(f'<tr><td><b>{html.escape(result["key"])}</b><br>{metrics}</td>{cells}</tr>')
+    path.write_text(
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Perceptual diff</title>'
+        '<style>body{font-family:sans-serif}td{vertical-align:top;padding:4px}'
+        'tr:nth-child(even){background:#f4f4f4}</style></head><body>'
+        f'<h1>Perceptual diff: {summary["regressions"]} regressions of {summary["pages"]} pages</h1>'
+        f'<p>{html.escape(summary["old"])} → {html.escape(summary["new"])}<br>'
+        f'thresholds: SSIM ≥ {summary["thresholds"]["ssim"]}, block SSIM ≥ {summary["thresholds"]["blockSsim"]}, '
+        f'PSNR ≥ {summary["thresholds"]["psnr"]} dB; missing pages: {len(summary["missing"])}</p>'
+        '<table><tr><th>page</th><th>old</th><th>new</th><th>diff</th></tr>'
+        + ''.join(rows) + '</table></body></html>\n', encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SSIM/PSNR regression gate between two page image trees.')
+    parser.add_argument('old', help='previous renders')
+    parser.add_argument('new', help='new renders')
+    parser.add_argument('--min-ssim', type=float, default=MIN_SSIM)
+    parser.add_argument('--min-block-ssim', type=float, default=MIN_BLOCK_SSIM)
+    parser.add_argument('--min-psnr', type=float, default=MIN_PSNR)
+    parser.add_argument('--scale', type=float, default=1.0, help='compare at this fraction of the resolution')
+    parser.add_argument('--worst', type=int, default=30, help='offenders shown in the HTML report')
+    parser.add_argument('--workers', type=int, help='processes (default: all cores)')
+    parser.add_argument('--output', default=str(REPORT_DIR))
+    args = parser.parse_args()
+
+    for root in (args.old, args.new):
+        if not Path(root).is_dir():
+            print(f'❌ Folder not found: {root}')
+            sys.exit(1)
+
+    print('=' * 70)
+    print(f'Perceptual diff: {args.old} -> {args.new}')
+    print('=' * 70)
+    start = time.perf_counter()
+    results, missing, added = compare_trees(args.old, args.new, args.scale, args.workers)
+    regressions = [r for r in results
+                   if is_regression(r, args.min_ssim, args.min_block_ssim, args.min_psnr)]
+    # Errors first, then the lowest block SSIM
+    regressions.sort(key=lambda r: ('error' not in r, r.get('minBlockSsim', 0), r.get('ssim', 0)))
+    ranked = sorted((r for r in results if 'error' not in r), key=lambda r: (r['minBlockSsim'], r['ssim']))
+    offenders = (regressions or ranked)[:args.worst]
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    images = {r['key']: write_diff_images(r, args.old, args.new, output_dir)
+              for r in offenders if 'error' not in r}
+
+    measured = [r for r in results if 'error' not in r]
+    summary = {
+        'old': str(args.old),
+        'new': str(args.new),
+        'pages': len(results),
+        'regressions': len(regressions),
+        'missing': missing,
+        'added': added,
+        'thresholds': {'ssim': args.min_ssim, 'blockSsim': args.min_block_ssim, 'psnr': args.min_psnr},
+        'meanSsim': round(float(np.mean([r['ssim'] for r in measured])), 5) if measured else None,
+        'oldBytes': sum(r['oldBytes'] for r in measured),
+        'newBytes': sum(r['newBytes'] for r in measured),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    with open(output_dir / 'report.json', 'w', encoding='utf-8') as f:
+        json.dump({**summary, 'worst': [r['key'] for r in offenders], 'perPage': results}, f, indent=2)
+    write_html(output_dir / 'index.html', offenders, images, summary)
+
+    print(f'  pages compared    {summary["pages"]} in {summary["seconds"]:.1f}s')
+    if measured:
+        print(f'  mean SSIM         {summary["meanSsim"]:.4f}')
+        print(f'  bytes             {summary["oldBytes"] / 1024 / 1024:.1f} MB -> '
+              f'{summary["newBytes"] / 1024 / 1024:.1f} MB')
+    for result in regressions[:10]:
+        if 'error' in result:
+            print(f'  ❌ {result["key"]}: {result["error"]}')
+        else:
+            print(f'  ❌ {result["key"]}: SSIM {result["ssim"]:.4f}, block {result["minBlockSsim"]:.4f}, '
+                  f'PSNR {result["psnr"]:.1f} dB')
+    if len(regressions) > 10:
+        print(f'  ... {len(regressions) - 10} more')
+    if added:
+        print(f'⚠️  {len(added)} pages only in the new renders')
+    print(f'✓ Report written to {output_dir / "index.html"}')
+
+    if regressions or missing:
+        print(f'❌ {len(regressions)} regressions, {len(missing)} missing pages')
+        sys.exit(1)
+    print('✓ No regressions')
+
+
+if __name__ == '__main__':
+    main()
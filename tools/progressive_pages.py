@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Progressive page encodes, tiny placeholders and a first-paint benchmark.
+
+Baseline JPEGs paint top to bottom, so a page only becomes readable once the
+whole file has arrived. Progressive JPEGs carry a blurry full-page first
+scan within the first few KB and sharpen as later scans arrive.
+convert_multiple_qiraats.py now saves pages progressive; this tool converts
+an existing image tree and measures the gain:
+
+  benchmark   bytes (and time on a given link) until the first full-page scan
+              of every page of a riwaya, plus the placeholder bytes
+  convert     re-encode baseline pages progressive in place (lossy: the
+              pages are JPEG again, prefer re-running the PDF converter)
+
+Placeholders are ~24 px wide JPEG thumbnails, base64 encoded into the
+"placeholder" field of pages.json by hashed_assets.py, so the reader can
+paint the page shape before the first image byte arrives.
+
+Usage:
+    python3 progressive_pages.py benchmark nafi_warsh
+    python3 progressive_pages.py benchmark nafi_warsh --link 400kbit --json first_paint.json
+    python3 progressive_pages.py convert nafi_warsh --quality 85
+
+Requirements:
+pip install numpy Pillow
+"""
+
+import argparse
+import base64
+import io
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from bounds_model import atomic_write, write_json
+from perceptual_diff import image_files
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+sys.path.insert(0, str(ROOT_DIR))
+
+# The converter's settings, so re-encoded pages match freshly converted ones
+from convert_multiple_qiraats import IMAGE_PROGRESSIVE, IMAGE_QUALITY  # noqa: E402
+
+PLACEHOLDER_WIDTH = 24
+PLACEHOLDER_QUALITY = 50
+
+# Slow mobile link used for the time estimates (bits per second)
+DEFAULT_LINK = 400_000
+
+SOI, EOI, SOS = 0xD8, 0xD9, 0xDA
+SOF_PROGRESSIVE = {0xC2, 0xC6, 0xCA, 0xCE}
+# Markers without a length field
+STANDALONE = {0x01, SOI, EOI} | set(range(0xD0, 0xD8))
+
+
+def jpeg_scans(data):
+    """
+    (progressive, [byte offset where each scan ends]) of a JPEG.
+
+    A decoder can paint scan n once scan_ends[n] bytes have arrived.
+    """
+    if data[:2] != b'\xff\xd8':
+        raise ValueError('not a JPEG file')
+    progressive = False
+    scan_ends = []
+    pos = 2
+    while pos < len(data) - 1:
+        if data[pos] != 0xFF:
+            raise ValueError(f'bad marker at byte {pos}')
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == EOI:
+            break
+        if marker in STANDALONE:
+            pos += 2
+            continue
+        length = int.from_bytes(data[pos + 2:pos + 4], 'big')
+        if marker in SOF_PROGRESSIVE:
+            progressive = True
+        pos += 2 + length
+        if marker != SOS:
+            continue
+        # Entropy-coded data runs to the next marker that is not a stuffed
+        # 0xFF00 or a restart marker
+        while True:
+            pos = data.find(b'\xff', pos)
+            if pos < 0 or pos == len(data) - 1:
+                pos = len(data)
+                break
+            following = data[pos + 1]
+            if following == 0x00 or 0xD0 <= following <= 0xD7:
+                pos += 2
+                continue
+            break
+        scan_ends.append(pos)
+    return progressive, scan_ends
+
+
+def placeholder(path, width=PLACEHOLDER_WIDTH, quality=PLACEHOLDER_QUALITY):
+    """Base64 tiny JPEG thumbnail of a page, with the page's pixel size."""
+    with Image.open(path) as image:
+        size = image.size
+        # JPEG pages decode at 1/8 scale directly, which is plenty for a thumbnail
+        image.draft('L' if image.mode == 'L' else 'RGB', (width * 2, width * 2 * size[1] // size[0]))
+        image = image.convert('L' if image.mode in ('L', '1', 'LA') else 'RGB')
+        thumb = image.resize((width, max(1, round(width * size[1] / size[0]))), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'JPEG', quality=quality, optimize=True)
+    return {'width': size[0], 'height': size[1],
+            'data': base64.b64encode(buffer.getvalue()).decode('ascii')}
+
+
+def jpeg_pages(qiraat_dir):
+    return [path for path in image_files(qiraat_dir).values() if path.suffix.lower() in ('.jpg', '.jpeg')]
+
+
+def measure_page(path):
+    data = path.read_bytes()
+    progressive, scan_ends = jpeg_scans(data)
+    # A baseline page is only complete after its single scan, i.e. the whole file
+    first = scan_ends[0] if progressive and scan_ends else len(data)
+    return {
+        'page': path.name,
+        'bytes': len(data),
+        'progressive': progressive,
+        'scans': len(scan_ends),
+        'firstScanBytes': first,
+        'placeholderBytes': len(placeholder(path)['data']),
+    }
+
+
+def benchmark(qiraat_dir, link=DEFAULT_LINK, workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(measure_page, jpeg_pages(qiraat_dir)))
+    if not pages:
+        return {'pages': 0}
+
+    def ms(size):
+        return round(size * 8 / link * 1000, 1)
+
+    total = sum(p['bytes'] for p in pages)
+    first = [p['firstScanBytes'] for p in pages]
+    return {
+        'pages': len(pages),
+        'progressivePages': sum(p['progressive'] for p in pages),
+        'totalBytes': total,
+        'firstScanBytes': sum(first),
+        'firstScanShare': round(sum(first) / total, 4),
+        'placeholderBytes': sum(p['placeholderBytes'] for p in pages),
+        'linkBitsPerSecond': link,
+        'firstPaintMs': {'p50': ms(statistics.median(first)), 'max': ms(max(first))},
+        'fullPageMs': {'p50': ms(statistics.median(p['bytes'] for p in pages)),
+                       'max': ms(max(p['bytes'] for p in pages))},
+        'perPage': pages,
+    }
+
+
+def convert_page(path, quality=IMAGE_QUALITY):
+    """Re-encode a baseline JPEG as progressive in place. Returns False if already progressive."""
+    if jpeg_scans(path.read_bytes())[0]:
+        return False
+    with Image.open(path) as image:
+        image.load()
+    with atomic_write(path) as f:
+        image.save(f, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return True
+
+
+def parse_rate(text):
+    """'400kbit', '2mbit' or plain bits per second."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([kmg]?)(?:bit|bps)?\s*', text.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f'bad link rate: {text}')
+    return int(float(match.group(1)) * {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}[match.group(2)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Progressive page encodes and first-paint benchmark.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bench = commands.add_parser('benchmark', help='bytes to first full-page scan across a riwaya')
+    bench.add_argument('qiraat')
+    bench.add_argument('--source', default=str(IMAGES_DIR))
+    bench.add_argument('--link', type=parse_rate, default=DEFAULT_LINK, help='link rate, e.g. 400kbit')
+    bench.add_argument('--workers', type=int, default=8)
+    bench.add_argument('--json', help='write the results (with per-page rows) here')
+
+    convert = commands.add_parser('convert', help='re-encode baseline pages progressive in place')
+    convert.add_argument('qiraat')
+    convert.add_argument('--source', default=str(IMAGES_DIR))
+    convert.add_argument('--quality', type=int, default=IMAGE_QUALITY)
+    convert.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    qiraat_dir = Path(args.source) / args.qiraat
+    if not qiraat_dir.is_dir():
+        print(f'❌ Qiraat folder not found: {qiraat_dir}')
+        sys.exit(1)
+
+    start = time.perf_counter()
+    print('=' * 70)
+    if args.command == 'convert':
+        print(f'Progressive re-encode: {qiraat_dir}')
+        print('=' * 70)
+        pages = jpeg_pages(qiraat_dir)
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            converted = sum(pool.map(lambda p: convert_page(p, args.quality), pages))
+        print(f'✓ {converted} of {len(pages)} pages converted in {time.perf_counter() - start:.2f}s')
+        return
+
+    print(f'First-paint benchmark: {args.qiraat} at {args.link / 1000:.0f} kbit/s')
+    print('=' * 70)
+    result = benchmark(qiraat_dir, args.link, args.workers)
+    if not result['pages']:
+        print('⚠️  No JPEG pages found')
+        sys.exit(1)
+    mb = 1024 * 1024
+    print(f'  pages               {result["pages"]} ({result["progressivePages"]} progressive)')
+    print(f'  full pages          {result["totalBytes"] / mb:8.2f} MB   '
+          f'p50 {result["fullPageMs"]["p50"]:8.1f} ms   max {result["fullPageMs"]["max"]:8.1f} ms')
+    print(f'  to first scan       {result["firstScanBytes"] / mb:8.2f} MB   '
+          f'p50 {result["firstPaintMs"]["p50"]:8.1f} ms   max {result["firstPaintMs"]["max"]:8.1f} ms')
+    print(f'  placeholders        {result["placeholderBytes"] / 1024:8.1f} KB in pages.json')
+    print(f'  first-scan share    {result["firstScanShare"] * 100:.1f}% of the riwaya')
+    if result['progressivePages'] < result['pages']:
+        fix = 're-run convert_multiple_qiraats.py or use' if IMAGE_PROGRESSIVE else 'use'
+        print(f'⚠️  {result["pages"] - result["progressivePages"]} baseline pages: {fix} the convert command')
+    if args.json:
+        write_json(args.json, result)
+        print(f'✓ Results written to {args.json}')
+    print(f'✓ Done in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
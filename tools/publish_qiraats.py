@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Publish qiraat page images to the mushaf-qiraats store by delta sync.
+
+The local output (assets/images/qiraats/<qiraat>/) is described by a
+manifest of every file's SHA-256 and size. The store keeps the manifest of
+what it holds at its root (manifest.json). Publishing compares the two and
+copies or uploads only new and changed files, concurrently, then writes the
+new manifest last, so an interrupted publish is simply resumed by the next
+run. Republishing after a one-page fix moves one file.
+
+Hashes are cached in dist/publish_hash_cache.json by (size, mtime), so only
+files that changed on disk are re-read.
+
+Stores:
+  - a local directory, e.g. a checkout of the mushaf-qiraats repository
+    (GitHub Pages); a directory without manifest.json is scanned once
+  - an S3-compatible bucket (AWS S3, Cloudflare R2, or a local MinIO for
+    testing) given as s3://bucket/prefix, with --endpoint-url; content-hashed
+    names from hashed_assets.py are uploaded with an immutable Cache-Control
+
+Usage:
+    python3 publish_qiraats.py ../mushaf-qiraats                   # local checkout
+    python3 publish_qiraats.py ../mushaf-qiraats nafi_warsh --dry-run
+    python3 publish_qiraats.py s3://mushaf-qiraats --endpoint-url http://localhost:9000
+    python3 publish_qiraats.py ../mushaf-qiraats --delete          # also remove stale files
+
+Requirements (S3 stores only):
+pip install boto3
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bounds_model import atomic_write, write_bytes_atomic
+from file_hashes import content_type, format_bytes, hash_files
+from hashed_assets import cache_control
+from qiraat_registry import published_ids
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+HASH_CACHE = ROOT_DIR / 'dist' / 'publish_hash_cache.json'
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def manifest_json(files):
+    return json.dumps({'version': MANIFEST_VERSION, 'files': dict(sorted(files.items()))}, indent=2)
+
+
+def local_files(source_dir, qiraat_ids=None):
+    """
+    {key: path} of every publishable file; keys are '<qiraat>/<name>'.
+
+    Without qiraat_ids, every published riwaya of the registry that has a
+    folder; other folders (docs/, bundled riwayat) are never listed.
+    """
+    source_dir = Path(source_dir)
+    if qiraat_ids is None:
+        qiraat_ids = [q for q in published_ids() if (source_dir / q).is_dir()]
+    files = {}
+    for qiraat_id in qiraat_ids:
+        for path in sorted((source_dir / qiraat_id).rglob('*')):
+            if path.is_file() and not path.name.startswith('.'):
+                files[path.relative_to(source_dir).as_posix()] = path
+    return files
+
+
+def diff_manifests(local, remote, qiraat_ids=None):
+    """
+    Return (changed, stale): keys to upload and remote keys no longer produced.
+
+    Only remote keys under a '<riwaya>/' prefix of the published qiraats (all
+    published riwayat of the registry by default) are considered stale, so a
+    publish never deletes other riwayat or files the store holds besides
+    them (docs/index.html, ...).
+    """
+    changed = sorted(key for key, entry in local.items() if remote.get(key) != entry)
+    prefixes = tuple(f'{q}/' for q in qiraat_ids or published_ids())
+    stale = sorted(key for key in remote if key not in local and key.startswith(prefixes))
+    return changed, stale
+
+
+class LocalStore:
+    """A directory, e.g. a checkout of the mushaf-qiraats Pages repository."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.description = str(self.root)
+
+    def read_manifest(self):
+        path = self.root / MANIFEST_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))['files']
+
+    def scan(self, qiraat_ids=None, workers=8):
+        """Hash what the directory already holds (first publish into an existing checkout)."""
+        if not self.root.exists():
+            return {}
+        files = local_files(self.root, qiraat_ids)
+        return hash_files(files, workers)
+
+    def put(self, key, path):
+        with open(path, 'rb') as source, atomic_write(self.root / key) as target:
+            shutil.copyfileobj(source, target)
+
+    def delete(self, key):
+        (self.root / key).unlink(missing_ok=True)
+
+    def write_manifest(self, files):
+        write_bytes_atomic(self.root / MANIFEST_NAME, manifest_json(files).encode('utf-8'))
+
+
+class S3Store:
+    """An S3-compatible bucket (S3, R2, MinIO) under an optional key prefix."""
+
+    def __init__(self, url, endpoint_url=None):
+        try:
+            import boto3
+        except ImportError:
+            raise SystemExit('S3 stores need boto3: pip install boto3')
+
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.description = url + (f' ({endpoint_url})' if endpoint_url else '')
+
+    def read_manifest(self):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + MANIFEST_NAME)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return json.loads(response['Body'].read())['files']
+
+    def scan(self, qiraat_ids=None, workers=8):
+        # Objects are only trusted through a manifest; without one everything is uploaded
+        return {}
+
+    def put(self, key, path):
+        self.client.upload_file(str(path), self.bucket, self.prefix + key,
+                                ExtraArgs={'ContentType': content_type(path), 'CacheControl': cache_control(key)})
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def write_manifest(self, files):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + MANIFEST_NAME,
+                               Body=manifest_json(files).encode('utf-8'),
+                               ContentType='application/json', CacheControl='no-cache')
+
+
+def open_store(target, endpoint_url=None):
+    if target.startswith('s3://'):
+        return S3Store(target, endpoint_url)
+    return LocalStore(target)
+
+
+def publish(store, source_dir=IMAGES_DIR, qiraat_ids=None, workers=8, delete=False, dry_run=False):
+    """Sync the local images into a store. Returns a summary dict."""
+    files = local_files(source_dir, qiraat_ids)
+    local = hash_files(files, workers, cache_path=HASH_CACHE)
+
+    remote = store.read_manifest()
+    if remote is None:
+        remote = store.scan(qiraat_ids, workers)
+    changed, stale = diff_manifests(local, remote, qiraat_ids)
+
+    summary = {
+        'files': len(local),
+        'changed': len(changed),
+        'changedBytes': sum(local[key]['size'] for key in changed),
+        'stale': len(stale),
+        'deleted': 0,
+    }
+    if dry_run:
+        return summary, changed, stale
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda key: store.put(key, files[key]), changed))
+
+    published = dict(remote)
+    published.update(local)
+    if delete:
+        for key in stale:
+            published.pop(key, None)
+    # The manifest goes last: it only ever lists objects that are in the store
+    store.write_manifest(published)
+
+    if delete and stale:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(store.delete, stale))
+        summary['deleted'] = len(stale)
+    return summary, changed, stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish qiraat images to a directory or S3 bucket by delta sync.')
+    parser.add_argument('target', help='store directory (mushaf-qiraats checkout) or s3://bucket/prefix')
+    parser.add_argument('qiraats', nargs='*', help='riwaya ids to publish (default: every published riwaya)')
+    parser.add_argument('--source', default=str(IMAGES_DIR), help='local qiraat image folders')
+    parser.add_argument('--endpoint-url', help='S3-compatible endpoint (R2, MinIO)')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent hashes and uploads')
+    parser.add_argument('--delete', action='store_true', help='remove files no longer produced locally')
+    parser.add_argument('--dry-run', action='store_true', help='list changes without copying')
+    parser.add_argument('--max-print', type=int, default=20)
+    args = parser.parse_args()
+
+    if not Path(args.source).is_dir():
+        print(f'❌ Source folder not found: {args.source}')
+        print('   Convert the PDFs first: python3 convert_multiple_qiraats.py')
+        sys.exit(1)
+
+    store = open_store(args.target, args.endpoint_url)
+    print('=' * 70)
+    print(f'Publishing {args.source} -> {store.description}')
+    print('=' * 70)
+
+    start = time.perf_counter()
+    summary, changed, stale = publish(store, args.source, args.qiraats or None,
+                                      args.workers, args.delete, args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    for key in changed[:args.max_print]:
+        print(f'  + {key}')
+    if len(changed) > args.max_print:
+        print(f'  ... {len(changed) - args.max_print} more')
+    for key in stale[:args.max_print]:
+        print(f'  {"-" if args.delete else "?"} {key}')
+
+    verb = 'would be copied' if args.dry_run else 'copied'
+    print(f'\n✓ {summary["files"]} files checked, {summary["changed"]} {verb} '
+          f'({format_bytes(summary["changedBytes"])}) in {elapsed:.2f}s')
+    if stale and not args.delete:
+        print(f'⚠️  {len(stale)} files in the store are no longer produced (use --delete to remove them)')
+    elif summary['deleted']:
+        print(f'✓ {summary["deleted"]} stale files deleted')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Packed per-qiraat page bundles with a random-access index.
+
+Instead of ~606 separate page objects per riwaya, the build emits:
+  <qiraat>.index.json    central offset index
+  <qiraat>.000.bin ...   segments: page files concatenated back to back,
+                         each segment at most --segment-size bytes
+
+Segments carry no headers; the index says where everything is:
+  {"version": 1, "qiraatId": "nafi_warsh",
+   "segments": [{"name": "nafi_warsh.000.bin", "size": ..., "sha256": ...}],
+   "entries": {"page_001.jpg": {"segment": 0, "offset": 0, "size": ..., "sha256": ...}}}
+
+A page never straddles two segments, so a whole-riwaya download is one
+sequential GET per segment, and a single page is one HTTP Range request
+(segment, offset, size) against the same objects. Pages are stored as-is
+(JPEG/PNG are already compressed) in page order.
+
+To serve dist/bundles over HTTP with Range support, run cdn_server.py
+(mounted at /bundles/). extract refuses entry names that are absolute, contain
+'..' or would otherwise unpack outside the output folder.
+
+Usage:
+    python3 qiraat_bundle.py build                          # all riwayat -> dist/bundles
+    python3 qiraat_bundle.py build nafi_warsh --segment-size 16MB
+    python3 qiraat_bundle.py extract http://127.0.0.1:8080/bundles/nafi_warsh.index.json /tmp/warsh
+    python3 qiraat_bundle.py read dist/bundles/nafi_warsh.index.json page_003.jpg -o page.jpg
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import urllib.request
+from pathlib import Path, PurePosixPath
+
+from bounds_model import write_bytes_atomic
+from qiraat_registry import published_ids
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+BUNDLE_DIR = ROOT_DIR / 'dist' / 'bundles'
+
+BUNDLE_VERSION = 1
+SEGMENT_SIZE = 32 * 1024 * 1024
+
+
+def _parse_size(text):
+    match = re.fullmatch(r'(\d+)\s*([KMG]?)B?', text.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f'invalid size: {text}')
+    return int(match.group(1)) * 1024 ** ' KMG'.index(match.group(2) or ' ')
+
+
+def _page_key(path):
+    numbers = re.findall(r'\d+', path.stem)
+    return (int(numbers[-1]) if numbers else sys.maxsize, path.name)
+
+
+def bundle_files(qiraat_dir):
+    """Files of a riwaya folder in page order."""
+    return sorted((p for p in Path(qiraat_dir).iterdir() if p.is_file() and not p.name.startswith('.')),
+                  key=_page_key)
+
+
+def build_bundle(qiraat_id, source_dir=IMAGES_DIR, output_dir=BUNDLE_DIR, segment_size=SEGMENT_SIZE):
+    """Pack one riwaya into segments plus an index. Returns the index dict."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = bundle_files(Path(source_dir) / qiraat_id)
+
+    segments = []
+    entries = {}
+    chunks = []  # page data of the open segment
+
+    def close_segment():
+        data = b''.join(chunks)
+        segments[-1]['sha256'] = hashlib.sha256(data).hexdigest()
+        write_bytes_atomic(output_dir / segments[-1]['name'], data)
+        chunks.clear()
+
+    for path in files:
+        data = path.read_bytes()
+        if not segments or (segments[-1]['size'] and segments[-1]['size'] + len(data) > segment_size):
+            if segments:
+                close_segment()
+            name = f'{qiraat_id}.{len(segments):03d}.bin'
+            segments.append({'name': name, 'size': 0, 'sha256': None})
+
+        entries[path.name] = {
+            'segment': len(segments) - 1,
+            'offset': segments[-1]['size'],
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        }
+        chunks.append(data)
+        segments[-1]['size'] += len(data)
+
+    if segments:
+        close_segment()
+
+    # Drop segments left over from a previous, larger build
+    for old in output_dir.glob(f'{qiraat_id}.*.bin'):
+        if old.name not in {s['name'] for s in segments}:
+            old.unlink()
+
+    index = {'version': BUNDLE_VERSION, 'qiraatId': qiraat_id, 'segments': segments, 'entries': entries}
+    write_bytes_atomic(output_dir / f'{qiraat_id}.index.json', json.dumps(index, indent=2).encode('utf-8'))
+    return index
+
+
+class BundleReader:
+    """
+    Reference reader for a bundle index given as a local path or an http(s) URL.
+
+    Segments are resolved next to the index. Over HTTP every read is a Range
+    request; reads of neighbouring pages are coalesced into one request.
+    """
+
+    def __init__(self, index_location):
+        self.location = str(index_location)
+        self.remote = self.location.startswith(('http://', 'https://'))
+        self.base = self.location.rsplit('/', 1)[0] if self.remote else str(Path(self.location).parent)
+        self.index = json.loads(self._fetch(self.location))
+        if self.index.get('version') != BUNDLE_VERSION:
+            raise ValueError(f'unsupported bundle version: {self.index.get("version")}')
+        self.requests = 0
+
+    def _segment_location(self, segment):
+        name = self.index['segments'][segment]['name']
+        return f'{self.base}/{name}' if self.remote else os.path.join(self.base, name)
+
+    def _fetch(self, location, start=None, length=None):
+        """Bytes of a file or URL, optionally only [start, start + length)."""
+        if not self.remote:
+            with open(location, 'rb') as f:
+                if start is None:
+                    return f.read()
+                f.seek(start)
+                return f.read(length)
+
+        request = urllib.request.Request(location)
+        if start is not None:
+            request.add_header('Range', f'bytes={start}-{start + length - 1}')
+        with urllib.request.urlopen(request) as response:
+            data = response.read()
+            if start is not None and response.status == 200:
+                data = data[start:start + length]  # server ignored the Range header
+        if start is not None and len(data) != length:
+            raise IOError(f'{location}: expected {length} bytes at {start}, got {len(data)}')
+        return data
+
+    def names(self):
+        return list(self.index['entries'])
+
+    def read(self, name):
+        return self.read_many([name])[name]
+
+    def read_many(self, names):
+        """{name: bytes} for several entries, one request per contiguous run."""
+        entries = sorted(((self.index['entries'][n], n) for n in names),
+                         key=lambda e: (e[0]['segment'], e[0]['offset']))
+        result = {}
+        run = []
+
+        def flush():
+            first, last = run[0][0], run[-1][0]
+            start = first['offset']
+            data = self._fetch(self._segment_location(first['segment']),
+                               start, last['offset'] + last['size'] - start)
+            self.requests += 1
+            for entry, name in run:
+                result[name] = self._verify(name, entry, data[entry['offset'] - start:
+                                                              entry['offset'] - start + entry['size']])
+
+        for entry, name in entries:
+            if run and (entry['segment'] != run[-1][0]['segment']
+                        or entry['offset'] != run[-1][0]['offset'] + run[-1][0]['size']):
+                flush()
+                run = []
+            run.append((entry, name))
+        if run:
+            flush()
+        return result
+
+    @staticmethod
+    def _verify(name, entry, data):
+        if hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f'{name}: checksum mismatch')
+        return data
+
+    @staticmethod
+    def _entry_path(output_dir, name):
+        """Where an entry is unpacked; names that would leave output_dir are refused."""
+        path = PurePosixPath(name)
+        if path.is_absolute() or '..' in path.parts or '\\' in name or not path.parts:
+            raise ValueError(f'{name!r}: unsafe entry name')
+        target = (output_dir / path).resolve()
+        try:
+            target.relative_to(output_dir.resolve())
+        except ValueError:
+            raise ValueError(f'{name!r}: unpacks outside {output_dir}') from None
+        return target
+
+    def extract(self, output_dir):
+        """Download every segment in one sequential transfer each and unpack it."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Check every name before anything is downloaded or written
+        by_segment = {}
+        for name, entry in self.index['entries'].items():
+            by_segment.setdefault(entry['segment'], []).append((self._entry_path(output_dir, name), entry))
+
+        written = 0
+        for number, segment in enumerate(self.index['segments']):
+            data = self._fetch(self._segment_location(number))
+            self.requests += 1
+            if hashlib.sha256(data).hexdigest() != segment['sha256']:
+                raise ValueError(f'{segment["name"]}: checksum mismatch')
+            for path, entry in by_segment.get(number, []):
+                write_bytes_atomic(path, data[entry['offset']:entry['offset'] + entry['size']])
+                written += 1
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and read packed qiraat page bundles.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='pack riwaya image folders into bundles')
+    build.add_argument('qiraats', nargs='*', help='riwaya ids (default: every published riwaya)')
+    build.add_argument('--source', default=str(IMAGES_DIR))
+    build.add_argument('--output', default=str(BUNDLE_DIR))
+    build.add_argument('--segment-size', type=_parse_size, default=SEGMENT_SIZE, help='e.g. 32MB')
+
+    extract = commands.add_parser('extract', help='download and unpack a whole bundle')
+    extract.add_argument('index', help='index path or URL')
+    extract.add_argument('output')
+
+    read = commands.add_parser('read', help='read single entries by Range')
+    read.add_argument('index', help='index path or URL')
+    read.add_argument('names', nargs='+')
+    read.add_argument('-o', '--output', help='write the (single) entry here')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        source = Path(args.source)
+        if not source.is_dir():
+            print(f'❌ Source folder not found: {source}')
+            sys.exit(1)
+        qiraat_ids = args.qiraats or [q for q in published_ids() if (source / q).is_dir()]
+        print('=' * 70)
+        print(f'Building qiraat bundles -> {args.output}')
+        print('=' * 70)
+        start = time.perf_counter()
+        for qiraat_id in qiraat_ids:
+            index = build_bundle(qiraat_id, source, args.output, args.segment_size)
+            size = sum(s['size'] for s in index['segments'])
+            print(f'  {qiraat_id:24s} {len(index["entries"]):4d} files, '
+                  f'{len(index["segments"]):2d} segments, {size / 1024 / 1024:8.1f} MB')
+        print(f'\n✓ {len(qiraat_ids)} bundles in {time.perf_counter() - start:.2f}s')
+        return
+
+    reader = BundleReader(args.index)
+    start = time.perf_counter()
+    if args.command == 'extract':
+        written = reader.extract(args.output)
+        print(f'✓ {written} files from {len(reader.index["segments"])} segments in '
+              f'{reader.requests} requests, {time.perf_counter() - start:.2f}s')
+        return
+
+    data = reader.read_many(args.names)
+    if args.output:
+        if len(args.names) != 1:
+            parser.error('--output takes a single entry name')
+        Path(args.output).write_bytes(data[args.names[0]])
+    for name in args.names:
+        print(f'  {name}: {len(data[name])} bytes')
+    print(f'✓ {len(args.names)} entries in {reader.requests} requests')
+
+
+if __name__ == '__main__':
+    main()
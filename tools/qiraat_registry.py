@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Registry of the 20 riwayat shared by every pipeline stage.
+
+One typed record per riwaya: id (the app's QiraatProvider id, which is also
+the bounds and image folder name), names, source PDF, counting system, page
+layout family and the output tiers it is built into. Converters, bounds
+tools, publishers and the build orchestrator import it instead of keeping
+their own lists, so ids cannot drift again.
+
+Ids used by older scripts (kisai_harith, asim_shuabah, yaqub_rouh, ...)
+resolve to the current ids through LEGACY_IDS.
+
+Per-riwaya build targets (Target, targets()) name one stage of one riwaya,
+e.g. "pages:nafi_warsh", so a build can schedule and cache riwayat
+independently.
+
+Usage:
+    from qiraat_registry import RIWAYAT, get_riwaya, published_ids
+    get_riwaya('nafi_warsh').counting_system      # -> 'madani_2'
+    get_riwaya('yaqub_rouh').id                   # -> 'yaqub_rawh'
+
+    python3 qiraat_registry.py                    # table of all riwayat
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT_DIR = Path(__file__).parent.parent
+PDF_DIR = ROOT_DIR / 'assets' / 'pdfs'
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+BOUNDS_DIR = ROOT_DIR / 'assets' / 'json' / 'bounds'
+
+# Stages a riwaya can be built into
+#   pages    150 DPI progressive JPEG pages (convert_multiple_qiraats.py)
+#   hashed   content-hashed pages and pages.json (hashed_assets.py)
+#   bundle   packed page segments (qiraat_bundle.py)
+#   tiles    deep-zoom pyramids (deep_zoom.py)
+#   vector   SVG/PDF pages (vector_pages.py)
+OUTPUT_TIERS = ('pages', 'hashed', 'bundle', 'tiles', 'vector')
+DEFAULT_TIERS = ('pages', 'hashed', 'bundle')
+
+# Page layout families: riwayat of one family break pages at the same ayahs,
+# so bounds can be derived from another member (remap_bounds.py via build.py).
+#   hafs     the Madinah mushaf pages of Hafs (Tanzil "page")
+#   madani   the Madani mushaf pages of Nafi' (Tanzil "page-madani",
+#            regenerate_all_pages_from_tanzil.py)
+# The committed bounds of every riwaya are still a copy of the Hafs bounds
+# (copy_bounds_to_all_qiraats.py) until it is annotated on its own.
+HAFS_LAYOUT = 'hafs'
+MADANI_LAYOUT = 'madani'
+
+
+class Riwaya(NamedTuple):
+    id: str
+    qari: str
+    rawi: str
+    display_name: str
+    pdf: str  # relative to assets/pdfs
+    counting_system: str  # see ayah_count_data.COUNTING_SYSTEMS
+    layout_family: str = HAFS_LAYOUT
+    bundled: bool = False  # ships inside the app and is never published
+    tiers: tuple = DEFAULT_TIERS
+
+    @property
+    def pdf_path(self):
+        return PDF_DIR / self.pdf
+
+    def images_dir(self, root=IMAGES_DIR):
+        return Path(root) / self.id
+
+    def bounds_dir(self, root=BOUNDS_DIR):
+        return Path(root) / self.id
+
+
+RIWAYAT = (
+    Riwaya('nafi_qalun', "Nafi'", 'Qalun', "Qalun 'an Nafi'", 'Nafi3/Qalun.pdf', 'madani_2',
+           layout_family=MADANI_LAYOUT),
+    Riwaya('nafi_warsh', "Nafi'", 'Warsh', "Warsh 'an Nafi'", 'Nafi3/Warsh.pdf', 'madani_2',
+           layout_family=MADANI_LAYOUT),
+    Riwaya('ibn_kathir_bazzi', 'Ibn Kathir', 'Al-Bazzi', "Al-Bazzi 'an Ibn Kathir",
+           'Ibn_Kathir/Al-Bazzi.pdf', 'makki'),
+    Riwaya('ibn_kathir_qunbul', 'Ibn Kathir', 'Qunbul', "Qunbul 'an Ibn Kathir",
+           'Ibn_Kathir/Qunbul.pdf', 'makki'),
+    Riwaya('abu_amr_duri', "Abu 'Amr", 'Ad-Duri', "Ad-Duri 'an Abu 'Amr", 'Abu_Amr/Ad-Duri.pdf', 'basri'),
+    Riwaya('abu_amr_sussi', "Abu 'Amr", 'As-Sussi', "As-Sussi 'an Abu 'Amr", 'Abu_Amr/As-Sussi.pdf', 'basri'),
+    Riwaya('ibn_amir_hisham', "Ibn 'Amir", 'Hisham', "Hisham 'an Ibn 'Amir", 'Ibn_Amir/Hisham.pdf', 'shami'),
+    Riwaya('ibn_amir_dhakwan', "Ibn 'Amir", 'Ibn Dhakwan', "Ibn Dhakwan 'an Ibn 'Amir",
+           'Ibn_Amir/Ibn_Dhakwan.pdf', 'shami'),
+    Riwaya('asim_shuba', "'Asim", "Shu'ba", "Shu'ba 'an 'Asim", 'Asim/Shu3ba.pdf', 'kufi'),
+    Riwaya('asim_hafs', "'Asim", 'Hafs', "Hafs 'an 'Asim", 'Asim/Hafs.pdf', 'kufi',
+           bundled=True, tiers=('pages',)),
+    Riwaya('hamzah_khalaad', 'Hamzah', 'Khalaad', "Khalaad 'an Hamzah", 'Hamzah/Khalaad.pdf', 'kufi'),
+    Riwaya('hamzah_khalaf', 'Hamzah', 'Khalaf', "Khalaf 'an Hamzah", 'Hamzah/Khalaf.pdf', 'kufi'),
+    Riwaya('kisai_abu_harith', "Al-Kisa'i", 'Abu al-Harith', "Abu al-Harith 'an al-Kisa'i",
+           'Al-Kisai/Abu_Al-Harith.pdf', 'kufi'),
+    Riwaya('kisai_duri', "Al-Kisa'i", 'Ad-Duri', "Ad-Duri 'an al-Kisa'i", 'Al-Kisai/Ad-Duri.pdf', 'kufi'),
+    Riwaya('abu_jafar_ibn_wardan', "Abu Ja'far", 'Ibn Wardan', "Ibn Wardan 'an Abu Ja'far",
+           'Abu_Jafar/Ibn_Wardaan.pdf', 'madani_1'),
+    Riwaya('abu_jafar_ibn_jammaz', "Abu Ja'far", 'Ibn Jammaz', "Ibn Jammaz 'an Abu Ja'far",
+           'Abu_Jafar/Ibn_Jammaaz.pdf', 'madani_1'),
+    Riwaya('yaqub_ruways', "Ya'qub", 'Ruways', "Ruways 'an Ya'qub", 'Ya3qub/Ruwais.pdf', 'basri'),
+    Riwaya('yaqub_rawh', "Ya'qub", 'Rawh', "Rawh 'an Ya'qub", 'Ya3qub/Rawh.pdf', 'basri'),
+    Riwaya('khalaf_ishaq', 'Khalaf', 'Ishaq', "Ishaq 'an Khalaf", 'Khalaf/Ishaq.pdf', 'kufi'),
+    Riwaya('khalaf_idris', 'Khalaf', 'Idris', "Idris 'an Khalaf", 'Khalaf/Idris.pdf', 'kufi'),
+)
+
+_BY_ID = {riwaya.id: riwaya for riwaya in RIWAYAT}
+
+# Ids used by earlier scripts and JSON files -> current id
+LEGACY_IDS = {
+    'asim_shuabah': 'asim_shuba',
+    'ibn_amir_ibn_dhakwan': 'ibn_amir_dhakwan',
+    'hamzah_khallad': 'hamzah_khalaad',
+    'al_kisai_abu_harith': 'kisai_abu_harith',
+    'kisai_harith': 'kisai_abu_harith',
+    'al_kisai_duri': 'kisai_duri',
+    'yaqub_rouh': 'yaqub_rawh',
+    'yaqub_ruwais': 'yaqub_ruways',
+    'abu_jafar_jammaaz': 'abu_jafar_ibn_jammaz',
+    'abu_jafar_wardaan': 'abu_jafar_ibn_wardan',
+}
+
+
+def resolve_id(qiraat_id):
+    """Current id for a current or legacy id (unknown ids are returned unchanged)."""
+    return LEGACY_IDS.get(qiraat_id, qiraat_id)
+
+
+def get_riwaya(qiraat_id):
+    """The Riwaya for a current or legacy id; ValueError for unknown ids."""
+    riwaya = _BY_ID.get(resolve_id(qiraat_id))
+    if riwaya is None:
+        raise ValueError(f'Unknown riwaya: {qiraat_id} (known: {", ".join(_BY_ID)})')
+    return riwaya
+
+
+def all_ids():
+    return [riwaya.id for riwaya in RIWAYAT]
+
+
+def published_ids():
+    """Riwayat downloaded by the app (everything but the bundled ones)."""
+    return [riwaya.id for riwaya in RIWAYAT if not riwaya.bundled]
+
+
+def bundled_ids():
+    return {riwaya.id for riwaya in RIWAYAT if riwaya.bundled}
+
+
+class Target(NamedTuple):
+    """One build stage of one riwaya."""
+    tier: str
+    qiraat_id: str
+
+    @property
+    def name(self):
+        return f'{self.tier}:{self.qiraat_id}'
+
+
+def targets(tier, qiraat_ids=None):
+    """Targets of a stage for the given riwayat (default: every riwaya built into that tier)."""
+    if tier not in OUTPUT_TIERS:
+        raise ValueError(f'Unknown output tier: {tier} (known: {", ".join(OUTPUT_TIERS)})')
+    riwayat = [get_riwaya(q) for q in qiraat_ids] if qiraat_ids else [r for r in RIWAYAT if tier in r.tiers]
+    return [Target(tier, riwaya.id) for riwaya in riwayat]
+
+
+def main():
+    print('=' * 70)
+    print(f'{len(RIWAYAT)} riwayat')
+    print('=' * 70)
+    for riwaya in RIWAYAT:
+        flags = ' (bundled)' if riwaya.bundled else ''
+        pdf = '✓' if riwaya.pdf_path.exists() else '-'
+        print(f'  {riwaya.id:22s} {riwaya.display_name:30s} {riwaya.counting_system:9s} '
+              f'{riwaya.layout_family:7s} {",".join(riwaya.tiers):20s} pdf {pdf}{flags}')
+
+
+if __name__ == '__main__':
+    main()
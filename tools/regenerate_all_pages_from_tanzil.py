@@ -2,44 +2,44 @@
 """
 Regenerate ALL page JSON files from Tanzil data.
 This ensures each page only has the ayahs that Tanzil says are on that page.
+
+Usage:
+    python3 regenerate_all_pages_from_tanzil.py                 # tools/quran-data.xml
+    python3 regenerate_all_pages_from_tanzil.py /path/to/quran-data.xml
+
+The XML must carry the page-madani attribute on every <aya>; Hafs pages
+come from the compiled Tanzil metadata.
 """
 
-import json
-import xml.etree.ElementTree as ET
+import argparse
 from pathlib import Path
+from bounds_model import write_json
+from tanzil_metadata import MUSHAF_PAGE_OFFSET, find_source_xml, get_metadata
+from tanzil_reader import iter_aya_pages
 
-def load_tanzil_data():
-    """Load and parse Tanzil XML data."""
-    tanzil_path = '/tmp/quran-data.xml'
-    tree = ET.parse(tanzil_path)
-    root = tree.getroot()
+def load_madani_pages(xml_path):
+    """Warsh pages from the page-madani attribute of each <aya> in the XML."""
+    pages = {}
+    for aya in iter_aya_pages(xml_path, 'page-madani'):
+        pages.setdefault(aya.index + MUSHAF_PAGE_OFFSET, []).append((aya.sura, aya.aya))
+    return pages
+
+def load_tanzil_data(source=None):
+    """Load page-to-ayah lists: Hafs from the Tanzil metadata, Warsh from the Madani pages."""
+    meta = get_metadata()
     
     # Structure: {qiraat: {page_num: [(surah, ayah), ...]}}
-    pages = {'asim_hafs': {}, 'nafi_warsh': {}}
+    hafs_pages = {page_num: meta.page_ayahs(page_num) for page_num, _, _ in meta.page_starts()}
     
-    for sura in root.findall('sura'):
-        sura_num = int(sura.get('index'))
-        
-        for aya in sura.findall('aya'):
-            aya_num = int(aya.get('index'))
-            
-            # Get page numbers for both qiraats
-            kufi_page = aya.get('page-kufi')  # Hafs
-            madani_page = aya.get('page-madani')  # Warsh
-            
-            if kufi_page:
-                page_num = int(kufi_page) + 1  # Tanzil is 0-indexed
-                if page_num not in pages['asim_hafs']:
-                    pages['asim_hafs'][page_num] = []
-                pages['asim_hafs'][page_num].append((sura_num, aya_num))
-            
-            if madani_page:
-                page_num = int(madani_page) + 1  # Tanzil is 0-indexed
-                if page_num not in pages['nafi_warsh']:
-                    pages['nafi_warsh'][page_num] = []
-                pages['nafi_warsh'][page_num].append((sura_num, aya_num))
+    # The Madani (Warsh) layout is not the Kufi one, so it can't be derived
+    # from the metadata; it needs the page-madani data of the XML.
+    source = source or find_source_xml()
+    warsh_pages = load_madani_pages(source) if source else {}
+    if not warsh_pages:
+        raise SystemExit('❌ No page-madani data found; Warsh pages need a quran-data.xml '
+                         'with page-madani attributes (pass its path, or put it in tools/)')
     
-    return pages
+    return {'asim_hafs': hafs_pages, 'nafi_warsh': warsh_pages}
 
 def create_page_json(page_num, ayahs, qiraat_id):
     """Create a page JSON with proper ayah data."""
@@ -70,8 +70,13 @@ def create_page_json(page_num, ayahs, qiraat_id):
 
 def main():
     """Regenerate all page JSON files."""
+    parser = argparse.ArgumentParser(description='Regenerate the Hafs and Warsh page JSON files from Tanzil data.')
+    parser.add_argument('xml', nargs='?', type=Path,
+                        help='quran-data.xml with page-madani attributes (default: tools/quran-data.xml)')
+    args = parser.parse_args()
+
     print("Loading Tanzil data...")
-    pages_data = load_tanzil_data()
+    pages_data = load_tanzil_data(args.xml)
     
     base_path = Path(__file__).parent.parent / 'assets' / 'json' / 'bounds'
     
@@ -88,8 +93,7 @@ def main():
             page_json = create_page_json(page_num, ayahs, qiraat)
             
             output_file = qiraat_path / f'page_{page_num}.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(page_json, f, ensure_ascii=False, indent=2)
+            write_json(output_file, page_json)
             
             print(f"  Page {page_num}: {len(ayahs)} ayahs", end='')
             # Show surah info
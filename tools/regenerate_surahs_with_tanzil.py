@@ -4,9 +4,10 @@ Regenerate surah JSON files using accurate Tanzil page-to-ayah mappings.
 This replaces the approximate calculations with real data from Tanzil.
 """
 
-import json
-import re
 from pathlib import Path
+from bounds_model import write_json
+from tanzil_metadata import get_metadata
+from ayah_count_data import get_ayah_count
 
 # Import the SURAHS constant
 import sys
@@ -36,34 +37,20 @@ def load_surahs_data():
     return []
 
 def parse_tanzil_pages():
-    """Parse Tanzil XML to get page-to-ayah mappings"""
-    with open('/tmp/quran-data.xml', 'r') as f:
-        content = f.read()
-    
-    pages_raw = re.findall(r'<page index="(\d+)" sura="(\d+)" aya="(\d+)"', content)
-    
+    """Get page-to-ayah mappings from the compiled Tanzil metadata"""
     pages = []
-    for tanzil_page, sura, aya in pages_raw:
-        mushaf_page = int(tanzil_page) + 1
+    for mushaf_page, sura, aya in get_metadata().page_starts():
         pages.append({
             'page': mushaf_page,
-            'surah': int(sura),
-            'start_ayah': int(aya)
+            'surah': sura,
+            'start_ayah': aya
         })
     
     return pages
 
 def get_ayah_count_for_qiraat(surah_num, qiraat_id):
     """Get correct ayah count for qiraat"""
-    # Only Al-Baqarah differs
-    if surah_num == 2:
-        return 285 if qiraat_id == 'nafi_warsh' else 286
-    
-    # For all other surahs, get from SURAHS data
-    for surah in SURAHS:
-        if surah['number'] == surah_num:
-            return surah['numberOfAyahs']
-    return 0
+    return get_ayah_count(surah_num, qiraat_id)
 
 def generate_placeholder_ayah_data(surah_num, ayah_num):
     """Generate placeholder position data for an ayah"""
@@ -183,8 +170,7 @@ def main():
             filename = f"surah_{surah['number']:03d}.json"
             filepath = qiraat_dir / filename
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(surah_json, f, ensure_ascii=False, indent=2)
+            write_json(filepath, surah_json)
             
             pages_count = len(surah_json['pages'])
             print(f"  ✓ {filename} - {surah['nameArabic']} ({pages_count} pages)")
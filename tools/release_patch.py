@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Delta patches between bounds/image releases.
+
+A release is a directory tree with a manifest (release.json) of every file's
+SHA-256 and size:
+  images/<qiraat>/page_001.jpg ...
+  bounds/<qiraat>/page_1.json ...
+
+The differ compares two releases and writes a patch bundle (a ZIP) with:
+  patch.json         from/to release hashes and one operation per changed file:
+                     add / replace (full object), delta (binary delta against
+                     the old file) or delete
+  objects/<key>      new or replaced files
+  deltas/<key>       block deltas
+A changed file is shipped as a delta only when the compressed delta is
+clearly smaller than the compressed file, so near-identical re-renders and
+bounds pages with a few moved rectangles cost kilobytes.
+
+The delta format is rsync-like: blocks of the old file are indexed by a weak
+rolling hash computed for every offset of the new file at once with numpy,
+verified byte for byte, and emitted as COPY(offset, length) / INSERT(bytes)
+operations.
+
+The applier checks every base file's hash before touching anything, rebuilds
+and verifies every new file's hash, then moves the results into place and
+removes deleted files.
+
+Usage:
+    python3 release_patch.py snapshot releases/2025-01          # images + bounds -> release tree
+    python3 release_patch.py diff releases/2025-01 releases/2025-02 -o patch-2025-02.zip
+    python3 release_patch.py apply patch-2025-02.zip /path/to/client/release
+    python3 release_patch.py info patch-2025-02.zip
+
+Requirements:
+pip install numpy
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from bounds_model import atomic_write, write_bytes_atomic
+from file_hashes import format_bytes, hash_files
+
+ROOT_DIR = Path(__file__).parent.parent
+IMAGES_DIR = ROOT_DIR / 'assets' / 'images' / 'qiraats'
+BOUNDS_DIR = ROOT_DIR / 'assets' / 'json' / 'bounds'
+
+MANIFEST_NAME = 'release.json'
+PATCH_NAME = 'patch.json'
+PATCH_VERSION = 1
+
+BLOCK_SIZE = 1024
+# A delta must compress to at most this share of the full file to be used
+DELTA_ADVANTAGE = 0.8
+# Payloads that deflate to more than this share are stored (JPEG, PNG)
+STORE_RATIO = 0.95
+
+COPY, INSERT = 0, 1
+
+
+# -- manifests --------------------------------------------------------------
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def release_files(root):
+    """{key: path} of every file of a release tree (POSIX keys)."""
+    root = Path(root)
+    return {path.relative_to(root).as_posix(): path
+            for path in sorted(root.rglob('*'))
+            if path.is_file() and not path.name.startswith('.') and path.name != MANIFEST_NAME}
+
+
+def build_manifest(root, workers=8):
+    return hash_files(release_files(root), workers)
+
+
+def manifest_digest(files):
+    """Identity of a release: hash of its sorted manifest."""
+    return sha256_bytes(json.dumps(files, sort_keys=True).encode('utf-8'))
+
+
+def write_manifest(root, files):
+    path = Path(root) / MANIFEST_NAME
+    write_bytes_atomic(path, json.dumps({'release': manifest_digest(files), 'files': files},
+                                        indent=2).encode('utf-8'))
+
+
+def read_manifest(root):
+    """The release manifest of a tree, rebuilt when release.json is missing."""
+    path = Path(root) / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))['files']
+    return build_manifest(root)
+
+
+def snapshot(output, images_dir=IMAGES_DIR, bounds_dir=BOUNDS_DIR):
+    """Copy the current images and bounds into a release tree with its manifest."""
+    output = Path(output)
+    for name, source in (('images', images_dir), ('bounds', bounds_dir)):
+        source = Path(source)
+        # Start from an empty tree so files removed since the last snapshot go too
+        if (output / name).exists():
+            shutil.rmtree(output / name)
+        if source.is_dir():
+            shutil.copytree(source, output / name, ignore=shutil.ignore_patterns('.*'))
+    files = build_manifest(output)
+    write_manifest(output, files)
+    return files
+
+
+# -- block delta ------------------------------------------------------------
+
+def _weak_hashes(data, block_size, step=1):
+    """Rolling (a, b) checksum of every block_size window starting at multiples of step."""
+    x = np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+    prefix = np.concatenate(([0], np.cumsum(x)))
+    weighted = np.concatenate(([0], np.cumsum(x * np.arange(len(x), dtype=np.int64))))
+    starts = np.arange(0, len(x) - block_size + 1, step, dtype=np.int64)
+    a = prefix[starts + block_size] - prefix[starts]
+    # b = sum over the window of (block_size - j) * x[start + j]
+    b = (block_size + starts) * a - (weighted[starts + block_size] - weighted[starts])
+    return (b << 24) ^ a
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def make_delta(old, new, block_size=BLOCK_SIZE):
+    """Encode new as COPY/INSERT operations against old."""
+    out = bytearray()
+    literal_start = 0
+
+    def emit_insert(end):
+        if end > literal_start:
+            out.append(INSERT)
+            out.extend(_varint(end - literal_start))
+            out.extend(new[literal_start:end])
+
+    if len(old) >= block_size and len(new) >= block_size:
+        old_keys = _weak_hashes(old, block_size, step=block_size)
+        table = {}
+        for index, key in enumerate(old_keys.tolist()):
+            table.setdefault(key, index * block_size)
+        new_keys = _weak_hashes(new, block_size)
+        candidates = np.flatnonzero(np.isin(new_keys, old_keys))
+
+        pos = 0
+        while True:
+            i = np.searchsorted(candidates, pos)
+            if i == len(candidates):
+                break
+            start = int(candidates[i])
+            offset = table[int(new_keys[start])]
+            if new[start:start + block_size] != old[offset:offset + block_size]:
+                pos = start + 1
+                continue
+            # Extend the match block by block, then byte by byte
+            length = block_size
+            while (start + length + block_size <= len(new) and offset + length + block_size <= len(old)
+                   and new[start + length:start + length + block_size]
+                   == old[offset + length:offset + length + block_size]):
+                length += block_size
+            while (start + length < len(new) and offset + length < len(old)
+                   and new[start + length] == old[offset + length]):
+                length += 1
+
+            emit_insert(start)
+            out.append(COPY)
+            out += _varint(offset)
+            out += _varint(length)
+            pos = literal_start = start + length
+
+    emit_insert(len(new))
+    return bytes(out)
+
+
+def apply_delta(old, delta):
+    out = bytearray()
+    pos = 0
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op == COPY:
+            offset, pos = _read_varint(delta, pos)
+            length, pos = _read_varint(delta, pos)
+            if offset + length > len(old):
+                raise ValueError('delta copies past the end of the base file')
+            out += old[offset:offset + length]
+        elif op == INSERT:
+            length, pos = _read_varint(delta, pos)
+            out += delta[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f'unknown delta operation {op}')
+    return bytes(out)
+
+
+# -- patch bundles ----------------------------------------------------------
+
+def _deflated_size(data):
+    return len(zlib.compress(data, 9))
+
+
+def _write_entry(bundle, name, data):
+    compress = _deflated_size(data) < len(data) * STORE_RATIO
+    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    bundle.writestr(info, data, compresslevel=9 if compress else None)
+
+
+def diff_releases(old_root, new_root, output, block_size=BLOCK_SIZE):
+    """Write a patch bundle turning old_root into new_root. Returns patch.json's dict."""
+    old_root, new_root = Path(old_root), Path(new_root)
+    old_files, new_files = read_manifest(old_root), read_manifest(new_root)
+
+    operations = []
+    with atomic_write(output) as f, zipfile.ZipFile(f, 'w') as bundle:
+        for key in sorted(new_files):
+            entry = new_files[key]
+            base = old_files.get(key)
+            if base == entry:
+                continue
+            data = (new_root / key).read_bytes()
+            operation = {'key': key, 'sha256': entry['sha256'], 'size': entry['size']}
+
+            delta = None
+            if base is not None:
+                delta = make_delta((old_root / key).read_bytes(), data, block_size)
+                if _deflated_size(delta) > min(_deflated_size(data), len(data)) * DELTA_ADVANTAGE:
+                    delta = None
+
+            if delta is not None:
+                operation.update(op='delta', base=base['sha256'], payload=f'deltas/{key}')
+                _write_entry(bundle, operation['payload'], delta)
+            else:
+                operation.update(op='replace' if base else 'add', payload=f'objects/{key}')
+                if base:
+                    operation['base'] = base['sha256']
+                _write_entry(bundle, operation['payload'], data)
+            operations.append(operation)
+
+        for key in sorted(set(old_files) - set(new_files)):
+            operations.append({'key': key, 'op': 'delete', 'base': old_files[key]['sha256']})
+
+        patch = {
+            'version': PATCH_VERSION,
+            'from': manifest_digest(old_files),
+            'to': manifest_digest(new_files),
+            'operations': operations,
+        }
+        _write_entry(bundle, PATCH_NAME, json.dumps(patch, indent=2).encode('utf-8'))
+    return patch
+
+
+def apply_patch(patch_path, target, dry_run=False):
+    """
+    Apply a patch bundle to a release tree. Returns (patch, applied count).
+
+    Every base and result hash is verified before the first file is replaced;
+    any mismatch raises ValueError and leaves the tree untouched. Files that
+    already have their patched content are skipped, so an interrupted apply
+    can simply be rerun.
+    """
+    target = Path(target)
+    staged = []  # (final path, temporary path or None to delete)
+    with zipfile.ZipFile(patch_path) as bundle:
+        patch = json.loads(bundle.read(PATCH_NAME))
+        if patch.get('version') != PATCH_VERSION:
+            raise ValueError(f'unsupported patch version: {patch.get("version")}')
+
+        try:
+            for operation in patch['operations']:
+                key = operation['key']
+                path = target / key
+                try:
+                    path.resolve().relative_to(target.resolve())
+                except ValueError:
+                    raise ValueError(f'{key}: path escapes the release tree') from None
+
+                current = path.read_bytes() if path.exists() else None
+                if operation['op'] == 'delete':
+                    if current is None:
+                        continue
+                    if sha256_bytes(current) != operation['base']:
+                        raise ValueError(f'{key}: file to delete does not match the patch')
+                    staged.append((path, None))
+                    continue
+
+                if current is not None and sha256_bytes(current) == operation['sha256']:
+                    continue
+                if 'base' in operation and current is None:
+                    raise ValueError(f'{key}: base file missing')
+                if current is not None and sha256_bytes(current) != operation.get('base'):
+                    raise ValueError(f'{key}: base file does not match the patch')
+
+                payload = bundle.read(operation['payload'])
+                data = apply_delta(current, payload) if operation['op'] == 'delta' else payload
+                if len(data) != operation['size'] or sha256_bytes(data) != operation['sha256']:
+                    raise ValueError(f'{key}: patched file fails verification')
+
+                tmp_path = None
+                if not dry_run:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = path.with_name(f'.{path.name}.patch')
+                    tmp_path.write_bytes(data)
+                staged.append((path, tmp_path))
+        except BaseException:
+            for _, tmp_path in staged:
+                if tmp_path is not None:
+                    tmp_path.unlink(missing_ok=True)
+            raise
+
+    if dry_run:
+        return patch, len(staged)
+
+    for path, tmp_path in staged:
+        if tmp_path is None:
+            path.unlink()
+        else:
+            os.replace(tmp_path, path)
+
+    manifest_path = target / MANIFEST_NAME
+    if manifest_path.exists():
+        files = json.loads(manifest_path.read_text(encoding='utf-8'))['files']
+        for operation in patch['operations']:
+            if operation['op'] == 'delete':
+                files.pop(operation['key'], None)
+            else:
+                files[operation['key']] = {'sha256': operation['sha256'], 'size': operation['size']}
+        write_manifest(target, dict(sorted(files.items())))
+    return patch, len(staged)
+
+
+def print_summary(patch_path, patch):
+    counts = {}
+    for operation in patch['operations']:
+        counts[operation['op']] = counts.get(operation['op'], 0) + 1
+    with zipfile.ZipFile(patch_path) as bundle:
+        payload = {info.filename: info.compress_size for info in bundle.infolist()}
+    full = sum(o['size'] for o in patch['operations'] if o['op'] != 'delete')
+    print(f'  {patch["from"][:12]} -> {patch["to"][:12]}')
+    print('  ' + ', '.join(f'{count} {op}' for op, count in sorted(counts.items())) or '  no changes')
+    for operation in patch['operations'][:20]:
+        size = payload.get(operation.get('payload'), 0)
+        print(f'    {operation["op"]:8s} {operation["key"]:50s} {format_bytes(size):>10s}')
+    if len(patch['operations']) > 20:
+        print(f'    ... {len(patch["operations"]) - 20} more')
+    print(f'  patch {format_bytes(os.path.getsize(patch_path))}, '
+          f'changed files {format_bytes(full)} in full')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and apply delta patches between releases.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    snap = commands.add_parser('snapshot', help='copy images and bounds into a release tree')
+    snap.add_argument('output')
+    snap.add_argument('--images', default=str(IMAGES_DIR))
+    snap.add_argument('--bounds', default=str(BOUNDS_DIR))
+
+    diff = commands.add_parser('diff', help='write a patch bundle between two release trees')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('-o', '--output', required=True)
+    diff.add_argument('--block-size', type=int, default=BLOCK_SIZE)
+
+    apply = commands.add_parser('apply', help='verify and apply a patch bundle')
+    apply.add_argument('patch')
+    apply.add_argument('target')
+    apply.add_argument('--dry-run', action='store_true', help='verify only')
+
+    info = commands.add_parser('info', help='summarize a patch bundle')
+    info.add_argument('patch')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print('=' * 70)
+    if args.command == 'snapshot':
+        print(f'Release snapshot -> {args.output}')
+        print('=' * 70)
+        files = snapshot(args.output, args.images, args.bounds)
+        print(f'✓ {len(files)} files, release {manifest_digest(files)[:12]}')
+    elif args.command == 'diff':
+        print(f'Release patch {args.old} -> {args.new}')
+        print('=' * 70)
+        patch = diff_releases(args.old, args.new, args.output, args.block_size)
+        print_summary(args.output, patch)
+        print(f'✓ Wrote {args.output} in {time.perf_counter() - start:.2f}s')
+    elif args.command == 'apply':
+        print(f'Applying {args.patch} to {args.target}')
+        print('=' * 70)
+        try:
+            patch, applied = apply_patch(args.patch, args.target, args.dry_run)
+        except ValueError as e:
+            print(f'❌ {e}')
+            sys.exit(1)
+        verb = 'verified' if args.dry_run else 'applied'
+        print(f'✓ {applied} of {len(patch["operations"])} operations {verb} '
+              f'in {time.perf_counter() - start:.2f}s')
+    else:
+        with zipfile.ZipFile(args.patch) as bundle:
+            patch = json.loads(bundle.read(PATCH_NAME))
+        print(f'Release patch {args.patch}')
+        print('=' * 70)
+        print_summary(args.patch, patch)
+
+
+if __name__ == '__main__':
+    main()
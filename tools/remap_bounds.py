@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Derive riwayat bounds from a source riwaya by renumbering ayahs between
+counting systems.
+
+The whole source corpus is loaded into flat numpy arrays (one row per
+rectangle) and renumbered in one pass through the counting_systems index
+arrays:
+  - ayahs the target counts the same way are simply renumbered
+  - ayahs the target merges keep all their rectangles; rectangles that
+    share a line are unioned into one
+  - ayahs the target splits have their rectangles cut by text width, in
+    reading order (right to left), into one piece per target ayah
+  - ayahs the target does not count (Al-Fatiha's basmala outside Kufi/Makki)
+    are dropped
+Rectangles stay on the page they came from. Output is deterministic and
+files whose content did not change are not rewritten.
+
+The renumbering is only as correct as the tables in ayah_count_data.py, so
+riwayat whose counting system is not verified there are skipped unless
+--allow-unverified is given. Skipping a riwaya named on the command line is
+an error (exit 1); with the default targets the skipped riwayat are listed.
+
+Output goes to dist/remapped_bounds/<qiraat> unless --output or --in-place
+is given; --in-place overwrites the committed corpus in assets/json/bounds.
+
+Usage:
+    python3 remap_bounds.py                           # asim_hafs -> all other riwayat
+    python3 remap_bounds.py nafi_warsh nafi_qalun     # selected targets
+    python3 remap_bounds.py nafi_qalun --in-place     # rewrite the committed bounds
+    python3 remap_bounds.py --source asim_hafs --output /tmp/bounds --dry-run
+
+Requirements:
+pip install numpy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ayah_count_data import counting_system_for, is_verified
+from bounds_model import BOUNDS_DIR, discover_qiraats, dumps, page_files, read_json, write_json
+from counting_systems import get_system
+
+COORDINATES = ('x', 'y', 'width', 'height')
+DEFAULT_OUTPUT = Path(__file__).parent.parent / 'dist' / 'remapped_bounds'
+
+
+class Corpus:
+    """Flat rectangle arrays for every page of one riwaya."""
+
+    def __init__(self, qiraat_id, bounds_dir=BOUNDS_DIR):
+        self.qiraat_id = qiraat_id
+        self.pages = []          # page numbers in file order (including empty pages)
+        self.surah_headers = {}  # page -> optional "surahs" metadata
+
+        columns = {name: [] for name in ('page', 'surah', 'ayah', 'line') + COORDINATES}
+        for page_num, path in page_files(Path(bounds_dir) / qiraat_id):
+            page_data = read_json(path)
+            self.pages.append(page_num)
+            if 'surahs' in page_data:
+                self.surah_headers[page_num] = page_data['surahs']
+            for ayah in page_data['ayahs']:
+                for position in ayah['positions']:
+                    columns['page'].append(page_num)
+                    columns['surah'].append(ayah['surahNumber'])
+                    columns['ayah'].append(ayah['ayahNumber'])
+                    columns['line'].append(position.get('lineNumber', 0))
+                    for key in COORDINATES:
+                        columns[key].append(position[key])
+
+        for name in ('page', 'surah', 'ayah', 'line'):
+            setattr(self, name, np.array(columns[name], dtype=np.int32))
+        for name in COORDINATES:
+            setattr(self, name, np.array(columns[name], dtype=np.float64))
+
+    def __len__(self):
+        return len(self.page)
+
+
+def _split_rows(rows, parts, x, width):
+    """
+    Cut the rectangles of one ayah into `parts` pieces of equal text width.
+
+    rows are in reading order; Arabic runs right to left, so each piece is
+    taken from the right edge of the remaining rectangle. Returns
+    [(row, part, x, width)].
+    """
+    total = width[rows].sum()
+    cuts = [total * i / parts for i in range(1, parts)] + [np.inf]
+    pieces = []
+    consumed = 0.0
+    part = 0
+    for row in rows:
+        left, w = x[row], width[row]
+        start = consumed
+        end = consumed + w
+        while True:
+            piece_end = min(end, cuts[part])
+            if piece_end > start:
+                # [start, piece_end] is measured from this rectangle's right edge
+                pieces.append((row, part, left + w - (piece_end - consumed), piece_end - start))
+            if piece_end < end:
+                part += 1
+                start = piece_end
+            else:
+                break
+        consumed = end
+    return pieces
+
+
+def remap(corpus, source_system, target_system):
+    """
+    Renumber a corpus into another counting system.
+
+    Returns a dict of flat arrays (page, surah, ayah, line, x, y, width,
+    height), sorted by page, target ayah and reading order.
+    """
+    source = get_system(source_system)
+    target = get_system(target_system)
+
+    surah_ok = (corpus.surah >= 1) & (corpus.surah <= 114)
+    counts = np.array([0] + [source.counts[s] for s in range(1, 115)], dtype=np.int32)
+    safe_surah = np.where(surah_ok, corpus.surah, 1)
+    valid = surah_ok & (corpus.ayah >= 1) & (corpus.ayah <= counts[safe_surah])
+    if not valid.all():
+        bad = np.flatnonzero(~valid)[0]
+        raise ValueError(f'{corpus.qiraat_id} page {corpus.page[bad]}: '
+                         f'{corpus.surah[bad]}:{corpus.ayah[bad]} is not in the {source.name} count')
+
+    source_index = source.starts[corpus.surah - 1] + corpus.ayah - 1
+    kufi_first = source.to_kufi[source_index, 0]
+    kufi_last = source.to_kufi[source_index, 1]
+    first = target.from_kufi[kufi_first, 0]
+    last = target.from_kufi[kufi_last, 1]
+    # A partly dropped range keeps whichever end the target still counts
+    first = np.where(first < 0, last, first)
+    last = np.where(last < 0, first, last)
+
+    keep = first >= 0
+    simple = keep & (first == last)
+
+    out_row = [np.flatnonzero(simple)]
+    out_index = [first[simple]]
+    out_x = [corpus.x[simple]]
+    out_width = [corpus.width[simple]]
+    out_order = [out_row[0].astype(np.float64)]
+
+    # Splits are rare; cut them ayah by ayah
+    split_rows = np.flatnonzero(keep & (first < last))
+    if len(split_rows):
+        groups = np.split(split_rows, np.flatnonzero(np.diff(source_index[split_rows])) + 1)
+        rows, index, xs, widths, order = [], [], [], [], []
+        for group in groups:
+            parts = int(last[group[0]] - first[group[0]] + 1)
+            for row, part, x, width in _split_rows(group, parts, corpus.x, corpus.width):
+                rows.append(row)
+                index.append(first[row] + part)
+                xs.append(x)
+                widths.append(width)
+                order.append(row + part / parts)
+        out_row.append(np.array(rows, dtype=np.int64))
+        out_index.append(np.array(index, dtype=np.int32))
+        out_x.append(np.array(xs))
+        out_width.append(np.array(widths))
+        out_order.append(np.array(order))
+
+    rows = np.concatenate(out_row)
+    result = {
+        'index': np.concatenate(out_index),
+        'source': source_index[rows],
+        'page': corpus.page[rows],
+        'line': corpus.line[rows],
+        'x': np.concatenate(out_x),
+        'y': corpus.y[rows],
+        'width': np.concatenate(out_width),
+        'height': corpus.height[rows],
+    }
+    order = np.lexsort((np.concatenate(out_order), result['index'], result['page']))
+    result = {name: values[order] for name, values in result.items()}
+    result = _merge_lines(result)
+
+    result['surah'] = target.surahs[result['index']].astype(np.int32)
+    result['ayah'] = target.ayahs[result['index']].astype(np.int32)
+    return result
+
+
+def _merge_lines(rows):
+    """Union rectangles of one target ayah that came from different source ayahs on the same line."""
+    n = len(rows['index'])
+    if not n:
+        return rows
+
+    # Group by (page, target ayah, line), keeping reading order inside each group
+    order = np.lexsort((np.arange(n), rows['line'], rows['index'], rows['page']))
+    page, index, line = rows['page'][order], rows['index'][order], rows['line'][order]
+    starts = np.flatnonzero(np.concatenate((
+        [True], (np.diff(page) != 0) | (np.diff(index) != 0) | (np.diff(line) != 0))))
+    group = np.empty(n, dtype=np.int64)
+    group[order] = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    source = rows['source'][order]
+    mixed = ((np.minimum.reduceat(source, starts) != np.maximum.reduceat(source, starts))
+             & (line[starts] > 0))
+    if not mixed.any():
+        return rows
+
+    x1 = np.minimum.reduceat(rows['x'][order], starts)
+    y1 = np.minimum.reduceat(rows['y'][order], starts)
+    x2 = np.maximum.reduceat((rows['x'] + rows['width'])[order], starts)
+    y2 = np.maximum.reduceat((rows['y'] + rows['height'])[order], starts)
+
+    # The first rectangle of a mixed group becomes the union; the rest are dropped
+    leaders = order[starts]
+    mixed_groups = np.flatnonzero(mixed)
+    keep = ~mixed[group]
+    keep[leaders[mixed_groups]] = True
+
+    merged = {name: values.copy() for name, values in rows.items()}
+    targets = leaders[mixed_groups]
+    merged['x'][targets] = x1[mixed_groups]
+    merged['y'][targets] = y1[mixed_groups]
+    merged['width'][targets] = x2[mixed_groups] - x1[mixed_groups]
+    merged['height'][targets] = y2[mixed_groups] - y1[mixed_groups]
+    return {name: values[keep] for name, values in merged.items()}
+
+
+def build_pages(corpus, rows, qiraat_id):
+    """Turn remapped rows back into {page: page_dict} in bounds JSON layout."""
+    columns = {name: rows[name].tolist() for name in ('page', 'surah', 'ayah', 'line') + COORDINATES}
+    pages = {}
+    for page_num in corpus.pages:
+        page = {'pageNumber': page_num, 'qiraatId': qiraat_id}
+        if page_num in corpus.surah_headers:
+            page['surahs'] = corpus.surah_headers[page_num]
+        page['ayahs'] = []
+        pages[page_num] = page
+
+    current = None
+    for i, page_num in enumerate(columns['page']):
+        key = (page_num, columns['surah'][i], columns['ayah'][i])
+        if key != current:
+            current = key
+            ayah = {'surahNumber': key[1], 'ayahNumber': key[2], 'positions': []}
+            pages[page_num]['ayahs'].append(ayah)
+        ayah['positions'].append({
+            'x': columns['x'][i],
+            'y': columns['y'][i],
+            'width': columns['width'][i],
+            'height': columns['height'][i],
+            'lineNumber': columns['line'][i],
+        })
+    return pages
+
+
+def write_pages(pages, target_dir, dry_run=False):
+    """Write pages whose serialized content changed. Returns the number written."""
+    target_dir = Path(target_dir)
+    if not dry_run:
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    for page_num, page in pages.items():
+        path = target_dir / f'page_{page_num}.json'
+        if path.exists() and path.read_bytes() == dumps(page):
+            continue
+        written += 1
+        if not dry_run:
+            write_json(path, page)
+    return written
+
+
+def remap_riwaya(corpus, source_system, target_qiraat, output_dir=DEFAULT_OUTPUT, dry_run=False):
+    """
+    Remap corpus into target_qiraat's counting system under output_dir/<qiraat>.
+
+    Returns (target system, rectangles, pages written). Pass BOUNDS_DIR as
+    output_dir to rewrite the committed corpus.
+    """
+    target_system = counting_system_for(target_qiraat)
+    rows = remap(corpus, source_system, target_system)
+    pages = build_pages(corpus, rows, target_qiraat)
+    written = write_pages(pages, Path(output_dir) / target_qiraat, dry_run)
+    return target_system, len(rows['page']), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Derive riwayat bounds by renumbering a source riwaya.')
+    parser.add_argument('targets', nargs='*', help='target riwaya ids (default: every other riwaya)')
+    parser.add_argument('--source', default='asim_hafs', help='riwaya to derive from')
+    parser.add_argument('--bounds-dir', default=str(BOUNDS_DIR), help='bounds root to read the source from')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='bounds root to write to')
+    parser.add_argument('--in-place', action='store_true', help='write into --bounds-dir itself')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    parser.add_argument('--allow-unverified', action='store_true',
+                        help='also remap counting systems that do not match the published totals')
+    args = parser.parse_args()
+
+    output_dir = Path(args.bounds_dir if args.in_place else args.output)
+    targets = args.targets or [q for q in discover_qiraats(args.bounds_dir) if q != args.source]
+    skipped = []
+    source_system = counting_system_for(args.source)
+
+    print('=' * 70)
+    print(f'Remapping bounds from {args.source} ({source_system})')
+    print('=' * 70)
+
+    if not args.allow_unverified:
+        if not is_verified(source_system):
+            print(f'❌ {source_system} counts are not verified (python3 ayah_count_data.py); '
+                  f'use --allow-unverified to remap anyway')
+            raise SystemExit(1)
+        skipped = [q for q in targets if not is_verified(counting_system_for(q))]
+        for q in skipped:
+            print(f'  ⚠️  {q:24s} {counting_system_for(q):9s} skipped: counts not verified')
+        targets = [q for q in targets if q not in skipped]
+        if skipped:
+            print()
+        if skipped and args.targets:
+            print(f'❌ {len(skipped)} requested riwayat not remapped: {", ".join(skipped)}')
+            raise SystemExit(1)
+
+    start = time.perf_counter()
+    corpus = Corpus(args.source, args.bounds_dir)
+    print(f'  Loaded {len(corpus)} rectangles on {len(corpus.pages)} pages '
+          f'in {time.perf_counter() - start:.2f}s\n')
+
+    total_written = 0
+    for target_qiraat in targets:
+        target_system, rect_count, written = remap_riwaya(
+            corpus, source_system, target_qiraat, output_dir, args.dry_run)
+        total_written += written
+        print(f'  {target_qiraat:24s} {target_system:9s} {rect_count:6d} rectangles, '
+              f'{written:3d} pages {"would change" if args.dry_run else "written"}')
+
+    elapsed = time.perf_counter() - start
+    verb = 'would be written' if args.dry_run else 'written'
+    print(f'\n✓ {len(targets)} riwayat, {total_written} pages {verb} to {output_dir} in {elapsed:.2f}s')
+    if skipped:
+        print(f'⚠️  {len(skipped)} riwayat skipped: counts not verified')
+
+
+if __name__ == '__main__':
+    main()
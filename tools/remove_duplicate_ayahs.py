@@ -5,8 +5,8 @@ Pattern: If a page has ayahs starting at N (where N > 1), and also has ayahs 1 t
 remove ayahs 1 to N-1 as they are duplicates.
 """
 
-import json
 from pathlib import Path
+from bounds_model import read_json, write_json
 
 def fix_page_duplicates(page_data):
     """Remove duplicate ayahs from a page."""
@@ -85,8 +85,7 @@ def main():
         for page_file in sorted(qiraat_path.glob('page_*.json')):
             page_num = int(page_file.stem.split('_')[1])
             
-            with open(page_file, 'r', encoding='utf-8') as f:
-                page_data = json.load(f)
+            page_data = read_json(page_file)
             
             fixed_data, changed = fix_page_duplicates(page_data)
             
@@ -95,8 +94,7 @@ def main():
                 print(f"  Page {page_num}:")
                 
                 # Write back
-                with open(page_file, 'w', encoding='utf-8') as f:
-                    json.dump(fixed_data, f, ensure_ascii=False, indent=2)
+                write_json(page_file, fixed_data)
         
         print(f"\n✅ Fixed {fixed_count} pages in {qiraat}")
     
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Loader for the compiled Tanzil metadata artifact (tools/data/tanzil_metadata.bin).
+
+compile_tanzil_metadata.py parses Tanzil's quran-data.xml once into packed
+little-endian uint16 tables. This module mmaps the file and exposes the
+tables as zero-copy memoryviews, so importing it costs a few milliseconds and
+no tool has to re-parse the XML.
+
+Until the artifact has been built, get_metadata() falls back to
+tools/quran-data.xml, when it holds the real Tanzil file, and compiles it in
+memory on every run.
+
+Page numbers returned here are Mushaf page numbers as used by the app and the
+bounds corpus: Tanzil page N is Mushaf page N + 1 (page 1 is the cover).
+
+Usage:
+    from tanzil_metadata import get_metadata
+    meta = get_metadata()
+    for page, sura, aya in meta.page_starts():
+        ...
+    meta.page_of(2, 255)  # -> 43
+"""
+
+import array
+import bisect
+import mmap
+import struct
+import sys
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).parent / 'data' / 'tanzil_metadata.bin'
+# Where the tools look for quran-data.xml when the artifact is missing
+SOURCE_XML_PATHS = (Path(__file__).parent / 'quran-data.xml',)
+
+MAGIC = b'TNZL'
+FORMAT_VERSION = 1
+
+# magic, format version, table count, total ayahs
+HEADER = struct.Struct('<4sHHI')
+# table name, typecode, byte offset, row count, columns per row
+TABLE_ENTRY = struct.Struct('<8scxxxIII')
+
+# Our Mushaf has a cover page before Al-Fatiha
+MUSHAF_PAGE_OFFSET = 1
+
+SURA_TYPES = ('Meccan', 'Medinan')
+SAJDA_TYPES = ('recommended', 'obligatory')
+
+
+class TanzilMetadata:
+    """Read-only view over a compiled metadata artifact."""
+
+    def __init__(self, path=DEFAULT_PATH, data=None):
+        """Map the artifact at path, or read it from data (bytes) when given."""
+        path = Path(path)
+        if data is not None:
+            self._mmap = None
+            view = memoryview(data)
+        else:
+            if not path.exists():
+                raise FileNotFoundError(
+                    f'{path} not found. Build it once with:\n'
+                    f'  python3 compile_tanzil_metadata.py /path/to/quran-data.xml\n'
+                    f'or put quran-data.xml in tools/ to compile it on the fly')
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+
+        magic, version, table_count, self.total_ayas = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a Tanzil metadata artifact')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'{path} has format version {version}, expected {FORMAT_VERSION}; '
+                             f're-run compile_tanzil_metadata.py')
+
+        self._tables = {}
+        for i in range(table_count):
+            name, typecode, offset, rows, width = TABLE_ENTRY.unpack_from(
+                view, HEADER.size + i * TABLE_ENTRY.size)
+            name = name.rstrip(b'\0').decode('ascii')
+            typecode = typecode.decode('ascii')
+            if typecode == 's':
+                self._tables[name] = view[offset:offset + rows]
+                continue
+            data = view[offset:offset + rows * width * 2]
+            if sys.byteorder == 'little':
+                data = data.cast('H')
+            else:
+                # Big-endian hosts pay for one copy instead of a zero-copy view
+                swapped = array.array('H', data.tobytes())
+                swapped.byteswap()
+                data = memoryview(swapped)
+            self._tables[name] = (data, width)
+
+        self._sura_starts = self._column('sura', 1)
+        self.sura_count = len(self._sura_starts)
+        self._names = None
+
+    # -- raw table access -------------------------------------------------
+
+    def _column(self, table, column):
+        data, width = self._tables[table]
+        return data[column::width] if width > 1 else data
+
+    def _rows(self, table):
+        data, width = self._tables[table]
+        return [tuple(data[i:i + width]) for i in range(0, len(data), width)]
+
+    def table(self, name):
+        """Return a table as a list of row tuples (for ad-hoc tooling)."""
+        return self._rows(name)
+
+    def per_ayah(self, name):
+        """Raw per-ayah table ('ayapage', 'ayajuz', ...) as a uint16 memoryview.
+
+        Values are Tanzil's own numbers (pages without MUSHAF_PAGE_OFFSET);
+        wrap with numpy.asarray() for a zero-copy array.
+        """
+        data, width = self._tables[name]
+        if width != 1 or len(data) != self.total_ayas:
+            raise ValueError(f'{name} is not a per-ayah table')
+        return data
+
+    # -- suras and ayahs --------------------------------------------------
+
+    def _sura(self, sura, column):
+        data, width = self._tables['sura']
+        return data[(sura - 1) * width + column]
+
+    def sura_ayas(self, sura):
+        """Number of ayahs in a sura (Tanzil / Kufi counting)."""
+        return self._sura(sura, 0)
+
+    def sura_start(self, sura):
+        """Global 0-based index of the first ayah of a sura."""
+        return self._sura(sura, 1)
+
+    def sura_type(self, sura):
+        return SURA_TYPES[self._sura(sura, 2)]
+
+    def sura_order(self, sura):
+        """Revelation order."""
+        return self._sura(sura, 3)
+
+    def sura_names(self, sura):
+        """Return (name, tname, ename) for a sura."""
+        if self._names is None:
+            blob = self._tables['names'].tobytes().decode('utf-8')
+            self._names = [tuple(line.split('\t')) for line in blob.split('\n')]
+        return self._names[sura - 1]
+
+    def global_index(self, sura, aya):
+        """(sura, aya) -> 0-based position in the whole Quran."""
+        return self.sura_start(sura) + aya - 1
+
+    def ayah_at(self, index):
+        """0-based global index -> (sura, aya)."""
+        sura = bisect.bisect_right(self._sura_starts, index)
+        return (sura, index - self._sura_starts[sura - 1] + 1)
+
+    # -- pages ------------------------------------------------------------
+
+    def page_starts(self):
+        """[(mushaf_page, sura, aya)] for the first ayah of every page."""
+        return [(i + 1 + MUSHAF_PAGE_OFFSET, sura, aya)
+                for i, (sura, aya) in enumerate(self._rows('page'))]
+
+    def page_of(self, sura, aya):
+        """Mushaf page that contains (sura, aya). O(1)."""
+        return self._tables['ayapage'][0][self.global_index(sura, aya)] + MUSHAF_PAGE_OFFSET
+
+    def page_bounds(self, mushaf_page):
+        """Global index range [first, last] of the ayahs on a Mushaf page."""
+        rows = self._tables['page'][0]
+        tanzil_page = mushaf_page - MUSHAF_PAGE_OFFSET
+        count = len(rows) // 2
+        if not 1 <= tanzil_page <= count:
+            raise ValueError(f'Mushaf page {mushaf_page} has no Tanzil page')
+        first = self.global_index(rows[(tanzil_page - 1) * 2], rows[(tanzil_page - 1) * 2 + 1])
+        if tanzil_page == count:
+            last = self.total_ayas - 1
+        else:
+            last = self.global_index(rows[tanzil_page * 2], rows[tanzil_page * 2 + 1]) - 1
+        return first, last
+
+    def page_ayahs(self, mushaf_page):
+        """[(sura, aya)] on a Mushaf page, in reading order."""
+        first, last = self.page_bounds(mushaf_page)
+        sura, aya = self.ayah_at(first)
+        result = []
+        for _ in range(first, last + 1):
+            if aya > self.sura_ayas(sura):
+                sura, aya = sura + 1, 1
+            result.append((sura, aya))
+            aya += 1
+        return result
+
+    @property
+    def page_count(self):
+        return len(self._tables['page'][0]) // 2
+
+    # -- divisions --------------------------------------------------------
+
+    def juz_of(self, sura, aya):
+        return self._tables['ayajuz'][0][self.global_index(sura, aya)]
+
+    def quarter_of(self, sura, aya):
+        """Hizb quarter (rub') number, 1-240."""
+        return self._tables['ayaqrtr'][0][self.global_index(sura, aya)]
+
+    def hizb_of(self, sura, aya):
+        return (self.quarter_of(sura, aya) - 1) // 4 + 1
+
+    def manzil_of(self, sura, aya):
+        return self._tables['ayamnzl'][0][self.global_index(sura, aya)]
+
+    def ruku_of(self, sura, aya):
+        return self._tables['ayaruku'][0][self.global_index(sura, aya)]
+
+    def juz_starts(self):
+        return self._rows('juz')
+
+    def quarter_starts(self):
+        return self._rows('quarter')
+
+    def manzil_starts(self):
+        return self._rows('manzil')
+
+    def ruku_starts(self):
+        return self._rows('ruku')
+
+    def sajdas(self):
+        """[(sura, aya, type)] of the sajda ayahs."""
+        return [(sura, aya, SAJDA_TYPES[kind]) for sura, aya, kind in self._rows('sajda')]
+
+
+def find_source_xml():
+    """The first of SOURCE_XML_PATHS that holds Tanzil XML, or None.
+
+    tools/quran-data.xml is checked in as a "404: Not Found" placeholder, so
+    existing is not enough.
+    """
+    for path in SOURCE_XML_PATHS:
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(64).lstrip()
+        except OSError:
+            continue
+        if head.startswith(b'<'):
+            return path
+    return None
+
+
+_cached = {}
+
+
+def get_metadata(path=DEFAULT_PATH):
+    """Return a shared TanzilMetadata for the artifact at path.
+
+    Without the default artifact, the XML source is compiled in memory.
+    """
+    key = str(path)
+    if key not in _cached:
+        source = find_source_xml()
+        if Path(path) == DEFAULT_PATH and not DEFAULT_PATH.exists() and source:
+            from compile_tanzil_metadata import compile_xml
+            _cached[key] = TanzilMetadata(path, data=compile_xml(source))
+        else:
+            _cached[key] = TanzilMetadata(path)
+    return _cached[key]
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for Tanzil XML files.
+
+Reads quran-data.xml (metadata) and the quran-text variants
+(quran-simple.xml, quran-uthmani.xml, ...) with iterparse, turning each
+element into a typed record as soon as it is closed and clearing it
+straight away. Memory stays flat no matter how large the file is, so the
+full text datasets can be fed through the bounds build pipeline.
+
+Records are yielded in document order:
+  Sura      a <sura> of quran-data.xml
+  Division  a <juz>, <quarter>, <manzil>, <ruku> or <page> start
+  Sajda     a <sajda>
+  Aya       an <aya> of a quran-text file
+
+Division and Sajda indexes are Tanzil's own; add
+tanzil_metadata.MUSHAF_PAGE_OFFSET to a Tanzil page to get our Mushaf page.
+
+iter_aya_pages reads the per-ayah page attributes (page-madani,
+page-kufi) that some Tanzil exports put on every <aya> instead of a
+<pages> list, yielding one 'page' Division per ayah.
+
+Usage:
+    from tanzil_reader import iter_pages, iter_ayas
+    for page in iter_pages('quran-data.xml'):
+        print(page.index, page.sura, page.aya)
+    for aya in iter_ayas('quran-uthmani.xml'):
+        print(aya.sura, aya.index, aya.text)
+    for aya in iter_aya_pages('quran-data.xml', 'page-madani'):
+        print(aya.index, aya.sura, aya.aya)
+
+    python3 tanzil_reader.py quran-data.xml   # record counts
+"""
+
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import NamedTuple, Optional
+
+
+class Sura(NamedTuple):
+    index: int
+    ayas: int
+    start: int
+    name: str
+    tname: str
+    ename: str
+    type: str
+    order: int
+    rukus: int
+
+
+class Division(NamedTuple):
+    kind: str
+    index: int
+    sura: int
+    aya: int
+
+
+class Sajda(NamedTuple):
+    index: int
+    sura: int
+    aya: int
+    type: str
+
+
+class Aya(NamedTuple):
+    sura: int
+    index: int
+    text: str
+    bismillah: Optional[str] = None
+
+
+DIVISION_KINDS = ('juz', 'quarter', 'manzil', 'ruku', 'page')
+
+
+def _sura(attrib):
+    return Sura(int(attrib['index']), int(attrib['ayas']), int(attrib['start']),
+                attrib.get('name', ''), attrib.get('tname', ''), attrib.get('ename', ''),
+                attrib.get('type', ''), int(attrib.get('order', 0)), int(attrib.get('rukus', 0)))
+
+
+def _closed_elements(source):
+    """
+    Yield (element, sura) for every element as soon as it is closed, then clear it.
+
+    sura is the index of the <sura> the element sits in (ayas of a quran-text
+    file), None outside one.
+    """
+    open_elems = []
+    sura = None
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elems.append(elem)
+            if elem.tag == 'sura':
+                sura = int(elem.get('index'))
+            continue
+
+        yield elem, sura
+        if elem.tag == 'sura':
+            sura = None
+
+        # A closed element is always its parent's last child: detach it so
+        # nothing keeps finished records alive
+        open_elems.pop()
+        elem.clear()
+        if open_elems:
+            del open_elems[-1][-1]
+
+
+def iter_tanzil(source, kinds=None):
+    """
+    Yield typed records from a Tanzil XML file path or binary file object.
+
+    kinds limits the output to the given element tags, e.g. {'page'} or
+    {'sura', 'aya'}; other elements are still cleared but never converted.
+    """
+    kinds = set(kinds) if kinds else None
+
+    for elem, sura in _closed_elements(source):
+        tag = elem.tag
+        wanted = kinds is None or tag in kinds
+        if tag == 'aya':
+            if wanted:
+                yield Aya(sura, int(elem.get('index')), elem.get('text', ''), elem.get('bismillah'))
+        elif tag == 'sura':
+            # quran-data.xml lists suras with an ayas count; quran-text suras
+            # only hold their ayas
+            if 'ayas' in elem.attrib and wanted:
+                yield _sura(elem.attrib)
+        elif tag in DIVISION_KINDS:
+            if wanted:
+                yield Division(tag, int(elem.get('index')), int(elem.get('sura')), int(elem.get('aya')))
+        elif tag == 'sajda':
+            if wanted:
+                yield Sajda(int(elem.get('index')), int(elem.get('sura')), int(elem.get('aya')),
+                            elem.get('type', ''))
+
+
+def iter_suras(source):
+    return iter_tanzil(source, {'sura'})
+
+
+def iter_pages(source):
+    """Yield the Division record of every Tanzil page start, in page order."""
+    return iter_tanzil(source, {'page'})
+
+
+def iter_divisions(source, kind):
+    if kind not in DIVISION_KINDS:
+        raise ValueError(f'Unknown division: {kind} (expected one of {", ".join(DIVISION_KINDS)})')
+    return iter_tanzil(source, {kind})
+
+
+def iter_aya_pages(source, attribute='page-madani'):
+    """Yield a 'page' Division (Tanzil page, sura, aya) for every <aya> carrying the page attribute."""
+    for elem, sura in _closed_elements(source):
+        if elem.tag == 'aya':
+            page = elem.get(attribute)
+            if page is not None:
+                yield Division('page', int(page), sura, int(elem.get('index')))
+
+
+def iter_sajdas(source):
+    return iter_tanzil(source, {'sajda'})
+
+
+def iter_ayas(source):
+    """Yield every Aya of a quran-text file (sura, index, text, bismillah)."""
+    return iter_tanzil(source, {'aya'})
+
+
+def main():
+    if len(sys.argv) != 2:
+        print('Usage: python3 tanzil_reader.py <tanzil.xml>')
+        sys.exit(1)
+
+    counts = {}
+    start = time.perf_counter()
+    for record in iter_tanzil(sys.argv[1]):
+        name = record.kind if isinstance(record, Division) else type(record).__name__.lower()
+        counts[name] = counts.get(name, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    for name, count in counts.items():
+        print(f'  {name:8s} {count:6d}')
+    print(f'\n✓ Read {sum(counts.values())} records in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
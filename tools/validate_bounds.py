@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Validate the complete ayah bounds corpus (assets/json/bounds/<qiraat>/page_*.json).
+
+Every page of every riwaya is streamed through a process pool (one riwaya per
+worker) and checked for:
+  - schema: required keys and value types for pages, ayahs and positions
+  - identity: qiraatId matches the folder, pageNumber matches the file name
+  - geometry: every rectangle lies inside the normalized [0, 1] page
+  - coverage: ayahs run in strictly increasing (surah, ayah) order across the
+    pages of a riwaya, with no duplicates and no gaps, against the counts in
+    ayah_count_data.py. Riwayat whose counting system is not verified there
+    are only checked for order and duplicates: their counts are incomplete.
+
+Usage:
+    python3 validate_bounds.py                      # whole corpus
+    python3 validate_bounds.py nafi_warsh asim_hafs # selected riwayat
+    python3 validate_bounds.py --report report.json --workers 8
+
+Exits with status 1 when any error is found.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ayah_count_data import counts_verified, get_ayah_count
+from bounds_model import BOUNDS_DIR, discover_qiraats, page_files, read_json, write_json
+
+# Tolerance for rectangles that touch the page edge after float rounding
+GEOMETRY_EPSILON = 1e-6
+
+PAGE_KEYS = {'pageNumber': int, 'qiraatId': str, 'ayahs': list}
+AYAH_KEYS = {'surahNumber': int, 'ayahNumber': int, 'positions': list}
+POSITION_KEYS = ('x', 'y', 'width', 'height')
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _issue(issues, qiraat_id, page_num, code, message, surah=None, ayah=None):
+    issues.append({
+        'qiraat': qiraat_id,
+        'page': page_num,
+        'code': code,
+        'surah': surah,
+        'ayah': ayah,
+        'message': message,
+    })
+
+
+def check_position(position, issues, qiraat_id, page_num, surah, ayah):
+    """Check one rectangle for schema and [0, 1] bounds."""
+    if not isinstance(position, dict):
+        _issue(issues, qiraat_id, page_num, 'schema', 'position is not an object', surah, ayah)
+        return
+
+    for key in POSITION_KEYS:
+        if not _is_number(position.get(key)):
+            _issue(issues, qiraat_id, page_num, 'schema',
+                   f'position "{key}" missing or not a number', surah, ayah)
+            return
+
+    line_number = position.get('lineNumber')
+    if not _is_int(line_number) or line_number < 0:
+        _issue(issues, qiraat_id, page_num, 'schema',
+               'position "lineNumber" missing or not a non-negative integer', surah, ayah)
+
+    x, y = position['x'], position['y']
+    width, height = position['width'], position['height']
+    if width <= 0 or height <= 0:
+        _issue(issues, qiraat_id, page_num, 'geometry',
+               f'empty rectangle (width={width}, height={height})', surah, ayah)
+    if (x < -GEOMETRY_EPSILON or y < -GEOMETRY_EPSILON
+            or x + width > 1 + GEOMETRY_EPSILON or y + height > 1 + GEOMETRY_EPSILON):
+        _issue(issues, qiraat_id, page_num, 'geometry',
+               f'rectangle outside [0,1] (x={x:.4f}, y={y:.4f}, '
+               f'x2={x + width:.4f}, y2={y + height:.4f})', surah, ayah)
+
+
+def check_page(page_data, qiraat_id, page_num, issues):
+    """
+    Check a single page for schema, identity and geometry errors.
+
+    Returns the list of (surah, ayah) keys on the page in file order, or None
+    if the page is too malformed to take part in the coverage check.
+    """
+    if not isinstance(page_data, dict):
+        _issue(issues, qiraat_id, page_num, 'schema', 'page is not an object')
+        return None
+
+    for key, expected_type in PAGE_KEYS.items():
+        if not isinstance(page_data.get(key), expected_type):
+            _issue(issues, qiraat_id, page_num, 'schema',
+                   f'page "{key}" missing or not {expected_type.__name__}')
+            return None
+
+    if page_data['qiraatId'] != qiraat_id:
+        _issue(issues, qiraat_id, page_num, 'qiraat_id',
+               f'qiraatId is "{page_data["qiraatId"]}", expected "{qiraat_id}"')
+    if page_data['pageNumber'] != page_num:
+        _issue(issues, qiraat_id, page_num, 'page_number',
+               f'pageNumber is {page_data["pageNumber"]}, file name says {page_num}')
+
+    keys = []
+    for ayah in page_data['ayahs']:
+        if not isinstance(ayah, dict) or not all(
+                isinstance(ayah.get(k), t) for k, t in AYAH_KEYS.items()):
+            _issue(issues, qiraat_id, page_num, 'schema',
+                   'ayah missing surahNumber/ayahNumber/positions')
+            continue
+
+        surah, ayah_num = ayah['surahNumber'], ayah['ayahNumber']
+        if not ayah['positions']:
+            _issue(issues, qiraat_id, page_num, 'schema', 'ayah has no positions', surah, ayah_num)
+        for position in ayah['positions']:
+            check_position(position, issues, qiraat_id, page_num, surah, ayah_num)
+
+        keys.append((surah, ayah_num))
+
+    return keys
+
+
+def validate_qiraat(qiraat_id, bounds_dir=BOUNDS_DIR, overrides=None):
+    """
+    Validate every page of one riwaya. Runs inside a worker process.
+
+    Pages are read one at a time in page order, so memory stays bounded by
+    the largest single page. overrides ({page number: page dict}) are checked
+    in place of (or in addition to) the files on disk.
+    """
+    issues = []
+    verified = counts_verified(qiraat_id)
+    qiraat_dir = Path(bounds_dir) / qiraat_id
+    files = page_files(qiraat_dir)
+    overrides = overrides or {}
+    if overrides:
+        files = sorted({**dict(files), **dict.fromkeys(overrides)}.items())
+    ayah_total = 0
+
+    # Coverage state: where each ayah was first seen and the last key seen
+    seen = {}
+    last_key = (0, 0)
+
+    for page_num, page_file in files:
+        try:
+            page_data = overrides[page_num] if page_num in overrides else read_json(page_file)
+        except (OSError, ValueError) as e:
+            _issue(issues, qiraat_id, page_num, 'schema', f'unreadable JSON: {e}')
+            continue
+
+        keys = check_page(page_data, qiraat_id, page_num, issues)
+        if keys is None:
+            continue
+        ayah_total += len(keys)
+
+        for key in keys:
+            surah, ayah_num = key
+            last_ayah = get_ayah_count(surah, qiraat_id) if verified else float('inf')
+            if not 1 <= surah <= 114 or not 1 <= ayah_num <= last_ayah:
+                _issue(issues, qiraat_id, page_num, 'unknown_ayah',
+                       f'{surah}:{ayah_num} does not exist in this counting system', surah, ayah_num)
+                continue
+
+            if key in seen:
+                _issue(issues, qiraat_id, page_num, 'duplicate',
+                       f'{surah}:{ayah_num} already on page {seen[key]}', surah, ayah_num)
+                continue
+            seen[key] = page_num
+
+            if key < last_key:
+                _issue(issues, qiraat_id, page_num, 'out_of_order',
+                       f'{surah}:{ayah_num} follows {last_key[0]}:{last_key[1]}', surah, ayah_num)
+            else:
+                last_key = key
+
+    # Gaps: report each missing run once instead of once per ayah
+    for surah in range(1, 115 if verified else 1):
+        run_start = None
+        count = get_ayah_count(surah, qiraat_id)
+        for ayah_num in range(1, count + 2):
+            missing = ayah_num <= count and (surah, ayah_num) not in seen
+            if missing and run_start is None:
+                run_start = ayah_num
+            elif not missing and run_start is not None:
+                last_missing = ayah_num - 1
+                span = f'{run_start}' if run_start == last_missing else f'{run_start}-{last_missing}'
+                _issue(issues, qiraat_id, None, 'gap',
+                       f'surah {surah} ayah(s) {span} not on any page', surah, run_start)
+                run_start = None
+
+    return {
+        'qiraat': qiraat_id,
+        'pages': len(files),
+        'ayahs': ayah_total,
+        'countsVerified': verified,
+        'issues': issues,
+    }
+
+
+def validate_corpus(qiraat_ids=None, bounds_dir=BOUNDS_DIR, workers=None):
+    """Validate several riwayat in parallel and build the report dict."""
+    qiraat_ids = qiraat_ids or discover_qiraats(bounds_dir)
+    workers = workers or min(len(qiraat_ids), os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(validate_qiraat, qiraat_ids, [bounds_dir] * len(qiraat_ids)))
+    else:
+        results = [validate_qiraat(q, bounds_dir) for q in qiraat_ids]
+    elapsed = time.perf_counter() - start
+
+    issues = [issue for result in results for issue in result['issues']]
+    by_code = {}
+    for issue in issues:
+        by_code[issue['code']] = by_code.get(issue['code'], 0) + 1
+
+    return {
+        'summary': {
+            'riwayat': len(results),
+            'pages': sum(r['pages'] for r in results),
+            'ayahs': sum(r['ayahs'] for r in results),
+            'errors': len(issues),
+            'errorsByCode': by_code,
+            'seconds': round(elapsed, 3),
+            'workers': workers,
+        },
+        'riwayat': {
+            r['qiraat']: {'pages': r['pages'], 'ayahs': r['ayahs'], 'errors': len(r['issues']),
+                          'countsVerified': r['countsVerified']}
+            for r in results
+        },
+        'issues': issues,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the ayah bounds corpus.')
+    parser.add_argument('qiraats', nargs='*', help='riwaya ids to check (default: all)')
+    parser.add_argument('--bounds-dir', default=str(BOUNDS_DIR), help='bounds root directory')
+    parser.add_argument('--report', help='write the machine-readable JSON report here')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per riwaya, up to CPU count)')
+    parser.add_argument('--max-print', type=int, default=20, help='issues to print per riwaya')
+    args = parser.parse_args()
+
+    report = validate_corpus(args.qiraats, Path(args.bounds_dir), args.workers)
+    summary = report['summary']
+
+    print('=' * 70)
+    print('Ayah Bounds Validation')
+    print('=' * 70)
+    for qiraat_id, stats in report['riwayat'].items():
+        status = '✓' if stats['errors'] == 0 else '✗'
+        unverified = '' if stats['countsVerified'] else '  (counts unverified: no gap/count checks)'
+        print(f"{status} {qiraat_id:24s} {stats['pages']:4d} pages, "
+              f"{stats['ayahs']:5d} ayahs, {stats['errors']} errors{unverified}")
+        shown = [i for i in report['issues'] if i['qiraat'] == qiraat_id][:args.max_print]
+        for issue in shown:
+            where = f"page {issue['page']}" if issue['page'] is not None else 'corpus'
+            print(f"    [{issue['code']}] {where}: {issue['message']}")
+
+    print('\n' + '=' * 70)
+    print(f"{summary['pages']} pages, {summary['ayahs']} ayahs in {summary['riwayat']} riwayat "
+          f"checked in {summary['seconds']}s ({summary['workers']} workers)")
+    print(f"Errors: {summary['errors']} {summary['errorsByCode'] or ''}")
+    print('=' * 70)
+
+    if args.report:
+        write_json(args.report, report)
+        print(f'\n✓ Report written to {args.report}')
+
+    sys.exit(1 if summary['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Vector page extraction (SVG or single-page PDF) as an alternative to JPEG.
+
+Most source PDFs are vector: rasterizing them at a fixed DPI makes pages soft
+when zoomed and is not always smaller. This tool extracts every page as
+  svg   a standalone SVG with text as glyph outlines, which <img> and
+        flutter_svg render as is.
+        --sprite instead deduplicates glyph outlines across the whole riwaya
+        into one shared sprite (glyphs.svg) that pages reference with
+        <use href="glyphs.svg#g...">, so a glyph's outline is shipped once
+        per riwaya. Such external references are not resolved by <img> or
+        flutter_svg; the pages only render where the SVG is inlined into a
+        document that resolves them, so it is opt-in.
+  pdf   a minimized single-page PDF: unused objects dropped, streams
+        deflated and fonts subset to the glyphs on the page.
+
+Only --sprite deduplicates glyphs across pages. Standalone SVG pages and
+PDF pages each carry their own outlines or font subset, so a glyph is
+shipped again on every page that uses it; the report records which case
+it measured ("crossPageGlyphDedup").
+
+and writes a report of each page's vector size (raw and gzip, as served)
+against JPEG renders of the same page at the raster tiers (default 150 and
+300 DPI), so pages can be served as vector where vector wins. Pages whose
+PDF page is mostly a scanned image are marked "scanned": they do not get
+crisper as vector.
+
+Output (dist/vector/<qiraat>/):
+  page_1.svg ... | page_1.pdf ...
+  glyphs.svg                        shared glyph sprite (--sprite)
+  vector.json                       {"version", "qiraatId", "format", "glyphs",
+                                     "pages": {"1": {"name", "size", "gzipSize", "source"}}}
+  report.json                       per-page vector vs raster bytes
+
+Usage:
+    python3 vector_pages.py nafi_warsh ../assets/pdfs/Nafi3/Warsh.pdf
+    python3 vector_pages.py nafi_warsh --format pdf --pages 1-50     # the registry's PDF
+    python3 vector_pages.py nafi_warsh ../assets/pdfs/Nafi3/Warsh.pdf --raster-dpi 150 300 600
+    python3 vector_pages.py nafi_warsh --sprite                      # shared glyph sprite
+
+Requirements:
+pip install PyMuPDF Pillow fonttools     (fonttools for PDF font subsetting)
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import statistics
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from bounds_model import write_bytes_atomic, write_json
+from qiraat_registry import get_riwaya, resolve_id
+
+ROOT_DIR = Path(__file__).parent.parent
+VECTOR_DIR = ROOT_DIR / 'dist' / 'vector'
+sys.path.insert(0, str(ROOT_DIR))
+
+# JPEG tiers are encoded like the converter's pages
+from convert_multiple_qiraats import IMAGE_QUALITY as RASTER_QUALITY  # noqa: E402
+
+MANIFEST_NAME = 'vector.json'
+REPORT_NAME = 'report.json'
+GLYPHS_NAME = 'glyphs.svg'
+MANIFEST_VERSION = 1
+
+RASTER_DPI = (150, 300)
+# A page whose images cover more than this share of it is a scan
+SCANNED_COVERAGE = 0.5
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+HREF_ATTRIBUTES = (f'{{{XLINK_NS}}}href', 'href')
+
+
+def gzip_size(data):
+    return len(gzip.compress(data, 9, mtime=0))
+
+
+def page_source(page):
+    """'scanned' when images cover most of the page, otherwise 'vector'."""
+    page_area = abs(page.rect) or 1
+    image_area = sum(abs(fitz.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+    return 'scanned' if image_area / page_area > SCANNED_COVERAGE else 'vector'
+
+
+def page_pdf(doc, index):
+    """A minimized single-page PDF of doc's page index."""
+    single = fitz.open()
+    single.insert_pdf(doc, from_page=index, to_page=index)
+    try:
+        single.subset_fonts()
+    except Exception:
+        # Subsetting needs fontTools; the page is still valid with whole fonts
+        pass
+    data = single.tobytes(garbage=4, deflate=True, clean=True,
+                          deflate_images=True, deflate_fonts=True)
+    single.close()
+    return data
+
+
+class GlyphSprite:
+    """Glyph outlines shared by the SVG pages of one riwaya."""
+
+    def __init__(self, href=GLYPHS_NAME):
+        self.href = href
+        self.glyphs = {}  # id -> serialized element
+
+    @staticmethod
+    def _serialize(element):
+        return ET.tostring(element, encoding='unicode').replace(f' xmlns="{SVG_NS}"', '')
+
+    def share(self, svg):
+        """Move a page's glyph definitions into the sprite and point its <use> elements there."""
+        root = ET.fromstring(svg)
+        renamed = {}
+        for defs in list(root.iter(f'{{{SVG_NS}}}defs')):
+            for element in list(defs):
+                element_id = element.get('id', '')
+                # MuPDF names glyph outlines font_<font>_<glyph>, numbered per page
+                if not element_id.startswith('font_'):
+                    continue
+                del element.attrib['id']
+                element.tail = None
+                name = 'g' + hashlib.sha1(self._serialize(element).encode('utf-8')).hexdigest()[:12]
+                element.set('id', name)
+                self.glyphs.setdefault(name, self._serialize(element))
+                renamed[element_id] = name
+                defs.remove(element)
+        for use in root.iter(f'{{{SVG_NS}}}use'):
+            for attribute in HREF_ATTRIBUTES:
+                target = use.get(attribute, '')
+                if target.startswith('#') and target[1:] in renamed:
+                    use.set(attribute, f'{self.href}#{renamed[target[1:]]}')
+        for parent in list(root.iter()):
+            for child in list(parent):
+                if child.tag == f'{{{SVG_NS}}}defs' and len(child) == 0:
+                    parent.remove(child)
+        return ET.tostring(root, encoding='unicode')
+
+    def document(self):
+        return (f'<svg xmlns="{SVG_NS}" xmlns:xlink="{XLINK_NS}"><defs>'
+                + ''.join(self.glyphs[name] for name in sorted(self.glyphs))
+                + '</defs></svg>\n')
+
+
+def page_svg(page, sprite=None):
+    svg = page.get_svg_image(text_as_path=True)
+    if sprite is not None:
+        svg = sprite.share(svg)
+    return svg.encode('utf-8')
+
+
+def raster_size(page, dpi, quality=RASTER_QUALITY):
+    """Bytes of the page as a progressive JPEG at dpi."""
+    pixmap = page.get_pixmap(dpi=dpi, alpha=False)
+    mode = 'L' if pixmap.n == 1 else 'RGB'
+    image = Image.frombytes(mode, (pixmap.width, pixmap.height), pixmap.samples)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return len(buffer.getvalue())
+
+
+def extract(qiraat_id, pdf_path, output_dir=VECTOR_DIR, fmt='svg', pages=None, shared_glyphs=False,
+            raster_dpi=RASTER_DPI, progress=print):
+    """Extract vector pages and measure them against raster tiers. Returns (manifest, report)."""
+    target = Path(output_dir) / qiraat_id
+    target.mkdir(parents=True, exist_ok=True)
+    sprite = GlyphSprite() if fmt == 'svg' and shared_glyphs else None
+
+    doc = fitz.open(pdf_path)
+    first, last = pages or (1, doc.page_count)
+    manifest_pages = {}
+    rows = []
+    for number in range(first, min(last, doc.page_count) + 1):
+        page = doc[number - 1]
+        data = page_pdf(doc, number - 1) if fmt == 'pdf' else page_svg(page, sprite)
+        name = f'page_{number}.{fmt}'
+        write_bytes_atomic(target / name, data)
+
+        entry = {'name': name, 'size': len(data), 'gzipSize': gzip_size(data), 'source': page_source(page)}
+        manifest_pages[str(number)] = entry
+        rows.append({'page': number, **entry,
+                     'raster': {str(dpi): raster_size(page, dpi) for dpi in raster_dpi}})
+        if number % 50 == 0:
+            progress(f'  {qiraat_id}: page {number}/{last}')
+    doc.close()
+
+    glyphs = None
+    if sprite is None:
+        # Standalone pages: do not leave a sprite of an earlier --sprite run behind
+        (target / GLYPHS_NAME).unlink(missing_ok=True)
+    else:
+        glyph_data = sprite.document().encode('utf-8')
+        write_bytes_atomic(target / GLYPHS_NAME, glyph_data)
+        glyphs = {'name': GLYPHS_NAME, 'size': len(glyph_data), 'gzipSize': gzip_size(glyph_data),
+                  'count': len(sprite.glyphs)}
+
+    manifest = {'version': MANIFEST_VERSION, 'qiraatId': qiraat_id, 'format': fmt,
+                'glyphs': glyphs['name'] if glyphs else None, 'pages': manifest_pages}
+    write_json(target / MANIFEST_NAME, manifest)
+
+    report = summarize(rows, glyphs, raster_dpi)
+    report.update(qiraatId=qiraat_id, format=fmt, perPage=rows)
+    write_json(target / REPORT_NAME, report)
+    return manifest, report
+
+
+def summarize(rows, glyphs, raster_dpi):
+    """
+    Totals and the number of pages where vector (gzip) wins.
+
+    With a sprite, a page costs its own bytes plus an equal share of the
+    sprite when the whole riwaya is read, but a reader who opens a single
+    page fetches the whole sprite with it; both are reported.
+    """
+    if not rows:
+        return {'pages': 0}
+    sprite_gzip = glyphs['gzipSize'] if glyphs else 0
+    vector = [row['gzipSize'] + sprite_gzip / len(rows) for row in rows]
+    single = [row['gzipSize'] + sprite_gzip for row in rows]
+    summary = {
+        'pages': len(rows),
+        'scannedPages': sum(row['source'] == 'scanned' for row in rows),
+        'vectorBytes': sum(row['size'] for row in rows) + (glyphs['size'] if glyphs else 0),
+        'vectorGzipBytes': round(sum(vector)),
+        'vectorGzipMedian': round(statistics.median(vector)),
+        'singlePageGzipMedian': round(statistics.median(single)),
+        'glyphs': glyphs,
+        'crossPageGlyphDedup': glyphs is not None,
+        'raster': {},
+    }
+    for dpi in raster_dpi:
+        sizes = [row['raster'][str(dpi)] for row in rows]
+        summary['raster'][str(dpi)] = {
+            'bytes': sum(sizes),
+            'median': round(statistics.median(sizes)),
+            'vectorWins': sum(v < r for v, r, row in zip(vector, sizes, rows) if row['source'] == 'vector'),
+            'singlePageVectorWins': sum(v < r for v, r, row in zip(single, sizes, rows)
+                                        if row['source'] == 'vector'),
+        }
+    return summary
+
+
+def _parse_pages(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract vector pages and compare them with raster tiers.')
+    parser.add_argument('qiraat')
+    parser.add_argument('pdf', nargs='?', help="source PDF (default: the riwaya's PDF in qiraat_registry)")
+    parser.add_argument('--format', choices=('svg', 'pdf'), default='svg')
+    parser.add_argument('--pages', type=_parse_pages, help='page range, e.g. 1-50')
+    parser.add_argument('--sprite', action='store_true',
+                        help='share glyph outlines through glyphs.svg (not rendered by <img> or flutter_svg)')
+    parser.add_argument('--raster-dpi', type=int, nargs='+', default=list(RASTER_DPI))
+    parser.add_argument('--output', default=str(VECTOR_DIR))
+    args = parser.parse_args()
+    args.qiraat = resolve_id(args.qiraat)
+
+    try:
+        pdf = args.pdf or get_riwaya(args.qiraat).pdf_path
+    except ValueError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    if not Path(pdf).exists():
+        print(f'❌ PDF not found: {pdf}')
+        sys.exit(1)
+
+    print('=' * 70)
+    print(f'Vector pages: {args.qiraat} ({args.format}) -> {Path(args.output) / args.qiraat}')
+    print('=' * 70)
+    start = time.perf_counter()
+    _, report = extract(args.qiraat, pdf, args.output, args.format, args.pages,
+                        args.sprite, args.raster_dpi)
+    if not report['pages']:
+        print('⚠️  No pages extracted')
+        sys.exit(1)
+
+    kb = 1024
+    print(f'  pages             {report["pages"]} ({report["scannedPages"]} scanned)')
+    print(f'  vector (gzip)     {report["vectorGzipBytes"] / kb / kb:8.2f} MB   '
+          f'median {report["vectorGzipMedian"] / kb:7.1f} KB')
+    if report['glyphs']:
+        glyphs = report['glyphs']
+        print(f'  shared glyphs     {glyphs["count"]} outlines, {glyphs["gzipSize"] / kb:.1f} KB gzip')
+        print(f'  single page fetch median {report["singlePageGzipMedian"] / kb:7.1f} KB (page + whole sprite)')
+    else:
+        print('  glyph outlines    repeated on every page (no cross-page dedup without --sprite)')
+    for dpi, tier in report['raster'].items():
+        wins = f'vector smaller on {tier["vectorWins"]} pages'
+        if report['glyphs']:
+            wins += f' ({tier["singlePageVectorWins"]} as a single page fetch)'
+        print(f'  JPEG {dpi:>4s} DPI     {tier["bytes"] / kb / kb:8.2f} MB   median {tier["median"] / kb:7.1f} KB   '
+              f'{wins}')
+    print(f'✓ Report written to {Path(args.output) / args.qiraat / REPORT_NAME} '
+          f'in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()